@@ -0,0 +1,110 @@
+"""Measures the aborted time steps and the wall time of a stiff transient, with and without
+icoco.adaptive.TimeStepController.
+
+The problem mimics a Newton solver: each iteration costs a dense linear solve, the number of
+iterations grows with dt / dt_crit(t) and the resolution fails above ``--max-iterations``
+iterations. dt_crit(t) drops by two orders of magnitude around t = 0.5 (stiff transient). The
+problem always requests a time step of 0.1.
+
+- halving: ``CouplingDriver`` default, time step halved after each failure;
+- failures: ``TimeStepController`` learning from the rejected time steps only;
+- iterations: ``TimeStepController`` driven by the number of iterations (PI controller).
+"""
+
+import argparse
+from math import exp
+from time import perf_counter
+from typing import Optional, Tuple
+
+import numpy as np
+
+import icoco
+from icoco.adaptive import TimeStepController
+from icoco.coupling import CouplingDriver
+
+
+class StiffProblem(icoco.Problem):
+    """Problem whose resolution needs more iterations as dt grows, and fails above a maximum"""
+
+    def __init__(self, size: int, max_iterations: int) -> None:
+        super().__init__()
+        rng = np.random.default_rng(0)
+        self._matrix = rng.random((size, size)) + size * np.eye(size)
+        self._rhs = rng.random(size)
+        self._max_iterations = max_iterations
+        self._time = 0.0
+        self._dt = 0.0
+        self.iterations = 0
+
+    def initialize(self) -> bool:
+        return True
+
+    def terminate(self) -> None:
+        pass
+
+    def presentTime(self) -> float:
+        return self._time
+
+    def computeTimeStep(self) -> Tuple[float, bool]:
+        return (0.1, False)
+
+    def initTimeStep(self, dt: float) -> bool:
+        self._dt = dt
+        return True
+
+    def solveTimeStep(self) -> bool:
+        dt_crit = 0.1 * (1.0 - 0.99 * exp(-((self._time - 0.5) / 0.1) ** 2))
+        needed = 2 + int(self._max_iterations * (self._dt / dt_crit) ** 2)
+        self.iterations = min(needed, self._max_iterations + 1)
+        for _ in range(self.iterations):
+            np.linalg.solve(self._matrix, self._rhs)
+        return needed <= self._max_iterations
+
+    def validateTimeStep(self) -> None:
+        self._time += self._dt
+
+    def abortTimeStep(self) -> None:
+        self._dt = 0.0
+
+    def setStationaryMode(self, stationaryMode: bool) -> None:
+        pass
+
+    def getStationaryMode(self) -> bool:
+        return False
+
+
+def run(args, mode: str) -> Tuple[float, CouplingDriver, Optional[TimeStepController]]:
+    """Runs the transient, returns the wall time, the driver and the controller."""
+    problem = StiffProblem(args.size, args.max_iterations)
+    controller = None
+    if mode == "failures":
+        controller = TimeStepController()
+    elif mode == "iterations":
+        controller = TimeStepController(target=args.target, indicator=lambda: problem.iterations)
+    driver = CouplingDriver([problem], controller=controller, max_retries=20)
+    start = perf_counter()
+    driver.run(time_max=1.0)
+    return perf_counter() - start, driver, controller
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100, help="size of the linear systems")
+    parser.add_argument("--max-iterations", type=int, default=10,
+                        help="maximum number of iterations of a resolution")
+    parser.add_argument("--target", type=float, default=5.0,
+                        help="target number of iterations of the controller")
+    args = parser.parse_args()
+
+    print(f"{'':>10} {'steps':>6} {'aborts':>6} {'rejected':>8} {'wasted s':>8} {'wall s':>7}")
+    for mode in ("halving", "failures", "iterations"):
+        elapsed, driver, controller = run(args, mode)
+        rejected = driver.n_aborts / (driver.n_steps + driver.n_aborts)
+        wasted = "" if controller is None else f"{controller.wasted_time:8.3f}"
+        print(f"{mode:>10} {driver.n_steps:>6} {driver.n_aborts:>6} {rejected:>8.1%} "
+              f"{wasted:>8} {elapsed:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
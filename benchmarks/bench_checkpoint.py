@@ -0,0 +1,82 @@
+"""Measures the stall of icoco.checkpoint.DiskCheckpoints.save and the time to restore.
+
+A state made of ``--fields`` arrays of ``--size`` MB is checkpointed ``--checkpoints`` times, with a
+synchronous write (``background=False``) and with the background thread. The stall is the time
+spent in ``save``; ``total`` includes the final wait for the pending writes.
+
+The checkpoint is then restored with DiskCheckpoints and MappedCheckpoints: ``restore`` is the time
+spent in ``restore``, ``first access`` the time to then sum the first array.
+"""
+
+import argparse
+import tempfile
+from time import perf_counter
+from typing import Tuple
+
+import numpy as np
+
+from icoco.checkpoint import DiskCheckpoints, MappedCheckpoints
+
+
+def bench_checkpoints(state: dict, n_checkpoints: int, compression: str,
+                      background: bool) -> Tuple[float, float]:
+    """Returns the mean stall per checkpoint and the total time (in seconds)."""
+    with tempfile.TemporaryDirectory() as directory:
+        checkpoints = DiskCheckpoints(directory, compression=compression, background=background)
+        stall = 0.0
+        start = perf_counter()
+        for label in range(n_checkpoints):
+            start_save = perf_counter()
+            checkpoints.save(label, "file", state)
+            stall += perf_counter() - start_save
+        checkpoints.close()
+        total = perf_counter() - start
+    return stall / n_checkpoints, total
+
+
+def bench_restore(state: dict, checkpoints_type: type) -> Tuple[float, float]:
+    """Returns the time (in seconds) to restore the state and to sum its first array."""
+    with tempfile.TemporaryDirectory() as directory:
+        with checkpoints_type(directory) as checkpoints:
+            checkpoints.save(0, "file", state)
+            checkpoints.flush()
+            start = perf_counter()
+            restored = checkpoints.restore(0, "file")
+            restore = perf_counter() - start
+            start = perf_counter()
+            next(iter(restored.values())).sum()
+            access = perf_counter() - start
+            del restored
+    return restore, access
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--checkpoints", type=int, default=5, help="number of checkpoints")
+    parser.add_argument("--fields", type=int, default=4, help="number of arrays of the state")
+    parser.add_argument("--size", type=float, default=64.0, help="size (in MB) of each array")
+    parser.add_argument("--compression", nargs="+", default=["none", "zlib"],
+                        choices=list(DiskCheckpoints.COMPRESSIONS), help="compressions")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    count = int(args.size * 1.e6 / 8)
+    state = {f"field{index}": np.cumsum(rng.standard_normal(count)).round(3)
+             for index in range(args.fields)}
+
+    print(f"{'compression':>12} {'mode':>12} {'stall ms':>10} {'total s':>10}")
+    for compression in args.compression:
+        for background in (False, True):
+            stall, total = bench_checkpoints(state, args.checkpoints, compression, background)
+            mode = "background" if background else "synchronous"
+            print(f"{compression:>12} {mode:>12} {stall * 1.e3:>10.1f} {total:>10.2f}")
+
+    print(f"\n{'checkpoints':>18} {'restore ms':>12} {'first access ms':>16}")
+    for checkpoints_type in (DiskCheckpoints, MappedCheckpoints):
+        restore, access = bench_restore(state, checkpoints_type)
+        print(f"{checkpoints_type.__name__:>18} {restore * 1.e3:>12.2f} {access * 1.e3:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Measures the per-step overhead of icoco.coupling.CouplingDriver.
+
+The coupled problems are trivial (same as ``MinimalProblem`` in ``tests/conftest.py`` without
+output) so that the measured time is the driver overhead.
+
+With ``--sleep``, each resolution sleeps (releasing the GIL like compiled codes do) to compare the
+wall-clock time per step with and without the thread pool (``--workers``).
+"""
+
+import argparse
+from time import perf_counter
+
+from icoco.coupling import CouplingDriver
+
+from trivial import TrivialProblem  # pylint: disable=wrong-import-order
+
+
+def bench_driver(n_problems: int, n_steps: int, solve_time: float = 0.0,
+                 max_workers: int = 0) -> float:
+    """Returns the time per coupled step (in seconds) for n_problems trivial problems."""
+    with CouplingDriver([TrivialProblem(solve_time) for _ in range(n_problems)],
+                        exchanges=[lambda: None], max_workers=max_workers) as driver:
+        driver.initialize()
+        driver.run(max_steps=min(n_steps, 100))  # warm up
+        start = perf_counter()
+        driver.run(max_steps=n_steps)
+        elapsed = perf_counter() - start
+        driver.terminate()
+    return elapsed / n_steps
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=10000, help="number of time steps")
+    parser.add_argument("--problems", type=int, nargs="+", default=[2, 10, 100],
+                        help="numbers of coupled problems")
+    parser.add_argument("--sleep", type=float, default=0.0,
+                        help="time (in seconds) spent in each solveTimeStep")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="number of threads of the driver (0: sequential)")
+    args = parser.parse_args()
+
+    print(f"{'problems':>10} {'us/step':>12} {'us/step/problem':>16}")
+    for n_problems in args.problems:
+        per_step = bench_driver(n_problems, args.steps, args.sleep, args.workers) * 1.e6
+        print(f"{n_problems:>10} {per_step:>12.2f} {per_step / n_problems:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Measures the cost of raising and catching the ICoCo exceptions.
+
+Each case raises an exception and catches it without printing it, as drivers do when they fall
+back on optional methods: ``NotImplementedMethod``, ``WrongArgument`` and ``WrongContext`` raised
+directly, and ``NotImplementedMethod`` raised by a default method of ``Problem``. The cost of
+formatting the message (``str``) is printed for reference.
+"""
+
+import argparse
+import timeit
+from typing import Callable
+
+import icoco
+
+from trivial import TrivialProblem  # pylint: disable=wrong-import-order
+
+
+def raise_not_implemented() -> None:
+    """Raises and catches NotImplementedMethod."""
+    try:
+        raise icoco.NotImplementedMethod(prob="bench.TrivialProblem", method="isStationary")
+    except icoco.NotImplementedMethod:
+        pass
+
+
+def raise_wrong_argument() -> None:
+    """Raises and catches WrongArgument."""
+    try:
+        raise icoco.WrongArgument(prob="bench.TrivialProblem", method="getOutputDoubleValue",
+                                  arg="name", condition="unknown value")
+    except icoco.WrongArgument:
+        pass
+
+
+def raise_wrong_context() -> None:
+    """Raises and catches WrongContext."""
+    try:
+        raise icoco.WrongContext(prob="bench.TrivialProblem", method="solveTimeStep",
+                                 precondition="called outside the TIME_STEP_DEFINED context")
+    except icoco.WrongContext:
+        pass
+
+
+def per_call(function: Callable, calls: int) -> float:
+    """Returns the best time (in ns) of a call of function over 7 repetitions."""
+    return min(timeit.repeat(function, number=calls, repeat=7)) / calls * 1.e9
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200000, help="number of calls")
+    args = parser.parse_args()
+
+    problem = TrivialProblem()
+
+    def default_method() -> None:
+        try:
+            problem.isStationary()
+        except icoco.NotImplementedMethod:
+            pass
+
+    error = icoco.WrongArgument(prob="bench.TrivialProblem", method="getOutputDoubleValue",
+                                arg="name", condition="unknown value")
+    for name, function in (("NotImplementedMethod", raise_not_implemented),
+                           ("WrongArgument", raise_wrong_argument),
+                           ("WrongContext", raise_wrong_context),
+                           ("Problem.isStationary", default_method),
+                           ("str(WrongArgument)", lambda: str(error))):
+        print(f"{name:>22}: {per_call(function, args.calls):8.1f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Measures the per-exchange overhead of scalar values accessed by name and by handle.
+
+The problem stores ``--values`` doubles in an array and validates each name against
+``getOutputValuesNames()``, as many implementations do. Each exchange reads all the values:
+
+- ``name``: ``getOutputDoubleValue(name)`` for each name;
+- ``registry``: ``HandleRegistry.getOutputDoubleValue(handle)`` (default adapter, through the
+  ``ValuesHandle`` of each handle since the problem implements ``getValuesHandle``);
+- ``native``: a registry subclass reading the array at the handle, without names;
+- ``batched``: one ``getOutputDoubleValues(handle)`` call, vectorized by the problem.
+"""
+
+import argparse
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+import icoco
+from icoco.handles import HandleRegistry
+
+
+class ValuesProblem(icoco.Problem):
+    """Problem storing its output values in an array"""
+
+    def __init__(self, n_values: int) -> None:
+        super().__init__()
+        self._names = [f"value{index}" for index in range(n_values)]
+        self._indices = {name: index for index, name in enumerate(self._names)}
+        self.values = np.linspace(0.0, 1.0, n_values)
+
+    def initialize(self) -> bool:
+        return True
+
+    def terminate(self) -> None:
+        pass
+
+    def presentTime(self) -> float:
+        return 0.0
+
+    def computeTimeStep(self) -> Tuple[float, bool]:
+        return (0.1, False)
+
+    def initTimeStep(self, dt: float) -> bool:
+        return True
+
+    def solveTimeStep(self) -> bool:
+        return True
+
+    def validateTimeStep(self) -> None:
+        pass
+
+    def setStationaryMode(self, stationaryMode: bool) -> None:
+        pass
+
+    def getStationaryMode(self) -> bool:
+        return False
+
+    def getOutputValuesNames(self) -> List[str]:
+        return list(self._names)
+
+    def getOutputDoubleValue(self, name: str) -> float:
+        if name not in self.getOutputValuesNames():
+            raise icoco.WrongArgument(prob="ValuesProblem", method="getOutputDoubleValue",
+                                      arg="name", condition=f"unknown value {name}")
+        return float(self.values[self._indices[name]])
+
+    def getValuesHandle(self, names):
+        return icoco.ValuesHandle(names, np.array([self._indices[name] for name in names]))
+
+    def getOutputDoubleValues(self, names):
+        return self.values[names.indices]
+
+
+class NativeHandles(HandleRegistry):
+    """Registry whose handles are the indices of the values of ValuesProblem"""
+
+    def resolve(self, name: str) -> int:
+        return self.problem._indices[name]  # pylint: disable=protected-access
+
+    def getOutputDoubleValue(self, handle: int) -> float:
+        return float(self.problem.values[handle])
+
+
+def timed(exchange: Callable[[], None], n_exchanges: int) -> float:
+    """Returns the mean time (in seconds) of an exchange."""
+    start = perf_counter()
+    for _ in range(n_exchanges):
+        exchange()
+    return (perf_counter() - start) / n_exchanges
+
+
+def make_exchanges(problem: ValuesProblem) -> Dict[str, Callable[[], None]]:
+    """Returns the exchanges reading all the values of problem, by kind of access."""
+    names = problem.getOutputValuesNames()
+    registry = HandleRegistry(problem)
+    handles = registry.resolve_all(names)
+    native = NativeHandles(problem)
+    native_handles = native.resolve_all(names)
+    batched = registry.values_handle(handles)
+
+    def by_name():
+        for name in names:
+            problem.getOutputDoubleValue(name)
+
+    def by_registry():
+        for handle in handles:
+            registry.getOutputDoubleValue(handle)
+
+    def by_native():
+        for handle in native_handles:
+            native.getOutputDoubleValue(handle)
+
+    def by_batch():
+        problem.getOutputDoubleValues(batched)
+
+    return {"name": by_name, "registry": by_registry, "native": by_native, "batched": by_batch}
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--values", type=int, default=200, help="number of values exchanged")
+    parser.add_argument("--exchanges", type=int, default=200, help="number of exchanges")
+    args = parser.parse_args()
+
+    print(f"{'access':>10} {'us / exchange':>14} {'ns / value':>12}")
+    for label, exchange in make_exchanges(ValuesProblem(args.values)).items():
+        mean = timed(exchange, args.exchanges)
+        print(f"{label:>10} {mean * 1.e6:>14.1f} {mean * 1.e9 / args.values:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Measures ``import icoco`` in many processes started at once, as MPI ranks do.
+
+``--ranks`` processes (at most ``--concurrency`` at the same time) import icoco and report their
+import time and the files opened during the import (audit hook, Python >= 3.8): on a parallel
+filesystem, each open is a metadata request of every rank.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from time import perf_counter
+
+RANK = """
+import sys
+from time import perf_counter
+opened = []
+sys.addaudithook(lambda event, args: opened.append(str(args[0])) if event == "open" else None)
+start = perf_counter()
+import icoco
+elapsed = perf_counter() - start
+print(elapsed, len(opened), sum(path.endswith("VERSION") for path in opened))
+"""
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ranks", type=int, default=1000, help="number of processes")
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count(),
+                        help="maximum number of processes at the same time")
+    args = parser.parse_args()
+
+    start = perf_counter()
+    results = []
+    for first in range(0, args.ranks, args.concurrency):
+        ranks = [subprocess.Popen(  # pylint: disable=consider-using-with
+                     [sys.executable, "-c", RANK], stdout=subprocess.PIPE, text=True)
+                 for _ in range(first, min(first + args.concurrency, args.ranks))]
+        for rank in ranks:
+            output, _ = rank.communicate()
+            elapsed, opened, version = output.split()
+            results.append((float(elapsed), int(opened), int(version)))
+    wall = perf_counter() - start
+
+    times = [elapsed for elapsed, _, _ in results]
+    print(f"ranks: {args.ranks}, wall-clock time: {wall:.2f} s")
+    print(f"import time per rank: median {statistics.median(times) * 1.e3:.2f} ms, "
+          f"max {max(times) * 1.e3:.2f} ms")
+    print(f"files opened: {sum(opened for _, opened, _ in results)} "
+          f"({results[0][1]} per rank), VERSION reads: {sum(read for _, _, read in results)} "
+          f"({results[0][2]} per rank)")
+
+
+if __name__ == "__main__":
+    main()
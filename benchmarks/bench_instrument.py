@@ -0,0 +1,59 @@
+"""Measures the overhead per call of icoco.instrument timers.
+
+``presentTime`` of a trivial problem is called without timers, with
+``instrument(..., enabled=False)`` and with timers recording into a :class:`Recorder` of
+``--capacity`` calls, on an instrumented instance and on an instance of an instrumented class.
+Each time is the best of ``--repeat`` runs of ``--capacity`` calls, the runs of the variants
+being interleaved so that they see the same load of the host: a timed run fills the ring once, so
+the flush of the statistics when it wraps around is included. The cost of ``time.perf_counter_ns``,
+called twice per timed call, is printed for reference, and subtracted from the overhead to get the
+cost of the bookkeeping of the timers (call of the timer, try/finally, stores, flush, and the
+per-thread ring lookup for a class).
+"""
+
+import argparse
+import timeit
+from time import perf_counter_ns
+from typing import Callable, Dict
+
+from icoco.instrument import Recorder, instrument
+
+from trivial import TrivialProblem  # pylint: disable=wrong-import-order
+
+
+def per_call(functions: Dict[str, Callable], calls: int, repeat: int) -> Dict[str, float]:
+    """Returns the best time (in ns) of a call of each function over repeat runs of calls calls,
+    the runs of the functions being interleaved."""
+    best = dict.fromkeys(functions, float("inf"))
+    for _ in range(repeat):
+        for name, function in functions.items():
+            best[name] = min(best[name], timeit.timeit(function, number=calls) / calls * 1.e9)
+    return best
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--capacity", type=int, default=1 << 16, help="capacity of the ring")
+    parser.add_argument("--repeat", type=int, default=50, help="number of runs")
+    args = parser.parse_args()
+
+    recorder = Recorder(args.capacity)
+    times = per_call({
+        "perf_counter_ns": perf_counter_ns,
+        "no timer": TrivialProblem().presentTime,
+        "disabled": instrument(TrivialProblem(), recorder, enabled=False).presentTime,
+        "timed": instrument(TrivialProblem(), recorder).presentTime,
+        "timed (class)": instrument(TrivialProblem, recorder)().presentTime}, args.capacity,
+        args.repeat)
+    clock, base = times.pop("perf_counter_ns"), times.pop("no timer")
+    print(f"perf_counter_ns: {clock:8.1f} ns")
+    print(f"no timer:        {base:8.1f} ns")
+    for name, value in times.items():
+        print(f"{name + ':':17s}{value:8.1f} ns ({value - base:+.1f})"
+              + ("" if name == "disabled" else
+                 f", bookkeeping {value - base - 2 * clock:.1f} ns (- 2 perf_counter_ns)"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Measures the speedup of icoco.multirate.MultiRateCoupling on a two-scale case.
+
+A slow problem (time step ``--slow-dt``, costly resolution: a dense linear solve) provides a
+smooth source u(t) = sin(2 pi t) to a fast problem (time step ``--fast-dt``, cheap resolution),
+relaxing towards it: y' = (u - y) / tau. The fast problem sends y back to the slow one.
+
+- lockstep: ``CouplingDriver``, both problems at the fast time step;
+- multi-rate: ``MultiRateCoupling``, the fast problem subcycling with linear and cubic
+  interpolations of u.
+
+The wall time and the error on y at the final time (relative to the lockstep run) are printed.
+"""
+
+import argparse
+from time import perf_counter
+from typing import Tuple
+
+import numpy as np
+
+import icoco
+from icoco.coupling import CouplingDriver
+from icoco.implicit import ValueExchange
+from icoco.multirate import MultiRateCoupling
+
+
+class RateProblem(icoco.Problem):
+    """Problem with its own time step"""
+
+    def __init__(self, dt: float) -> None:
+        super().__init__()
+        self._dt_pref = dt
+        self._time = 0.0
+        self._dt = 0.0
+        self.input = 0.0
+
+    def initialize(self) -> bool:
+        return True
+
+    def terminate(self) -> None:
+        pass
+
+    def presentTime(self) -> float:
+        return self._time
+
+    def computeTimeStep(self) -> Tuple[float, bool]:
+        return (self._dt_pref, False)
+
+    def initTimeStep(self, dt: float) -> bool:
+        self._dt = dt
+        return True
+
+    def solveTimeStep(self) -> bool:
+        return True
+
+    def validateTimeStep(self) -> None:
+        self._time += self._dt
+
+    def setStationaryMode(self, stationaryMode: bool) -> None:
+        pass
+
+    def getStationaryMode(self) -> bool:
+        return False
+
+    def setInputDoubleValue(self, name: str, val: float) -> None:
+        self.input = val
+
+
+class SlowProblem(RateProblem):
+    """Costly problem providing u(t) = sin(2 pi t)"""
+
+    def __init__(self, dt: float, size: int) -> None:
+        super().__init__(dt)
+        rng = np.random.default_rng(0)
+        self._matrix = rng.random((size, size)) + size * np.eye(size)
+        self._rhs = rng.random(size)
+
+    def solveTimeStep(self) -> bool:
+        np.linalg.solve(self._matrix, self._rhs)
+        return True
+
+    def getOutputDoubleValue(self, name: str) -> float:
+        return float(np.sin(2.0 * np.pi * self._time))
+
+
+class FastProblem(RateProblem):
+    """Cheap problem relaxing y towards its input: y' = (u - y) / tau (implicit Euler)"""
+
+    def __init__(self, dt: float, tau: float) -> None:
+        super().__init__(dt)
+        self._tau = tau
+        self._y = 0.0
+        self._y_new = 0.0
+
+    def solveTimeStep(self) -> bool:
+        self._y_new = (self._y + self._dt / self._tau * self.input) / (1.0 + self._dt / self._tau)
+        return True
+
+    def validateTimeStep(self) -> None:
+        super().validateTimeStep()
+        self._y = self._y_new
+
+    def getOutputDoubleValue(self, name: str) -> float:
+        return self._y
+
+
+def run(args, order: int = 0) -> Tuple[float, float]:
+    """Runs the case (lockstep if order is 0), returns the wall time and the final y."""
+    slow = SlowProblem(args.fast_dt if order == 0 else args.slow_dt, args.size)
+    fast = FastProblem(args.fast_dt, args.tau)
+    to_fast = ValueExchange(slow, "u", fast)
+    to_slow = ValueExchange(fast, "y", slow)
+    start = perf_counter()
+    if order == 0:
+        def exchange() -> None:
+            to_fast.write(np.array([to_fast.read()]))
+            to_slow.write(np.array([to_slow.read()]))
+
+        with CouplingDriver([slow, fast], exchanges=[exchange]) as driver:
+            driver.run(time_max=args.time)
+    else:
+        with MultiRateCoupling([slow], [fast], to_fast=[to_fast], to_slow=[to_slow],
+                               order=order) as coupling:
+            coupling.run(time_max=args.time)
+    return perf_counter() - start, fast.getOutputDoubleValue("y")
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slow-dt", type=float, default=1.e-1, help="slow time step")
+    parser.add_argument("--fast-dt", type=float, default=1.e-4, help="fast time step")
+    parser.add_argument("--tau", type=float, default=1.e-3, help="fast relaxation time")
+    parser.add_argument("--time", type=float, default=1.0, help="final time")
+    parser.add_argument("--size", type=int, default=100, help="size of the slow linear system")
+    args = parser.parse_args()
+
+    reference_time, reference = run(args)
+    print(f"{'lockstep':>12}: {reference_time:8.3f} s")
+    for name, order in (("linear", 1), ("cubic", 3)):
+        elapsed, result = run(args, order)
+        print(f"{name:>12}: {elapsed:8.3f} s (speedup {reference_time / elapsed:6.1f}), "
+              f"error on y {abs(result - reference):.2e}")
+
+
+if __name__ == "__main__":
+    main()
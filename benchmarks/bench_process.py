@@ -0,0 +1,133 @@
+"""Measures the overhead of icoco.process.ProcessProblem.
+
+- round-trip latency of a scalar call (``presentTime``) compared to a direct call;
+- throughput of array exchanges (``setInputMEDDoubleField`` then ``getOutputMEDDoubleField`` of a
+  NumPy array) through shared memory, compared to arrays pickled through a pipe.
+"""
+# pylint: disable=abstract-class-instantiated
+
+import argparse
+import multiprocessing
+from time import perf_counter
+from typing import Tuple
+
+import numpy as np
+
+import icoco
+from icoco.process import ProcessProblem
+
+
+class EchoProblem(icoco.Problem):
+    """Problem storing and returning arrays"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._array = None
+
+    def initialize(self) -> bool:
+        return True
+
+    def terminate(self) -> None:
+        pass
+
+    def presentTime(self) -> float:
+        return 0.0
+
+    def computeTimeStep(self) -> Tuple[float, bool]:
+        return (0.1, False)
+
+    def initTimeStep(self, dt: float) -> bool:
+        return True
+
+    def solveTimeStep(self) -> bool:
+        return True
+
+    def validateTimeStep(self) -> None:
+        pass
+
+    def setStationaryMode(self, stationaryMode: bool) -> None:
+        pass
+
+    def getStationaryMode(self) -> bool:
+        return False
+
+    def setInputMEDDoubleField(self, name, afield) -> None:
+        if self._array is None or self._array.shape != afield.shape:
+            self._array = np.empty_like(afield)
+        self._array[...] = afield
+
+    def getOutputMEDDoubleField(self, name):
+        return self._array
+
+
+def _echo(conn) -> None:
+    """Pipe worker sending back what it receives."""
+    message = conn.recv()
+    while message is not None:
+        conn.send(message)
+        message = conn.recv()
+
+
+def bench_latency(n_calls: int) -> Tuple[float, float]:
+    """Returns the time per call (in seconds) of presentTime, direct and through the proxy."""
+    direct = EchoProblem()
+    start = perf_counter()
+    for _ in range(n_calls):
+        direct.presentTime()
+    direct_time = (perf_counter() - start) / n_calls
+    with ProcessProblem(EchoProblem) as problem:
+        problem.presentTime()
+        start = perf_counter()
+        for _ in range(n_calls):
+            problem.presentTime()
+        proxy_time = (perf_counter() - start) / n_calls
+    return direct_time, proxy_time
+
+
+def bench_throughput(problem: ProcessProblem, conn, size: int, repeat: int) -> Tuple[float, float]:
+    """Returns the throughput (in GB/s) of a round trip of an array of size bytes, through the proxy
+    and pickled through a pipe."""
+    array = np.random.default_rng(0).random(size // 8)
+    problem.setInputMEDDoubleField("field", array)
+    problem.getOutputMEDDoubleField("field")
+    start = perf_counter()
+    for _ in range(repeat):
+        problem.setInputMEDDoubleField("field", array)
+        problem.getOutputMEDDoubleField("field")
+    shared = 2 * array.nbytes * repeat / (perf_counter() - start) / 1.e9
+    start = perf_counter()
+    for _ in range(repeat):
+        conn.send(array)
+        conn.recv()
+    pickled = 2 * array.nbytes * repeat / (perf_counter() - start) / 1.e9
+    return shared, pickled
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=10000, help="number of scalar calls")
+    parser.add_argument("--max-size", type=int, default=1 << 28,
+                        help="largest array size (in bytes)")
+    args = parser.parse_args()
+
+    direct_time, proxy_time = bench_latency(args.calls)
+    print(f"presentTime: direct {direct_time * 1.e6:.2f} us, proxy {proxy_time * 1.e6:.2f} us")
+
+    conn, child_conn = multiprocessing.Pipe()
+    echo = multiprocessing.Process(target=_echo, args=(child_conn, ), daemon=True)
+    echo.start()
+    print(f"{'bytes':>12} {'shared GB/s':>12} {'pickled GB/s':>13}")
+    with ProcessProblem(EchoProblem) as problem:
+        size = 1 << 10
+        while size <= args.max_size:
+            repeat = max(1, min(1000, (1 << 28) // size))
+            shared, pickled = bench_throughput(problem, conn, size, repeat)
+            print(f"{size:>12} {shared:>12.2f} {pickled:>13.2f}")
+            size <<= 2
+    conn.send(None)
+    echo.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Compares the relaxations of icoco.implicit.FixedPointCoupling on a stiff synthetic case.
+
+Two problems exchange fields of ``--size`` values (Gauss-Seidel scheme):
+
+- the first one computes y = K u + f(t), K symmetric with ``--modes`` eigenvalues between
+  -``--stiffness`` and -1, the others in [-0.5, 0.5];
+- the second one returns its input.
+
+Plain fixed-point iterations diverge for stiffness > 1. For each relaxation, the mean number of
+coupling iterations per time step and the wall-clock time per time step are printed.
+"""
+
+import argparse
+from time import perf_counter
+from typing import Tuple
+
+import numpy as np
+
+import icoco
+from icoco.implicit import AitkenRelaxation, ConstantRelaxation, FieldExchange, FixedPointCoupling
+from icoco.quasi_newton import AndersonRelaxation, IQNILSRelaxation
+
+
+class LinearProblem(icoco.Problem):
+    """Problem computing the field y = K u + f(t)"""
+
+    def __init__(self, matrix: np.ndarray) -> None:
+        super().__init__()
+        self._matrix = matrix
+        self._forcing = np.linspace(0.0, 1.0, len(matrix))
+        self._input = np.zeros(len(matrix))
+        self._output = np.zeros(len(matrix))
+        self._time = 0.0
+        self._dt = 0.0
+        self._stat = False
+
+    def initialize(self) -> bool:
+        self._time = 0.0
+        return True
+
+    def terminate(self) -> None:
+        pass
+
+    def presentTime(self) -> float:
+        return self._time
+
+    def computeTimeStep(self) -> Tuple[float, bool]:
+        return (0.1, False)
+
+    def initTimeStep(self, dt: float) -> bool:
+        self._dt = dt
+        return True
+
+    def solveTimeStep(self) -> bool:
+        self._output = (self._matrix @ self._input
+                        + np.cos(self._time + self._dt) * self._forcing)
+        return True
+
+    def validateTimeStep(self) -> None:
+        self._time += self._dt
+
+    def abortTimeStep(self) -> None:
+        self._dt = 0.0
+
+    def setStationaryMode(self, stationaryMode: bool) -> None:
+        self._stat = stationaryMode
+
+    def getStationaryMode(self) -> bool:
+        return self._stat
+
+    def setInputMEDDoubleField(self, name: str, afield) -> None:
+        self._input[:] = afield
+
+    def getOutputMEDDoubleField(self, name: str):
+        return self._output
+
+
+def stiff_matrix(size: int, stiffness: float, modes: int) -> np.ndarray:
+    """Returns a symmetric matrix with modes eigenvalues in [-stiffness, -1], the others in
+    [-0.5, 0.5]"""
+    basis, _ = np.linalg.qr(np.random.default_rng(0).standard_normal((size, size)))
+    eigenvalues = np.concatenate([-np.geomspace(1.0, stiffness, modes),
+                                  np.linspace(-0.5, 0.5, size - modes)])
+    return basis @ np.diag(eigenvalues) @ basis.T
+
+
+def bench_relaxation(relaxation, matrix: np.ndarray, n_steps: int) -> Tuple[float, float]:
+    """Returns the mean number of iterations and the time (in seconds) per time step."""
+    size = len(matrix)
+    first = LinearProblem(matrix)
+    second = LinearProblem(np.eye(size))
+    second._forcing[:] = 0.0  # pylint: disable=protected-access
+    exchanges = [FieldExchange(first, "y", second, "u"), FieldExchange(second, "y", first, "u")]
+    driver = FixedPointCoupling([first, second], exchanges, relaxation, tolerance=1.e-8,
+                                max_iterations=1000, gauss_seidel=True)
+    driver.initialize()
+    start = perf_counter()
+    driver.run(max_steps=n_steps)
+    elapsed = perf_counter() - start
+    driver.terminate()
+    return np.mean(driver.iterations), elapsed / n_steps
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=20, help="number of time steps")
+    parser.add_argument("--size", type=int, default=1000, help="size of the exchanged fields")
+    parser.add_argument("--stiffness", type=float, default=10.0,
+                        help="opposite of the lowest eigenvalue of the coupling operator")
+    parser.add_argument("--modes", type=int, default=5, help="number of stiff modes")
+    args = parser.parse_args()
+
+    matrix = stiff_matrix(args.size, args.stiffness, args.modes)
+    omega = 1.0 / (1.0 + args.stiffness)
+    relaxations = {"constant": ConstantRelaxation(omega),
+                   "aitken": AitkenRelaxation(omega),
+                   "iqn-ils": IQNILSRelaxation(omega),
+                   "iqn-ils reuse=2": IQNILSRelaxation(omega, reuse=2),
+                   "anderson 0.5": AndersonRelaxation(omega, mixing=0.5)}
+    print(f"{'relaxation':>16} {'iterations/step':>16} {'ms/step':>10}")
+    for name, relaxation in relaxations.items():
+        iterations, per_step = bench_relaxation(relaxation, matrix, args.steps)
+        print(f"{name:>16} {iterations:>16.1f} {per_step * 1.e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Measures the overhead of icoco.remote.RemoteProblem, over a Unix and a TCP socket.
+
+- round-trip latency of a scalar call (``presentTime``) compared to a direct call;
+- rate of pipelined setters (``setInputDoubleValue``, not waiting for an answer) compared to the
+  same number of calls waiting for an answer (``getOutputDoubleValue``);
+- throughput of array exchanges (``setInputMEDDoubleField`` then ``getOutputMEDDoubleField`` of a
+  NumPy array).
+"""
+# pylint: disable=abstract-class-instantiated
+
+import argparse
+import os
+import tempfile
+import threading
+from time import perf_counter
+from typing import Tuple
+
+import numpy as np
+
+import icoco
+from icoco.remote import Address, ProblemServer, RemoteProblem
+
+
+class EchoProblem(icoco.Problem):
+    """Problem storing and returning values and arrays"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._array = None
+        self._values = {}
+
+    def initialize(self) -> bool:
+        return True
+
+    def terminate(self) -> None:
+        pass
+
+    def presentTime(self) -> float:
+        return 0.0
+
+    def computeTimeStep(self) -> Tuple[float, bool]:
+        return (0.1, False)
+
+    def initTimeStep(self, dt: float) -> bool:
+        return True
+
+    def solveTimeStep(self) -> bool:
+        return True
+
+    def validateTimeStep(self) -> None:
+        pass
+
+    def setStationaryMode(self, stationaryMode: bool) -> None:
+        pass
+
+    def getStationaryMode(self) -> bool:
+        return False
+
+    def setInputDoubleValue(self, name: str, val: float) -> None:
+        self._values[name] = val
+
+    def getOutputDoubleValue(self, name: str) -> float:
+        return self._values.get(name, 0.0)
+
+    def setInputMEDDoubleField(self, name, afield) -> None:
+        if self._array is None or self._array.shape != afield.shape:
+            self._array = np.empty_like(afield)
+        self._array[...] = afield
+
+    def getOutputMEDDoubleField(self, name):
+        return self._array
+
+
+def per_call(function, n_calls: int) -> float:
+    """Returns the time per call (in seconds) of function."""
+    start = perf_counter()
+    for _ in range(n_calls):
+        function()
+    return (perf_counter() - start) / n_calls
+
+
+def bench_calls(problem: RemoteProblem, n_calls: int) -> Tuple[float, float, float]:
+    """Returns the time per call (in seconds) of presentTime, of a pipelined setter and of a
+    getter."""
+    problem.presentTime()
+    latency = per_call(problem.presentTime, n_calls)
+    start = perf_counter()
+    for _ in range(n_calls):
+        problem.setInputDoubleValue("x", 1.0)
+    problem.flush()
+    pipelined = (perf_counter() - start) / n_calls
+    getter = per_call(lambda: problem.getOutputDoubleValue("x"), n_calls)
+    return latency, pipelined, getter
+
+
+def bench_throughput(problem: RemoteProblem, size: int, repeat: int) -> float:
+    """Returns the throughput (in GB/s) of a round trip of an array of size bytes."""
+    array = np.random.default_rng(0).random(size // 8)
+    problem.setInputMEDDoubleField("field", array)
+    problem.getOutputMEDDoubleField("field")
+    start = perf_counter()
+    for _ in range(repeat):
+        problem.setInputMEDDoubleField("field", array)
+        problem.getOutputMEDDoubleField("field")
+    return 2 * array.nbytes * repeat / (perf_counter() - start) / 1.e9
+
+
+def bench_address(address: Address, n_calls: int, max_size: int) -> None:
+    """Runs the benchmark with a server listening to address (served in a thread)."""
+    with ProblemServer(EchoProblem(), address) as server:
+        thread = threading.Thread(target=server.serve, daemon=True)
+        thread.start()
+        with RemoteProblem(server.address, authkey=server.authkey) as problem:
+            latency, pipelined, getter = bench_calls(problem, n_calls)
+            print(f"presentTime {latency * 1.e6:.2f} us, setInputDoubleValue (pipelined) "
+                  f"{pipelined * 1.e6:.2f} us, getOutputDoubleValue {getter * 1.e6:.2f} us")
+            print(f"{'bytes':>12} {'GB/s':>8}")
+            size = 1 << 10
+            while size <= max_size:
+                repeat = max(1, min(1000, (1 << 28) // size))
+                print(f"{size:>12} {bench_throughput(problem, size, repeat):>8.2f}")
+                size <<= 2
+    thread.join()
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=10000, help="number of scalar calls")
+    parser.add_argument("--max-size", type=int, default=1 << 28,
+                        help="largest array size (in bytes)")
+    args = parser.parse_args()
+
+    direct = EchoProblem()
+    print(f"presentTime direct: {per_call(direct.presentTime, args.calls) * 1.e6:.2f} us")
+    with tempfile.TemporaryDirectory() as directory:
+        print("Unix socket:")
+        bench_address(os.path.join(directory, "echo.sock"), args.calls, args.max_size)
+    print("TCP socket:")
+    bench_address(("127.0.0.1", 0), args.calls, args.max_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Benchmark suite of the overhead of the icoco API and glue, with JSON results.
+
+``run`` measures the cases below and writes their results (best and median time per call, in
+seconds) to a JSON file; ``diff`` compares two such files, for instance of two versions::
+
+    python3 benchmarks/bench_suite.py run --output before.json
+    python3 benchmarks/bench_suite.py run --output after.json
+    python3 benchmarks/bench_suite.py diff before.json after.json
+
+Cases:
+
+- ``import_icoco``: cumulative import time of ``icoco`` (``python -X importtime``, new process);
+- ``raise_not_implemented``: call of a default ``Problem`` method raising ``NotImplementedMethod``,
+  caught;
+- ``raise_wrong_context``: call of ``solveTimeStep`` before ``initialize`` on a
+  ``check_context`` problem, raising ``WrongContext``, caught;
+- ``dispatch_base``: call of a method of the ``Problem`` base class (``GetICoCoMajorVersion``);
+- ``dispatch_override``: call of a method overridden by the problem (``presentTime``);
+- ``time_loop_<n>``: ``initialize``, n time steps (``computeTimeStep``, ``initTimeStep``,
+  ``solveTimeStep``, ``validateTimeStep``) and ``terminate``.
+"""
+
+import argparse
+import json
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import timeit
+from typing import Callable, Dict, Tuple
+
+import icoco
+from icoco.context import check_context
+
+from trivial import TrivialProblem  # pylint: disable=wrong-import-order
+
+
+def import_time(repeat: int) -> Tuple[float, float]:
+    """Returns the best and median cumulative import time (in seconds) of icoco."""
+    times = []
+    for _ in range(repeat):
+        stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import icoco"],
+                                capture_output=True, text=True, check=True).stderr
+        match = re.search(r"^import time:\s+\d+ \|\s+(\d+) \| icoco$", stderr, re.MULTILINE)
+        times.append(int(match.group(1)) * 1.e-6)
+    return min(times), statistics.median(times)
+
+
+def raise_not_implemented(problem: icoco.Problem) -> None:
+    """Calls a default method of Problem."""
+    try:
+        problem.isStationary()
+    except icoco.NotImplementedMethod:
+        pass
+
+
+def raise_wrong_context(problem: icoco.Problem) -> None:
+    """Calls solveTimeStep out of context."""
+    try:
+        problem.solveTimeStep()
+    except icoco.WrongContext:
+        pass
+
+
+def time_loop(problem: icoco.Problem, n_steps: int) -> None:
+    """Runs n_steps time steps."""
+    problem.initialize()
+    for _ in range(n_steps):
+        dt, _ = problem.computeTimeStep()
+        problem.initTimeStep(dt)
+        problem.solveTimeStep()
+        problem.validateTimeStep()
+    problem.terminate()
+
+
+def cases(steps: Tuple[int, ...]) -> Dict[str, Callable[[], None]]:
+    """Returns the in-process cases, by name."""
+    problem = TrivialProblem()
+    checked = check_context(TrivialProblem)()
+    result = {
+        "raise_not_implemented": lambda: raise_not_implemented(problem),
+        "raise_wrong_context": lambda: raise_wrong_context(checked),
+        "dispatch_base": problem.GetICoCoMajorVersion,
+        "dispatch_override": problem.presentTime,
+    }
+    for n_steps in steps:
+        result[f"time_loop_{n_steps}"] = lambda n=n_steps: time_loop(problem, n)
+    return result
+
+
+def measure(function: Callable[[], None], repeat: int) -> Tuple[float, float]:
+    """Returns the best and median time (in seconds) of a call of function."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    times = [time / number for time in timer.repeat(repeat=repeat, number=number)]
+    return min(times), statistics.median(times)
+
+
+def run(args: argparse.Namespace) -> None:
+    """Runs the suite and writes the results."""
+    results = {}
+    best, median = import_time(args.repeat)
+    results["import_icoco"] = {"best": best, "median": median}
+    print(f"{'import_icoco':>24} {best * 1.e6:>12.3f} us")
+    for name, function in cases(tuple(args.steps)).items():
+        best, median = measure(function, args.repeat)
+        results[name] = {"best": best, "median": median}
+        print(f"{name:>24} {best * 1.e6:>12.3f} us")
+    with open(args.output, "w", encoding="utf-8") as stream:
+        json.dump({"icoco": icoco.__version__, "python": platform.python_version(),
+                   "machine": platform.machine(), "results": results}, stream, indent=2)
+
+
+def diff(args: argparse.Namespace) -> int:
+    """Prints the ratios new/old of the best times, returns 1 if a case regressed."""
+    with open(args.old, encoding="utf-8") as stream:
+        old = json.load(stream)
+    with open(args.new, encoding="utf-8") as stream:
+        new = json.load(stream)
+    print(f"{'case':>24} {'old us':>12} {'new us':>12} {'new/old':>8}")
+    regressed = False
+    for name in sorted(set(old["results"]) | set(new["results"])):
+        if name not in old["results"] or name not in new["results"]:
+            only = "new" if name in new["results"] else "old"
+            print(f"{name:>24} {'only in ' + only:>25}")
+            continue
+        before = old["results"][name]["best"]
+        after = new["results"][name]["best"]
+        ratio = after / before
+        flag = " REGRESSION" if ratio > 1.0 + args.threshold else ""
+        regressed = regressed or bool(flag)
+        print(f"{name:>24} {before * 1.e6:>12.3f} {after * 1.e6:>12.3f} {ratio:>8.2f}{flag}")
+    return 1 if regressed else 0
+
+
+def main() -> int:
+    """Runs the command."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the suite")
+    run_parser.add_argument("--output", default="bench_suite.json", help="JSON results file")
+    run_parser.add_argument("--repeat", type=int, default=5, help="number of repetitions")
+    run_parser.add_argument("--steps", type=int, nargs="+", default=[10, 100, 1000],
+                            help="numbers of time steps of the time loops")
+    diff_parser = commands.add_parser("diff", help="compare two results files")
+    diff_parser.add_argument("old", help="JSON results file of reference")
+    diff_parser.add_argument("new", help="JSON results file to compare")
+    diff_parser.add_argument("--threshold", type=float, default=0.1,
+                             help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+        return 0
+    return diff(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""Trivial problem shared by the benchmark scripts.
+
+It does nothing (same as ``MinimalProblem`` in ``tests/conftest.py`` without output) so that the
+benchmarks measure the overhead of icoco around the calls.
+"""
+
+from time import sleep
+from typing import Tuple
+
+import icoco
+
+
+class TrivialProblem(icoco.Problem):
+    """Minimal problem doing nothing, sleeping ``solve_time`` seconds in each resolution"""
+
+    def __init__(self, solve_time: float = 0.0) -> None:
+        super().__init__()
+        self._solve_time = solve_time
+        self._time = 0.0
+        self._dt = 0.0
+        self._stat = False
+
+    def initialize(self) -> bool:
+        self._time = 0.0
+        return True
+
+    def terminate(self) -> None:
+        pass
+
+    def presentTime(self) -> float:
+        return self._time
+
+    def computeTimeStep(self) -> Tuple[float, bool]:
+        return (0.1, False)
+
+    def initTimeStep(self, dt: float) -> bool:
+        self._dt = dt
+        return True
+
+    def solveTimeStep(self) -> bool:
+        if self._solve_time > 0.0:
+            sleep(self._solve_time)
+        return True
+
+    def validateTimeStep(self) -> None:
+        self._time += self._dt
+
+    def setStationaryMode(self, stationaryMode: bool) -> None:
+        self._stat = stationaryMode
+
+    def getStationaryMode(self) -> bool:
+        return self._stat
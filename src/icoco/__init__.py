@@ -17,8 +17,25 @@ __copyright__ = '2023, CEA'
 __author__ = 'CEA'
 
 from .exception import WrongContext, WrongArgument, NotImplementedMethod  # noqa: F401
-from .problem import (Problem, ValueType,  # noqa: F401
+from .problem import (Problem, ValueType, ValuesHandle,  # noqa: F401
                       ICOCO_VERSION, ICOCO_MAJOR_VERSION, ICOCO_MINOR_VERSION)  # noqa: F401
 from .version import get_version  # noqa: F401
 
 __version__ = get_version()
+
+_SUBMODULES = ["adaptive", "aio", "checkpoint", "context", "coupling", "field", "handles",
+               "implicit", "instrument", "metadata", "mpi", "multirate", "process", "quasi_newton",
+               "remote", "state_store"]
+"""Submodules imported on first access as attributes of the package (``icoco.coupling``...)."""
+
+
+def __getattr__(name: str):
+    """Imports the submodules on first access (PEP 562, Python >= 3.7)."""
+    if name in _SUBMODULES:
+        import importlib  # pylint: disable=import-outside-toplevel
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + _SUBMODULES)
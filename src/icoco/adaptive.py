@@ -0,0 +1,191 @@
+"""
+Adaptive time-step control for the coupling drivers of :mod:`icoco.coupling`.
+
+:class:`TimeStepController` predicts the next time step from the history of the previous ones: a
+PI/PID controller drives an indicator of the difficulty of the time steps (number of iterations,
+error estimate...) towards a target, and the time steps which failed bound the next predictions,
+so that fewer time steps are aborted. It is used by :class:`icoco.coupling.CouplingDriver` (and
+:class:`icoco.implicit.FixedPointCoupling`, whose indicator is the number of coupling iterations)
+given as ``controller``.
+"""
+
+from __future__ import annotations
+
+from math import exp, log
+from typing import Callable, Optional
+
+from .exception import WrongArgument
+
+
+class TimeStepController:  # pylint: disable=too-many-instance-attributes
+    """PI/PID time-step controller learning from accepted and rejected time steps.
+
+    After an accepted time step dt with indicator value n, the next time step is
+    dt * f, with log(f) = -(ki * e_0 + kp * (e_0 - e_1) + kd * (e_0 - 2 e_1 + e_2)), e_k being
+    log(n / target) for the k-th last accepted time step. f is bounded by ``factor_min`` and
+    ``factor_max`` (``factor_max`` without indicator).
+
+    After a rejected time step dt, the retry uses dt * ``reject_factor``, and the predicted time
+    steps are bounded by ``safety`` * dt. This bound grows by :attr:`limit_growth` at each accepted
+    time step, so that larger time steps are tried again once the difficulty is over.
+
+    The predicted time steps are also bounded by the time step of the problems (given to
+    :meth:`propose`) and by ``dt_min``.
+    """
+
+    limit_growth: float = 1.02
+    """Growth of the bound set by the rejected time steps, at each accepted time step."""
+
+    def __init__(self,  # pylint: disable=too-many-arguments
+                 target: float = 1.0,
+                 gains: tuple = (0.3, 0.4, 0.0),
+                 factors: tuple = (0.2, 2.0),
+                 reject_factor: float = 0.5,
+                 safety: float = 0.9,
+                 *,
+                 dt_min: float = 0.0,
+                 indicator: Optional[Callable[[], float]] = None) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        target : float
+            target value of the indicator (for instance the number of iterations).
+        gains : tuple
+            integral, proportional and derivative gains (ki, kp, kd): (ki, 0, 0) is an I
+            controller, (ki, kp, 0) a PI one.
+        factors : tuple
+            bounds (factor_min, factor_max) of the ratio between two successive time steps.
+        reject_factor : float
+            factor applied to the time step after a rejection.
+        safety : float
+            factor applied to the rejected time steps to bound the predicted ones.
+        dt_min : float
+            lower bound of the time steps.
+        indicator : Callable[[], float]
+            called after each accepted time step to get the value of the indicator (for instance
+            ``lambda: problem.getOutputIntValue("iterations")``), overriding the one given by the
+            driver.
+        """
+        if target <= 0.0:
+            raise WrongArgument(prob="TimeStepController", method="TimeStepController",
+                                arg="target", condition="target must be positive")
+        self._target = target
+        self._ki, self._kp, self._kd = gains
+        self._factor_min, self._factor_max = factors
+        self._reject_factor = reject_factor
+        self._safety = safety
+        self._dt_min = dt_min
+        self._indicator = indicator
+        self._errors = [0.0, 0.0]  # log(n / target) of the 2 previous accepted time steps
+        self._history = False  # whether _errors is set
+        self._dt_next = float("inf")
+        self._limit = float("inf")
+        self.n_accepted = 0
+        """Number of accepted time steps."""
+        self.n_rejected = 0
+        """Number of rejected time steps."""
+        self.solve_time = 0.0
+        """Time (in seconds) spent in the accepted time steps."""
+        self.wasted_time = 0.0
+        """Time (in seconds) spent in the rejected time steps."""
+
+    @property
+    def rejected_ratio(self) -> float:
+        """Ratio of rejected time steps among all the tried ones."""
+        tried = self.n_accepted + self.n_rejected
+        return self.n_rejected / tried if tried else 0.0
+
+    @property
+    def limit(self) -> float:
+        """Current bound of the time steps learned from the rejected ones (inf if none)."""
+        return self._limit
+
+    def reset_statistics(self) -> None:
+        """Resets the counters and timings (the history is kept)."""
+        self.n_accepted = 0
+        self.n_rejected = 0
+        self.solve_time = 0.0
+        self.wasted_time = 0.0
+
+    def reset(self) -> None:
+        """Forgets the history and resets the statistics."""
+        self._history = False
+        self._dt_next = float("inf")
+        self._limit = float("inf")
+        self.reset_statistics()
+
+    def propose(self, dt: float) -> float:
+        """Returns the predicted time step.
+
+        Parameters
+        ----------
+        dt : float
+            time step requested by the problems (upper bound).
+
+        Returns
+        -------
+        float
+            the time step to try.
+        """
+        return max(min(dt, self._dt_next, self._safety * self._limit), self._dt_min)
+
+    def accept(self, dt: float, elapsed: float = 0.0, indicator: Optional[float] = None,
+               clipped: bool = False) -> None:
+        """Records an accepted time step and predicts the next one.
+
+        Parameters
+        ----------
+        dt : float
+            accepted time step.
+        elapsed : float
+            time (in seconds) spent computing it.
+        indicator : float
+            value of the indicator for this time step (ignored if the controller has its own), None
+            if unknown.
+        clipped : bool
+            True if dt was cut below the proposed time step for another reason than its difficulty
+            (end of a coupling window, final time...): the time step only counts in the statistics
+            and the prediction is kept.
+        """
+        self.n_accepted += 1
+        self.solve_time += elapsed
+        self._limit *= self.limit_growth
+        if clipped:
+            return
+        if self._indicator is not None:
+            indicator = self._indicator()
+        if indicator is None:
+            self._dt_next = dt * self._factor_max
+            return
+        error = log(max(indicator, 1.e-10) / self._target)
+        if not self._history:
+            self._errors[:] = (error, error)
+            self._history = True
+        previous, second = self._errors
+        log_factor = -(self._ki * error + self._kp * (error - previous)
+                       + self._kd * (error - 2.0 * previous + second))
+        self._errors[:] = (error, previous)
+        factor = min(max(exp(log_factor), self._factor_min), self._factor_max)
+        self._dt_next = dt * factor
+
+    def reject(self, dt: float, elapsed: float = 0.0) -> float:
+        """Records a rejected time step, returns the time step of the retry.
+
+        Parameters
+        ----------
+        dt : float
+            rejected time step.
+        elapsed : float
+            time (in seconds) spent before the rejection.
+
+        Returns
+        -------
+        float
+            the time step to retry.
+        """
+        self.n_rejected += 1
+        self.wasted_time += elapsed
+        self._limit = min(self._limit, dt)
+        self._dt_next = max(dt * self._reject_factor, self._dt_min)
+        return self._dt_next
@@ -0,0 +1,193 @@
+"""
+asyncio facade of :class:`icoco.problem.Problem`.
+
+:class:`AsyncProblem` exposes awaitable versions of the ICoCo methods of a problem: the calls run in
+an executor so that a (long) ``solveTimeStep`` does not block the event loop. The module functions
+help stepping several problems concurrently, for instance::
+
+    problems = [AsyncProblem(problem) for problem in coupled_problems]
+    dt = await compute_time_step(problems)
+    if dt > 0.0:
+        await try_time_step(problems, dt, exchange=exchange)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Sequence
+
+from .utils import ICoCoExtensions, ICoCoMethods
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .problem import Problem  # pylint: disable=unused-import
+
+
+class AsyncProblem:
+    """Facade of a problem with awaitable ICoCo methods.
+
+    Each ICoCo method of the problem (except the static ``GetICoCoMajorVersion``) has an awaitable
+    counterpart of the same name, executed by the executor of the facade::
+
+        converged = await AsyncProblem(problem).solveTimeStep()
+
+    By default, the facade owns an executor with a single thread: the calls to the problem are
+    serialized and always made from the same thread, which suits codes which are not thread-safe.
+    It is released by :meth:`close` (or at the exit of a ``with`` statement).
+    """
+
+    def __init__(self, problem: Problem, executor: Optional[Executor] = None) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        problem : Problem
+            the problem to drive.
+        executor : Executor
+            executor running the calls to the problem. If None, a dedicated single thread executor
+            is created (and shut down by :meth:`close`).
+        """
+        self._problem = problem
+        self._own_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="icoco-async")
+        self._executor = executor
+
+    def __enter__(self) -> AsyncProblem:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def problem(self) -> Problem:
+        """The problem driven by the facade."""
+        return self._problem
+
+    @property
+    def executor(self) -> Executor:
+        """Executor running the calls to the problem."""
+        return self._executor
+
+    def close(self) -> None:
+        """Shuts down the executor if owned by the facade."""
+        if self._own_executor:
+            self._executor.shutdown(wait=True)
+
+    async def call(self, name: str, *args, **kwargs) -> Any:
+        """Calls a method of the problem in the executor.
+
+        Parameters
+        ----------
+        name : str
+            name of the method.
+        args, kwargs
+            arguments of the method.
+
+        Returns
+        -------
+        Any
+            value returned by the method.
+        """
+        method = getattr(self._problem, name)
+        if kwargs:
+            method = functools.partial(method, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, method, *args)
+
+
+def _awaitable(name: str):
+    """Returns the awaitable counterpart of ICoCo method name."""
+
+    async def method(self, *args, **kwargs):
+        return await self.call(name, *args, **kwargs)
+
+    method.__name__ = name
+    method.__qualname__ = f"AsyncProblem.{name}"
+    method.__doc__ = f"Awaitable version of :meth:`icoco.problem.Problem.{name}`."
+    return method
+
+
+for _name in ICoCoMethods.ALL + ICoCoExtensions.ALL:
+    if _name != "GetICoCoMajorVersion":
+        setattr(AsyncProblem, _name, _awaitable(_name))
+
+
+async def gather(problems: Sequence[AsyncProblem], name: str, *args, **kwargs) -> List[Any]:
+    """Calls the same ICoCo method on all problems concurrently.
+
+    Parameters
+    ----------
+    problems : Sequence[AsyncProblem]
+        problems to call.
+    name : str
+        name of the ICoCo method.
+    args, kwargs
+        arguments of the method.
+
+    Returns
+    -------
+    List[Any]
+        values returned by each problem, in order.
+    """
+    return list(await asyncio.gather(*[problem.call(name, *args, **kwargs)
+                                       for problem in problems]))
+
+
+async def compute_time_step(problems: Sequence[AsyncProblem]) -> float:
+    """Negotiates the time step among the problems.
+
+    Parameters
+    ----------
+    problems : Sequence[AsyncProblem]
+        coupled problems.
+
+    Returns
+    -------
+    float
+        minimum of the preferred time steps, or a negative value if a problem requests to stop.
+    """
+    results = await gather(problems, "computeTimeStep")
+    if any(stop for _, stop in results):
+        return -1.0
+    return min(dt for dt, _ in results)
+
+
+async def try_time_step(problems: Sequence[AsyncProblem],
+                        dt: float,
+                        exchange: Optional[Callable[[], Any]] = None) -> bool:
+    """Computes a coupled time step with the problems running concurrently.
+
+    ``initTimeStep`` is called on all problems, then ``exchange``, then ``solveTimeStep``. If all
+    the problems succeeded, the time step is validated, otherwise it is aborted (on the problems
+    which entered the TIME_STEP_DEFINED context).
+
+    Parameters
+    ----------
+    problems : Sequence[AsyncProblem]
+        coupled problems.
+    dt : float
+        time step.
+    exchange : Callable[[], Any]
+        function or coroutine function exchanging data between the problems in the
+        TIME_STEP_DEFINED context.
+
+    Returns
+    -------
+    bool
+        True if the time step is validated, False if it is aborted.
+    """
+    entered = await gather(problems, "initTimeStep", dt)
+    success = all(entered)
+    if success:
+        if exchange is not None:
+            result = exchange()
+            if inspect.isawaitable(result):
+                await result
+        success = all(await gather(problems, "solveTimeStep"))
+    if success:
+        await gather(problems, "validateTimeStep")
+    else:
+        await gather([problem for problem, ok in zip(problems, entered) if ok], "abortTimeStep")
+    return success
@@ -0,0 +1,402 @@
+"""
+Disk checkpoints for :meth:`icoco.problem.Problem.save` (typically with ``method="file"``).
+
+:class:`DiskCheckpoints` snapshots a state in memory (see :func:`icoco.state_store.snapshot`: the
+NumPy arrays are copied into staging buffers) and writes it to disk from a background thread while
+the computation goes on. A problem delegates its save/restore methods to it, for instance::
+
+    def save(self, label: int, method: str) -> None:
+        self._checkpoints.save(label, method, (self._time, self._field))
+
+    def restore(self, label: int, method: str) -> None:
+        self._time, self._field = self._checkpoints.restore(label, method)
+
+    def forget(self, label: int, method: str) -> None:
+        self._checkpoints.forget(label, method)
+
+File format (little endian): the magic ``ICOCOCKP``, the format version (uint8), the compression
+(uint8, see :attr:`DiskCheckpoints.COMPRESSIONS`), the chunk size (uint32) and the number of
+sections (uint32). Then each section (the pickle stream, then each out-of-band buffer): its size
+(uint64) followed by its chunks, each one being its stored size (uint32) and its (compressed) bytes.
+
+:class:`MappedCheckpoints` writes uncompressed files whose sections start on page boundaries:
+the magic ``ICOCOMAP``, the format version (uint8), 3 padding bytes, the number of sections
+(uint32), then the offset and the size (uint64) of each section. Its restore maps the file instead
+of reading it: the arrays of the state are copy-on-write views on the file, loaded by the OS when
+touched.
+"""
+
+from __future__ import annotations
+
+import itertools
+import lzma
+import mmap
+import os
+import struct
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import numpy as np
+
+from .exception import WrongArgument
+from .state_store import StateKey, load, snapshot
+
+_MAGIC = b"ICOCOCKP"
+_VERSION = 1
+_HEADER = struct.Struct("<8sBBII")
+_SECTION = struct.Struct("<Q")
+_CHUNK = struct.Struct("<I")
+_MAPPED_MAGIC = b"ICOCOMAP"
+_MAPPED_HEADER = struct.Struct("<8sBxxxI")
+_INDEX = struct.Struct("<QQ")
+
+_COMPRESSORS: Dict[int, Tuple[Callable[[Any, int], bytes], Callable[[bytes], bytes]]] = {
+    1: (zlib.compress, zlib.decompress),
+    2: (lambda chunk, level: lzma.compress(chunk, preset=level), lzma.decompress),
+}
+
+
+class _Write:  # pylint: disable=too-few-public-methods
+    """Pending write of a checkpoint."""
+
+    __slots__ = ("future", "cancelled")
+
+    def __init__(self) -> None:
+        self.future: Optional[Future] = None
+        self.cancelled = False
+
+
+class DiskCheckpoints:  # pylint: disable=too-many-instance-attributes
+    """Checkpoints written to disk by a background thread (write-behind).
+
+    :meth:`save` returns as soon as the state is copied in memory. The writes are made in order by
+    a single background thread, into a temporary file renamed once complete, so that a checkpoint
+    file is always complete. :meth:`restore` waits for the pending write of the checkpoint (if
+    any), :meth:`forget` cancels it (or deletes the file). Checkpoints files already present in the
+    directory (from a previous run) can be restored.
+
+    Errors of the background writes are raised by the next :meth:`restore` of the checkpoint, or by
+    :meth:`flush`. The background thread is stopped by :meth:`close` (or at the exit of a ``with``
+    statement), which waits for the pending writes.
+    """
+
+    COMPRESSIONS = {"none": 0, "zlib": 1, "lzma": 2}
+    """Compression codes, by name."""
+
+    def __init__(self,  # pylint: disable=too-many-arguments
+                 directory: str,
+                 compression: str = "none",
+                 level: int = 1,
+                 chunk_size: int = 1 << 22,
+                 *,
+                 background: bool = True,
+                 name: str = "DiskCheckpoints") -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        directory : str
+            directory of the checkpoint files (created if needed).
+        compression : str
+            compression of the chunks, one of :attr:`COMPRESSIONS`.
+        level : int
+            compression level (zlib level or lzma preset).
+        chunk_size : int
+            size (in bytes) of the chunks.
+        background : bool
+            if False, :meth:`save` writes the checkpoint before returning.
+        name : str
+            name of the problem owning the checkpoints, used in exception messages.
+
+        Raises
+        ------
+        WrongArgument
+            if the compression is unknown.
+        """
+        if compression not in self.COMPRESSIONS:
+            raise WrongArgument(prob=name, method="DiskCheckpoints", arg="compression",
+                                condition=f"'{compression}' is not one of "
+                                f"{list(self.COMPRESSIONS)}")
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._compression = self.COMPRESSIONS[compression]
+        self._level = level
+        self._chunk_size = chunk_size
+        self._name = name
+        self._executor = None
+        if background:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="icoco-ckpt")
+        self._pending: Dict[StateKey, _Write] = {}
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+
+    def __enter__(self) -> DiskCheckpoints:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def directory(self) -> str:
+        """Directory of the checkpoint files."""
+        return self._directory
+
+    @property
+    def pending(self) -> int:
+        """Number of checkpoints not written yet."""
+        with self._lock:
+            return len(self._pending)
+
+    def path(self, label: int, method: str) -> str:
+        """Returns the path of the file of a checkpoint.
+
+        Parameters
+        ----------
+        label : int
+            label of the checkpoint.
+        method : str
+            method of the checkpoint.
+
+        Returns
+        -------
+        str
+            the path of the file.
+        """
+        return os.path.join(self._directory, f"{quote(method, safe='')}-{label}.ckpt")
+
+    def save(self, label: int, method: str, state: Any) -> None:
+        """Copies a state in memory and schedules its write.
+
+        Parameters
+        ----------
+        label : int
+            label of the checkpoint.
+        method : str
+            method of the checkpoint.
+        state : Any
+            picklable state.
+        """
+        data, buffers = snapshot(state)
+        key = (label, method)
+        if self._executor is None:
+            self._write(key, None, data, buffers)
+            return
+        self._cancel(key)
+        write = _Write()
+        with self._lock:
+            self._pending[key] = write
+            write.future = self._executor.submit(self._write, key, write, data, buffers)
+
+    def _write(self, key: StateKey, write: Optional[_Write], data: bytes,
+               buffers: List[bytearray]) -> None:
+        """Writes a checkpoint into a temporary file, renamed once complete."""
+        path = self.path(*key)
+        temporary = f"{path}.{os.getpid()}.{next(self._counter)}.tmp"
+        try:
+            with open(temporary, "wb") as stream:
+                self._write_file(stream, data, buffers, write)
+            if write is None or not write.cancelled:
+                os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        if write is not None:
+            # a failed write stays pending, so that its error is raised by restore or flush
+            with self._lock:
+                if self._pending.get(key) is write:
+                    del self._pending[key]
+
+    def _write_file(self, stream: BinaryIO, data: bytes, buffers: List[bytearray],
+                    write: Optional[_Write]) -> None:
+        """Writes the header and the sections of a checkpoint file."""
+        stream.write(_HEADER.pack(_MAGIC, _VERSION, self._compression, self._chunk_size,
+                                  1 + len(buffers)))
+        for section in [data] + buffers:
+            self._write_section(stream, memoryview(section), write)
+
+    def _write_section(self, stream: BinaryIO, section: memoryview,
+                       write: Optional[_Write]) -> None:
+        """Writes a section, chunk by chunk (stops if the write is cancelled)."""
+        stream.write(_SECTION.pack(section.nbytes))
+        compress = _COMPRESSORS[self._compression][0] if self._compression else None
+        for start in range(0, section.nbytes, self._chunk_size):
+            if write is not None and write.cancelled:
+                return
+            chunk = section[start:start + self._chunk_size]
+            if compress is not None:
+                chunk = compress(chunk, self._level)
+            stream.write(_CHUNK.pack(len(chunk)))
+            stream.write(chunk)
+
+    def flush(self) -> None:
+        """Waits for all the pending writes.
+
+        Raises
+        ------
+        Exception
+            the first error of the pending writes, if any.
+        """
+        with self._lock:
+            writes = list(self._pending.values())
+        for write in writes:
+            write.future.result()
+
+    def restore(self, label: int, method: str) -> Any:
+        """Reads a checkpoint, after waiting for its pending write (if any).
+
+        Parameters
+        ----------
+        label : int
+            label of the checkpoint.
+        method : str
+            method of the checkpoint.
+
+        Returns
+        -------
+        Any
+            the state (its NumPy arrays are writable).
+
+        Raises
+        ------
+        WrongArgument
+            if the checkpoint is unknown or its file is not a checkpoint.
+        """
+        with self._lock:
+            write = self._pending.get((label, method))
+        if write is not None:
+            write.future.result()
+        path = self.path(label, method)
+        if not os.path.exists(path):
+            raise WrongArgument(prob=self._name, method="restore", arg="(label, method)",
+                                condition=f"({label}, {method}) is not a known save state")
+        return self._read_file(path)
+
+    def _not_a_checkpoint(self, path: str) -> WrongArgument:
+        """Returns the exception raised when restoring an invalid file."""
+        return WrongArgument(prob=self._name, method="restore", arg="(label, method)",
+                             condition=f"{path} is not a checkpoint file")
+
+    def _read_file(self, path: str) -> Any:
+        """Reads the state of a checkpoint file."""
+        if os.path.getsize(path) < _HEADER.size:
+            raise self._not_a_checkpoint(path)
+        with open(path, "rb") as stream:
+            magic, version, compression, chunk_size, n_sections = _HEADER.unpack(
+                stream.read(_HEADER.size))
+            if magic != _MAGIC or version != _VERSION:
+                raise self._not_a_checkpoint(path)
+            sections = [self._read_section(stream, compression, chunk_size)
+                        for _ in range(n_sections)]
+        return load(bytes(sections[0]), sections[1:])
+
+    @staticmethod
+    def _read_section(stream: BinaryIO, compression: int, chunk_size: int) -> bytearray:
+        """Reads a section into a new buffer."""
+        size, = _SECTION.unpack(stream.read(_SECTION.size))
+        section = bytearray(size)
+        view = memoryview(section)
+        for start in range(0, size, chunk_size):
+            stored, = _CHUNK.unpack(stream.read(_CHUNK.size))
+            if compression:
+                view[start:start + chunk_size] = _COMPRESSORS[compression][1](stream.read(stored))
+            else:
+                stream.readinto(view[start:start + stored])
+        return section
+
+    def _cancel(self, key: StateKey) -> None:
+        """Cancels the pending write of key (waits for it if it can not be cancelled)."""
+        with self._lock:
+            write = self._pending.pop(key, None)
+        if write is not None:
+            write.cancelled = True
+            if not write.future.cancel():
+                try:
+                    write.future.result()
+                except Exception:  # pylint: disable=broad-exception-caught
+                    pass
+
+    def forget(self, label: int, method: str) -> None:
+        """Cancels the pending write of a checkpoint and deletes its file (if any).
+
+        Parameters
+        ----------
+        label : int
+            label of the checkpoint.
+        method : str
+            method of the checkpoint.
+        """
+        self._cancel((label, method))
+        path = self.path(label, method)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def close(self) -> None:
+        """Waits for the pending writes and stops the background thread."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+class MappedCheckpoints(DiskCheckpoints):
+    """Checkpoints with page-aligned arrays, restored by memory mapping (see module documentation).
+
+    Restoring a checkpoint only reads its header and its pickle stream: the time to restore does
+    not depend on the size of the arrays, which are loaded page by page when used. The arrays are
+    writable, but their modifications are private (copy-on-write): the file is never modified.
+    """
+
+    def __init__(self,
+                 directory: str,
+                 chunk_size: int = 1 << 22,
+                 *,
+                 background: bool = True,
+                 name: str = "MappedCheckpoints") -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        directory : str
+            directory of the checkpoint files (created if needed).
+        chunk_size : int
+            size (in bytes) of the writes (a pending write can be cancelled between two writes).
+        background : bool
+            if False, :meth:`save` writes the checkpoint before returning.
+        name : str
+            name of the problem owning the checkpoints, used in exception messages.
+        """
+        super().__init__(directory, chunk_size=chunk_size, background=background, name=name)
+
+    def _write_file(self, stream: BinaryIO, data: bytes, buffers: List[bytearray],
+                    write: Optional[_Write]) -> None:
+        sections = [data] + buffers
+        offsets = []
+        offset = _MAPPED_HEADER.size + _INDEX.size * len(sections)
+        for section in sections:
+            offset = -(-offset // mmap.PAGESIZE) * mmap.PAGESIZE
+            offsets.append(offset)
+            offset += len(section)
+        stream.write(_MAPPED_HEADER.pack(_MAPPED_MAGIC, _VERSION, len(sections)))
+        stream.write(b"".join(_INDEX.pack(offset, len(section))
+                              for offset, section in zip(offsets, sections)))
+        for offset, section in zip(offsets, sections):
+            stream.seek(offset)
+            view = memoryview(section)
+            for start in range(0, view.nbytes, self._chunk_size):
+                if write is not None and write.cancelled:
+                    return
+                stream.write(view[start:start + self._chunk_size])
+
+    def _read_file(self, path: str) -> Any:
+        if os.path.getsize(path) < _MAPPED_HEADER.size:
+            raise self._not_a_checkpoint(path)
+        mapped = np.memmap(path, dtype=np.uint8, mode="c")
+        magic, version, n_sections = _MAPPED_HEADER.unpack(mapped[:_MAPPED_HEADER.size])
+        if magic != _MAPPED_MAGIC or version != _VERSION:
+            raise self._not_a_checkpoint(path)
+        index = np.frombuffer(mapped, dtype="<u8", count=2 * n_sections,
+                              offset=_MAPPED_HEADER.size).reshape(n_sections, 2)
+        sections = [mapped[offset:offset + size] for offset, size in index.tolist()]
+        return load(sections[0].tobytes(), sections[1:])
@@ -0,0 +1,177 @@
+"""
+Enforcement of the ICoCo context rules listed in :class:`icoco.utils.ICoCoMethodContext`.
+
+The rules are compiled once, at import, into one integer mask per method. A problem instance is
+always in exactly one state of :class:`ContextState` (a single bit) so that checking whether a
+method may be called is a single bitwise test.
+
+Use the :func:`check_context` class decorator to enforce the rules on any
+:class:`icoco.problem.Problem` subclass. With ``enabled=False`` (the default when Python runs with
+``-O``) the decorator returns the class untouched: no wrapper is left in the call path.
+"""
+
+from __future__ import annotations
+
+import functools
+from typing import Callable, Dict, Optional, Type, TypeVar
+
+from .exception import WrongContext
+from .utils import ICoCoMethodContext, ICoCoMethods
+
+
+class ContextState:  # pylint: disable=too-few-public-methods
+    """Namespace listing the states of the ICoCo context state machine (one bit each)."""
+
+    NOT_INITIALIZED = 1
+    """Before ``initialize`` or after ``terminate``."""
+
+    OUTSIDE_TIME_STEP = 2
+    """After ``initialize``, outside the TIME_STEP_DEFINED context."""
+
+    INSIDE_TIME_STEP = 4
+    """After ``initialize``, inside the TIME_STEP_DEFINED context."""
+
+    ANY = NOT_INITIALIZED | OUTSIDE_TIME_STEP | INSIDE_TIME_STEP
+    """Mask of methods which can be called whatever the state."""
+
+
+def _compile_masks() -> Dict[str, int]:
+    """Compiles ICoCoMethodContext lists into one mask of allowed states per method."""
+    masks = {}
+    for name in ICoCoMethods.ALL:
+        mask = ContextState.ANY
+        if name in ICoCoMethodContext.ONLY_BEFORE_INITIALIZE:
+            mask &= ContextState.NOT_INITIALIZED
+        if name in ICoCoMethodContext.ONLY_AFTER_INITIALIZE:
+            mask &= ContextState.OUTSIDE_TIME_STEP | ContextState.INSIDE_TIME_STEP
+        if name in ICoCoMethodContext.ONLY_INSIDE_TIME_STEP_DEFINED:
+            mask &= ContextState.INSIDE_TIME_STEP
+        if name in ICoCoMethodContext.ONLY_OUTSIDE_TIME_STEP_DEFINED:
+            mask &= ContextState.NOT_INITIALIZED | ContextState.OUTSIDE_TIME_STEP
+        masks[name] = mask
+    return masks
+
+
+CONTEXT_MASKS: Dict[str, int] = _compile_masks()
+"""Mask of the allowed :class:`ContextState` for each ICoCo method."""
+
+CONTEXT_TRANSITIONS: Dict[str, int] = {
+    "initialize": ContextState.OUTSIDE_TIME_STEP,
+    "terminate": ContextState.NOT_INITIALIZED,
+    "initTimeStep": ContextState.INSIDE_TIME_STEP,
+    "validateTimeStep": ContextState.OUTSIDE_TIME_STEP,
+    "abortTimeStep": ContextState.OUTSIDE_TIME_STEP,
+}
+"""State reached after a successful call (a call which does not return ``False``)."""
+
+
+def get_context_state(problem) -> int:
+    """Returns the current :class:`ContextState` of a problem checked by :func:`check_context`.
+
+    Parameters
+    ----------
+    problem : icoco.problem.Problem
+        instance of a class decorated by :func:`check_context`.
+
+    Returns
+    -------
+    int
+        one of the :class:`ContextState` values.
+    """
+    return problem._icoco_state  # pylint: disable=protected-access
+
+
+def _precondition(state: int, mask: int) -> str:
+    """Describes why a method with the given mask cannot be called in the given state."""
+    if state == ContextState.NOT_INITIALIZED:
+        return "called before initialize() or after terminate()"
+    if mask == ContextState.NOT_INITIALIZED:
+        return "called after initialize()"
+    if state == ContextState.INSIDE_TIME_STEP:
+        return "called inside the TIME_STEP_DEFINED context"
+    return "called outside the TIME_STEP_DEFINED context"
+
+
+def _wrong_context(problem, name: str, mask: int) -> WrongContext:
+    """Builds the exception raised when a method is called in a wrong context."""
+    # pylint: disable=protected-access
+    return WrongContext(prob=problem._problem_name,
+                        method=name,
+                        precondition=_precondition(problem._icoco_state, mask))
+
+
+def _checked(func: Callable, name: str, mask: int, target: Optional[int]) -> Callable:
+    """Wraps an ICoCo method with its context check and (optional) state transition."""
+    # pylint: disable=protected-access
+
+    if target is None:
+        @functools.wraps(func)
+        def checked(self, *args, **kwargs):
+            if self._icoco_state & mask:
+                return func(self, *args, **kwargs)
+            raise _wrong_context(self, name, mask)
+    else:
+        @functools.wraps(func)
+        def checked(self, *args, **kwargs):
+            if self._icoco_state & mask:
+                result = func(self, *args, **kwargs)
+                if result is not False:
+                    self._icoco_state = target
+                return result
+            raise _wrong_context(self, name, mask)
+
+    return checked
+
+
+ProblemClass = TypeVar("ProblemClass", bound=type)
+
+
+def check_context(cls: Optional[ProblemClass] = None, *,
+                  enabled: bool = __debug__) -> ProblemClass:
+    """Class decorator enforcing :class:`icoco.utils.ICoCoMethodContext` rules.
+
+    The decorated class is replaced by a subclass (with the same name and module) whose ICoCo
+    methods first check the current :class:`ContextState` and raise
+    :class:`icoco.exception.WrongContext` when called in a wrong context. Methods which can be
+    called in any context are not wrapped.
+
+    The state moves on after ``initialize``, ``initTimeStep`` (unless they return ``False``),
+    ``validateTimeStep``, ``abortTimeStep`` and ``terminate``. It does not move if the method
+    raises.
+
+    Note that methods overridden in a subclass of the decorated class are not checked anymore:
+    decorate the most derived class.
+
+    Parameters
+    ----------
+    cls : type
+        :class:`icoco.problem.Problem` subclass to check. Usable as ``@check_context`` or
+        ``@check_context(enabled=...)``.
+    enabled : bool
+        if False ("release" mode), the class is returned unchanged and nothing is checked.
+        Defaults to ``__debug__``, hence checks are disabled with ``python -O``.
+
+    Returns
+    -------
+    type
+        the checked class (or ``cls`` itself in release mode).
+    """
+
+    def decorate(klass: Type) -> Type:
+        if not enabled:
+            return klass
+        namespace = {"__module__": klass.__module__,
+                     "__qualname__": klass.__qualname__,
+                     "__doc__": klass.__doc__,
+                     "_icoco_state": ContextState.NOT_INITIALIZED,
+                     "detect_implemented_methods": classmethod(
+                         lambda _: klass.implemented_methods())}
+        for name, mask in CONTEXT_MASKS.items():
+            if mask != ContextState.ANY:
+                namespace[name] = _checked(getattr(klass, name), name, mask,
+                                           CONTEXT_TRANSITIONS.get(name))
+        return type(klass)(klass.__name__, (klass,), namespace)
+
+    if cls is None:
+        return decorate
+    return decorate(cls)
@@ -0,0 +1,420 @@
+"""
+Explicit coupling time loop for several :class:`icoco.problem.Problem` instances.
+
+See :class:`CouplingDriver`.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .adaptive import TimeStepController  # pylint: disable=unused-import
+    from .problem import Problem  # pylint: disable=unused-import
+
+
+class CouplingPhase:  # pylint: disable=too-few-public-methods
+    """Namespace listing the phases timed by :class:`CouplingDriver`."""
+
+    COMPUTE = 0
+    """Time step negotiation (``computeTimeStep``)."""
+    INIT = 1
+    """Time step initialization (``initTimeStep``)."""
+    EXCHANGE = 2
+    """Exchange callbacks."""
+    SOLVE = 3
+    """Time step resolution (``solveTimeStep``)."""
+    VALIDATE = 4
+    """Time step validation (``validateTimeStep``)."""
+    ABORT = 5
+    """Time step abortion (``abortTimeStep``)."""
+
+    NAMES = ["computeTimeStep", "initTimeStep", "exchange",
+             "solveTimeStep", "validateTimeStep", "abortTimeStep"]
+    """Names of the phases, in the order of their index."""
+
+
+class CouplingDriver:  # pylint: disable=too-many-instance-attributes
+    """Explicit coupling of N problems.
+
+    Each time step:
+
+    - the time step is the minimum of the time steps returned by ``computeTimeStep``. The loop stops
+      if any problem requests it;
+    - ``initTimeStep`` is called on each problem;
+    - the exchange callbacks are called (in the TIME_STEP_DEFINED context);
+    - ``solveTimeStep`` is called on each problem;
+    - if all problems succeeded, ``validateTimeStep`` is called on each problem. Otherwise,
+      ``abortTimeStep`` is called on the problems inside the TIME_STEP_DEFINED context and the time
+      step is retried with a time step multiplied by ``dt_factor``.
+
+    With a ``controller`` (see :class:`icoco.adaptive.TimeStepController`), the time step is the
+    one predicted by the controller (bounded by the time steps of the problems), and the retries use
+    the time step it returns on rejection. The controller is given the wall time of each accepted
+    and rejected time step. A time step cut by ``dt_max`` (see :meth:`step`) is not used to
+    predict the next one.
+
+    The bound methods of the problems are resolved once, at construction, so that the sequential
+    loop does not allocate any container. The cumulated time spent in each :class:`CouplingPhase`
+    is available from :attr:`timings`.
+
+    With ``max_workers > 0``, ``initTimeStep``, ``solveTimeStep`` and ``iterateTimeStep`` of the
+    problems are dispatched to a thread pool and joined before the next phase. This is worth it
+    when the problems release the GIL (compiled codes wrapped with SWIG or PyBind11). The problems
+    listed in ``thread_unsafe`` are always called from the calling thread (while the others are
+    running). If problems raise, the exception of the first failing problem (in the order of
+    ``problems``) is propagated, but only once all the calls returned. A problem whose
+    ``initTimeStep`` raised is considered as not in the TIME_STEP_DEFINED context (it is not
+    aborted by :meth:`abort_time_step`). The thread pool is released by :meth:`close` (or at the
+    exit of a ``with`` statement).
+    """
+
+    def __init__(self,  # pylint: disable=too-many-arguments
+                 problems: Sequence[Problem],
+                 exchanges: Sequence[Callable[[], None]] = (),
+                 dt_factor: float = 0.5,
+                 max_retries: int = 10,
+                 *,
+                 max_workers: int = 0,
+                 thread_unsafe: Sequence[Problem] = (),
+                 controller: Optional[TimeStepController] = None) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        problems : Sequence[Problem]
+            coupled problems.
+        exchanges : Sequence[Callable[[], None]]
+            callbacks called in the TIME_STEP_DEFINED context before the resolution, in order.
+        dt_factor : float
+            factor applied to the time step after a failed resolution.
+        max_retries : int
+            maximum number of retries of a failed time step.
+        max_workers : int
+            number of threads used to run the problems concurrently, 0 to run them sequentially.
+        thread_unsafe : Sequence[Problem]
+            problems which must be called from the calling thread only.
+        controller : TimeStepController
+            adaptive time-step controller, None to use ``dt_factor``.
+        """
+        self._problems = tuple(problems)
+        self._exchanges = tuple(exchanges)
+        self._dt_factor = dt_factor
+        self._max_retries = max_retries
+        self._controller = controller
+        self._compute = tuple(problem.computeTimeStep for problem in self._problems)
+        self._init = tuple(problem.initTimeStep for problem in self._problems)
+        self._solve = tuple(problem.solveTimeStep for problem in self._problems)
+        self._iterate = tuple(problem.iterateTimeStep for problem in self._problems)
+        self._validate = tuple(problem.validateTimeStep for problem in self._problems)
+        self._abort = tuple(problem.abortTimeStep for problem in self._problems)
+        self._timings = [0.0] * len(CouplingPhase.NAMES)
+        self._entered = [False] * len(self._problems)
+        self._results = [None] * len(self._problems)
+        self._executor = None
+        if max_workers > 0:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                                thread_name_prefix="icoco")
+            unsafe = {id(problem) for problem in thread_unsafe}
+            self._threaded = tuple(id(problem) not in unsafe for problem in self._problems)
+        self.n_steps = 0
+        """Number of validated time steps."""
+        self.n_aborts = 0
+        """Number of aborted time steps."""
+
+    def __enter__(self) -> CouplingDriver:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Releases the thread pool (if any)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    @property
+    def problems(self) -> Sequence[Problem]:
+        """Coupled problems."""
+        return self._problems
+
+    @property
+    def controller(self) -> Optional[TimeStepController]:
+        """Adaptive time-step controller (None if ``dt_factor`` is used)."""
+        return self._controller
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        """Cumulated time (in seconds) spent in each phase, see :class:`CouplingPhase`."""
+        return dict(zip(CouplingPhase.NAMES, self._timings))
+
+    def reset_timings(self) -> None:
+        """Resets timings and step counters."""
+        self._timings[:] = [0.0] * len(CouplingPhase.NAMES)
+        self.n_steps = 0
+        self.n_aborts = 0
+
+    def initialize(self) -> bool:
+        """Initializes all problems.
+
+        Returns
+        -------
+        bool
+            True if all problems were successfully initialized.
+        """
+        success = True
+        for problem in self._problems:
+            success = problem.initialize() and success
+        return success
+
+    def terminate(self) -> None:
+        """Terminates all problems."""
+        for problem in self._problems:
+            problem.terminate()
+
+    def _dispatch(self, methods: Sequence[Callable], results: List, *args) -> None:
+        """Calls methods concurrently and stores their results once they all returned.
+
+        The result of a method which raised is None. Once all the results are stored, the
+        exception of the first method which raised (in the order of methods) is raised.
+        """
+        threaded = self._threaded
+        submit = self._executor.submit
+        pending = [(index, submit(method, *args))
+                   for index, method in enumerate(methods) if threaded[index]]
+        errors = {}
+        for index, method in enumerate(methods):
+            if not threaded[index]:
+                try:
+                    results[index] = method(*args)
+                except BaseException as error:  # pylint: disable=broad-exception-caught
+                    results[index] = None
+                    errors[index] = error
+        wait([future for _, future in pending])
+        for index, future in pending:
+            error = future.exception()
+            if error is None:
+                results[index] = future.result()
+            else:
+                results[index] = None
+                errors[index] = error
+        if errors:
+            raise errors[min(errors)]
+
+    def compute_time_step(self) -> float:
+        """Negotiates the time step among the problems.
+
+        Returns
+        -------
+        float
+            minimum of the preferred time steps, or a negative value if a problem requests to stop.
+        """
+        start = perf_counter()
+        dt = float("inf")
+        for compute in self._compute:
+            dt_problem, stop = compute()
+            if stop:
+                dt = -1.0
+                break
+            dt = min(dt, dt_problem)
+        self._timings[CouplingPhase.COMPUTE] += perf_counter() - start
+        return dt
+
+    def init_time_step(self, dt: float) -> bool:
+        """Calls ``initTimeStep`` on all problems (sequentially, stops at the first failure).
+
+        Parameters
+        ----------
+        dt : float
+            time step.
+
+        Returns
+        -------
+        bool
+            True if all problems entered the TIME_STEP_DEFINED context.
+        """
+        start = perf_counter()
+        entered = self._entered
+        if self._executor is None:
+            success = True
+            index = 0
+            try:
+                for index, init in enumerate(self._init):
+                    success = entered[index] = success and init(dt)
+            except BaseException:
+                for later in range(index, len(entered)):  # did not enter the time step
+                    entered[later] = False
+                raise
+        else:
+            self._dispatch(self._init, entered, dt)
+            success = all(entered)
+        self._timings[CouplingPhase.INIT] += perf_counter() - start
+        return bool(success)
+
+    def solve_time_step(self) -> bool:
+        """Calls ``solveTimeStep`` on all problems (sequentially, stops at the first failure).
+
+        Returns
+        -------
+        bool
+            True if all problems succeeded.
+        """
+        start = perf_counter()
+        if self._executor is None:
+            success = True
+            for solve in self._solve:
+                if not solve():
+                    success = False
+                    break
+        else:
+            self._dispatch(self._solve, self._results)
+            success = all(self._results)
+        self._timings[CouplingPhase.SOLVE] += perf_counter() - start
+        return success
+
+    def iterate_time_step(self) -> Tuple[bool, bool]:
+        """Calls ``iterateTimeStep`` on all problems.
+
+        Returns
+        -------
+        Tuple[bool, bool]
+            - False if the computation of any problem failed.
+            - True if all problems converged.
+        """
+        start = perf_counter()
+        results = self._results
+        if self._executor is None:
+            for index, iterate in enumerate(self._iterate):
+                results[index] = iterate()
+        else:
+            self._dispatch(self._iterate, results)
+        success = all(result[0] for result in results)
+        converged = all(result[1] for result in results)
+        self._timings[CouplingPhase.SOLVE] += perf_counter() - start
+        return success, converged
+
+    def exchange(self) -> None:
+        """Calls the exchange callbacks."""
+        start = perf_counter()
+        for exchange in self._exchanges:
+            exchange()
+        self._timings[CouplingPhase.EXCHANGE] += perf_counter() - start
+
+    def validate_time_step(self) -> None:
+        """Calls ``validateTimeStep`` on all problems."""
+        start = perf_counter()
+        for validate in self._validate:
+            validate()
+        self.n_steps += 1
+        self._timings[CouplingPhase.VALIDATE] += perf_counter() - start
+
+    def abort_time_step(self) -> None:
+        """Calls ``abortTimeStep`` on the problems which entered the TIME_STEP_DEFINED context."""
+        start = perf_counter()
+        entered = self._entered
+        for index, abort in enumerate(self._abort):
+            if entered[index]:
+                abort()
+        self.n_aborts += 1
+        self._timings[CouplingPhase.ABORT] += perf_counter() - start
+
+    def try_time_step(self, dt: float) -> bool:
+        """Tries to compute a coupled time step, and validates it if all problems succeeded.
+
+        Parameters
+        ----------
+        dt : float
+            time step.
+
+        Returns
+        -------
+        bool
+            True if the time step is validated, False if it is aborted.
+        """
+        if self.init_time_step(dt):
+            self.exchange()
+            if self.solve_time_step():
+                self.validate_time_step()
+                return True
+        self.abort_time_step()
+        return False
+
+    def step(self, dt_max: float = float("inf")) -> bool:
+        """Computes one coupled time step, reducing the time step on failure.
+
+        Parameters
+        ----------
+        dt_max : float
+            upper bound of the time step.
+
+        Returns
+        -------
+        bool
+            False if a problem requested to stop (nothing has been computed), True otherwise.
+
+        Raises
+        ------
+        RuntimeError
+            if the time step still fails after ``max_retries`` reductions.
+        """
+        dt = self.compute_time_step()
+        if dt < 0.0:
+            return False
+        controller = self._controller
+        if controller is not None:
+            dt = controller.propose(dt)
+        clipped = dt_max < dt
+        dt = min(dt, dt_max)
+        retries = 0
+        start = perf_counter()
+        while not self.try_time_step(dt):
+            if controller is not None:
+                end = perf_counter()
+                retry_dt = controller.reject(dt, end - start)
+                start = end
+            else:
+                retry_dt = dt * self._dt_factor
+            if retries == self._max_retries:
+                raise RuntimeError(f"Coupled time step failed {retries + 1} times, last dt={dt}")
+            retries += 1
+            dt = retry_dt
+        if controller is not None:
+            controller.accept(dt, perf_counter() - start, self._indicator(),
+                              clipped=clipped and retries == 0)
+        return True
+
+    def _indicator(self) -> Optional[float]:
+        """Returns the indicator of the last accepted time step given to the controller."""
+        return None
+
+    def run(self, time_max: float = float("inf"), max_steps: Optional[int] = None) -> int:
+        """Runs the time loop until a problem requests to stop, ``time_max`` is reached or
+        ``max_steps`` time steps are validated.
+
+        The present time is the one of the first problem. ``time_max`` is considered as reached
+        within a relative tolerance of 1e-12.
+
+        Parameters
+        ----------
+        time_max : float
+            final time.
+        max_steps : int
+            maximum number of time steps.
+
+        Returns
+        -------
+        int
+            number of validated time steps.
+        """
+        present_time = self._problems[0].presentTime
+        n_steps = 0
+        while max_steps is None or n_steps < max_steps:
+            time = present_time()
+            remaining = time_max - time
+            if remaining <= 1.e-12 * max(1.0, abs(time)) or not self.step(dt_max=remaining):
+                break
+            n_steps += 1
+        return n_steps
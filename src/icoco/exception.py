@@ -8,6 +8,9 @@ The official version can be found at the following URL:
 https://github.com/cea-trust-platform/icoco-coupling
 
 This module contains the exceptions for ICoCo specifications.
+
+The messages are formatted when the exceptions are printed (``str``), not when they are raised:
+exceptions raised and caught do not pay for it.
 """
 
 
@@ -32,8 +35,12 @@ class WrongContext(Exception):
             detail of the condition that wasn't met
         """
         super().__init__(prob, method, precondition)
-        self._message = (f"WrongContext in Problem instance with name: '{prob}'"
-                         f" in method '{method}' : {precondition}")
+
+    @property
+    def _message(self) -> str:
+        prob, method, precondition = self.args
+        return (f"WrongContext in Problem instance with name: '{prob}'"
+                f" in method '{method}' : {precondition}")
 
     def __str__(self) -> str:
         return self._message
@@ -62,8 +69,12 @@ class WrongArgument(Exception):
             condition detail of the condition that wasn't met
         """
         super().__init__(prob, method, arg, condition)
-        self._message = (f"WrongArgument in Problem instance with name: '{prob}'"
-                         f" in method '{method}', argument '{arg}' : {condition}")
+
+    @property
+    def _message(self) -> str:
+        prob, method, arg, condition = self.args
+        return (f"WrongArgument in Problem instance with name: '{prob}'"
+                f" in method '{method}', argument '{arg}' : {condition}")
 
     def __str__(self) -> str:
         return self._message
@@ -88,8 +99,11 @@ class NotImplementedMethod(NotImplementedError):
             name of the method where the exception occurred
         """
         super().__init__(prob, method)
-        self._message = (f"NotImplemented in Problem instance with name: '{prob}'"
-                         f" in method '{method}'")
+
+    @property
+    def _message(self) -> str:
+        prob, method = self.args
+        return f"NotImplemented in Problem instance with name: '{prob}' in method '{method}'"
 
     def __str__(self) -> str:
         return self._message
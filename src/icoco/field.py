@@ -0,0 +1,316 @@
+"""
+Lightweight NumPy-backed fields, usable without medcoupling.
+
+A :class:`Field` holds a name, a unit, a time, a nature and a C-contiguous NumPy array of shape
+``(number of tuples, number of components)``, defined on an optional :class:`Mesh`. Codes which do
+not depend on medcoupling may exchange such fields through the Field I/O methods of
+:class:`icoco.problem.Problem` (``getOutputMEDDoubleField``, ``setInputMEDDoubleField``...): the
+values are accessed without copy, through ``np.asarray(field)`` (or any consumer of the NumPy
+``__array_interface__``) or the buffer protocol: ``memoryview(field)`` on Python >= 3.12,
+``memoryview(field.array)`` before.
+
+:meth:`Field.to_medcoupling` and :meth:`Field.from_medcoupling` convert from and to medcoupling
+fields, medcoupling being imported only then.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from .exception import WrongArgument
+
+if TYPE_CHECKING:  # pragma: no cover
+    class medcoupling:  # pylint: disable=too-few-public-methods, invalid-name
+        """dummy class for type hinting"""
+        class MEDCouplingField:  # pylint: disable=too-few-public-methods
+            """dummy class for MEDCouplingField type hinting"""
+        class MEDCouplingUMesh:  # pylint: disable=too-few-public-methods
+            """dummy class for MEDCouplingUMesh type hinting"""
+        class MEDCouplingMesh:  # pylint: disable=too-few-public-methods
+            """dummy class for MEDCouplingMesh type hinting"""
+
+
+def _medcoupling():  # pragma: medcoupling
+    """Imports medcoupling."""
+    try:
+        import medcoupling  # pylint: disable=import-outside-toplevel
+    except ImportError as error:
+        raise ImportError("medcoupling is required to convert from or to medcoupling") from error
+    return medcoupling
+
+
+class FieldNature:  # pylint: disable=too-few-public-methods
+    """Natures of a field, named after medcoupling ``NatureOfField``."""
+
+    NO_NATURE = "NoNature"
+    """No nature (default)."""
+    INTENSIVE_MAXIMUM = "IntensiveMaximum"
+    """Intensive field (temperature, density...)."""
+    EXTENSIVE_MAXIMUM = "ExtensiveMaximum"
+    """Extensive field (power, mass...)."""
+    EXTENSIVE_CONSERVATION = "ExtensiveConservation"
+    """Extensive field, conservative interpolation."""
+    INTENSIVE_CONSERVATION = "IntensiveConservation"
+    """Intensive field, conservative interpolation."""
+
+    ALL = (NO_NATURE, INTENSIVE_MAXIMUM, EXTENSIVE_MAXIMUM, EXTENSIVE_CONSERVATION,
+           INTENSIVE_CONSERVATION)
+    """All the natures."""
+
+
+class Mesh:
+    """Minimal unstructured mesh descriptor.
+
+    Cells are described as in medcoupling ``MEDCouplingUMesh``: ``connectivity`` holds, for each
+    cell, its medcoupling geometric type followed by its nodes, and the connectivity of cell ``i``
+    is ``connectivity[connectivity_index[i]:connectivity_index[i + 1]]``.
+    """
+
+    __slots__ = ("name", "dimension", "coordinates", "connectivity", "connectivity_index")
+
+    def __init__(self,
+                 name: str,
+                 dimension: int,
+                 coordinates: np.ndarray,
+                 connectivity: np.ndarray,
+                 connectivity_index: np.ndarray) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        name : str
+            name of the mesh.
+        dimension : int
+            dimension of the cells.
+        coordinates : np.ndarray
+            coordinates of the nodes, of shape (number of nodes, space dimension).
+        connectivity : np.ndarray
+            cell types and nodes, of all the cells.
+        connectivity_index : np.ndarray
+            offsets of the cells in connectivity, of size number of cells + 1.
+        """
+        coordinates = np.ascontiguousarray(coordinates, dtype=np.float64)
+        if coordinates.ndim == 1:
+            coordinates = coordinates.reshape(-1, 1)
+        connectivity = np.ascontiguousarray(connectivity, dtype=np.int64)
+        connectivity_index = np.ascontiguousarray(connectivity_index, dtype=np.int64)
+        if coordinates.ndim != 2:
+            raise WrongArgument(prob=name, method="Mesh", arg="coordinates",
+                                condition=f"shape {coordinates.shape} is not (nodes, dimension)")
+        if (connectivity_index.ndim != 1 or connectivity_index.size == 0
+                or connectivity_index[0] != 0 or connectivity_index[-1] != connectivity.size
+                or np.any(np.diff(connectivity_index) <= 0)):
+            raise WrongArgument(prob=name, method="Mesh", arg="connectivity_index",
+                                condition="must increase from 0 to the size of connectivity")
+        self.name = name
+        """Name of the mesh."""
+        self.dimension = dimension
+        """Dimension of the cells."""
+        self.coordinates = coordinates
+        """Coordinates of the nodes, of shape (number of nodes, space dimension)."""
+        self.connectivity = connectivity
+        """Cell types and nodes, of all the cells."""
+        self.connectivity_index = connectivity_index
+        """Offsets of the cells in connectivity."""
+
+    @property
+    def n_nodes(self) -> int:
+        """Number of nodes."""
+        return self.coordinates.shape[0]
+
+    @property
+    def n_cells(self) -> int:
+        """Number of cells."""
+        return self.connectivity_index.size - 1
+
+    def to_medcoupling(self) -> medcoupling.MEDCouplingUMesh:  # pragma: medcoupling
+        """Returns the equivalent medcoupling mesh (requires medcoupling)."""
+        mc = _medcoupling()
+        mesh = mc.MEDCouplingUMesh(self.name, self.dimension)
+        mesh.setCoords(mc.DataArrayDouble(self.coordinates))
+        ids = np.dtype(f"int{mc.MEDCouplingSizeOfIDs()}")
+        mesh.setConnectivity(mc.DataArrayInt(self.connectivity.astype(ids)),
+                             mc.DataArrayInt(self.connectivity_index.astype(ids)))
+        return mesh
+
+    @classmethod
+    def from_medcoupling(cls, mesh: medcoupling.MEDCouplingMesh) -> Mesh:  # pragma: medcoupling
+        """Returns the descriptor of a medcoupling mesh (unstructured if it was not)."""
+        mesh = mesh.buildUnstructured()
+        return cls(mesh.getName(), mesh.getMeshDimension(), mesh.getCoords().toNumPyArray(),
+                   mesh.getNodalConnectivity().toNumPyArray(),
+                   mesh.getNodalConnectivityIndex().toNumPyArray())
+
+
+class Field:
+    """Field of values stored in a C-contiguous NumPy array.
+
+    The array has the shape ``(number of tuples, number of components)``: one tuple per cell of
+    the mesh, or per node if ``on_nodes``. ``np.asarray(field)`` returns this array without copy,
+    and so do the consumers of ``__array_interface__`` on all Python versions.
+    ``memoryview(field)`` also does on Python >= 3.12 (``__buffer__``, PEP 688); older versions
+    ignore ``__buffer__``, use ``memoryview(field.array)`` there.
+    """
+
+    __slots__ = ("name", "unit", "time", "nature", "on_nodes", "mesh", "_array")
+
+    def __init__(self,  # pylint: disable=too-many-arguments
+                 name: str,
+                 array: np.ndarray,
+                 mesh: Optional[Mesh] = None,
+                 *,
+                 unit: str = "",
+                 time: float = 0.0,
+                 nature: str = FieldNature.NO_NATURE,
+                 on_nodes: bool = False) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        name : str
+            name of the field.
+        array : np.ndarray
+            values, of shape (number of tuples, number of components) or (number of tuples, ).
+            Used without copy if already C-contiguous.
+        mesh : Optional[Mesh]
+            support of the field, if any.
+        unit : str
+            unit of the values.
+        time : float
+            time of the values.
+        nature : str
+            one of :attr:`FieldNature.ALL`.
+        on_nodes : bool
+            if True, the values are defined on the nodes of the mesh, otherwise on its cells.
+        """
+        array = np.ascontiguousarray(array)
+        if array.ndim == 1:
+            array = array.reshape(-1, 1)
+        if array.ndim != 2:
+            raise WrongArgument(prob=name, method="Field", arg="array",
+                                condition=f"shape {array.shape} is not (tuples, components)")
+        if nature not in FieldNature.ALL:
+            raise WrongArgument(prob=name, method="Field", arg="nature",
+                                condition=f"'{nature}' is not one of {FieldNature.ALL}")
+        if mesh is not None:
+            size = mesh.n_nodes if on_nodes else mesh.n_cells
+            if array.shape[0] != size:
+                raise WrongArgument(prob=name, method="Field", arg="array",
+                                    condition=f"{array.shape[0]} tuples for {size} "
+                                    f"{'nodes' if on_nodes else 'cells'} of mesh '{mesh.name}'")
+        self.name = name
+        """Name of the field."""
+        self.unit = unit
+        """Unit of the values."""
+        self.time = time
+        """Time of the values."""
+        self.nature = nature
+        """Nature of the field (see :class:`FieldNature`)."""
+        self.on_nodes = on_nodes
+        """Values on the nodes of the mesh if True, on its cells otherwise."""
+        self.mesh = mesh
+        """Support of the field, if any."""
+        self._array = array
+
+    @property
+    def array(self) -> np.ndarray:
+        """Values, of shape (number of tuples, number of components)."""
+        return self._array
+
+    @property
+    def n_tuples(self) -> int:
+        """Number of tuples."""
+        return self._array.shape[0]
+
+    @property
+    def n_components(self) -> int:
+        """Number of components."""
+        return self._array.shape[1]
+
+    def __len__(self) -> int:
+        return self._array.shape[0]
+
+    @property
+    def __array_interface__(self) -> dict:
+        """NumPy array interface of the array (zero-copy access on all Python versions)."""
+        return self._array.__array_interface__
+
+    def __buffer__(self, flags: int) -> memoryview:  # pylint: disable=unused-argument
+        """Buffer protocol of Python >= 3.12 (PEP 688), not used by older versions."""
+        return memoryview(self._array)
+
+    def __repr__(self) -> str:
+        return (f"Field('{self.name}', {self.n_tuples}x{self.n_components} "
+                f"{self._array.dtype}, time={self.time})")
+
+    def copy(self) -> Field:
+        """Returns a copy of the field, with a copy of its array (the mesh is shared)."""
+        return self.with_array(self._array.copy())
+
+    def with_array(self, array: np.ndarray) -> Field:
+        """Returns a field with the same attributes (and mesh) and other values.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            values of the new field, with the same number of tuples.
+        """
+        return Field(self.name, array, self.mesh, unit=self.unit, time=self.time,
+                     nature=self.nature, on_nodes=self.on_nodes)
+
+    def to_medcoupling(self) -> medcoupling.MEDCouplingField:  # pragma: medcoupling
+        """Returns the equivalent medcoupling field (requires medcoupling and a mesh).
+
+        The values are copied into a ``MEDCouplingFieldDouble``, or a ``MEDCouplingFieldInt`` for
+        integer arrays.
+        """
+        mc = _medcoupling()
+        if self.mesh is None:
+            raise WrongArgument(prob=self.name, method="to_medcoupling", arg="mesh",
+                                condition="a mesh is required by medcoupling fields")
+        support = mc.ON_NODES if self.on_nodes else mc.ON_CELLS
+        if np.issubdtype(self._array.dtype, np.integer):
+            field = mc.MEDCouplingFieldInt(support, mc.ONE_TIME)
+            array = mc.DataArrayInt32(self._array.astype(np.int32))
+        else:
+            field = mc.MEDCouplingFieldDouble(support, mc.ONE_TIME)
+            array = mc.DataArrayDouble(self._array.astype(np.float64))
+        array.setInfoOnComponents([f"[{self.unit}]"] * self.n_components)
+        field.setName(self.name)
+        field.setMesh(self.mesh.to_medcoupling())
+        field.setArray(array)
+        field.setTime(self.time, 0, 0)
+        if self.nature != FieldNature.NO_NATURE:
+            field.setNature(getattr(mc, self.nature))
+        return field
+
+    @classmethod
+    def from_medcoupling(cls,
+                         field: medcoupling.MEDCouplingField,
+                         copy: bool = True) -> Field:  # pragma: medcoupling
+        """Returns the equivalent field of a medcoupling field (on cells or nodes).
+
+        Parameters
+        ----------
+        field : medcoupling.MEDCouplingField
+            medcoupling field to convert.
+        copy : bool
+            if False, the array of the field is a view on the medcoupling array, which must then
+            outlive it.
+        """
+        mc = _medcoupling()
+        support = field.getTypeOfField()
+        if support not in (mc.ON_CELLS, mc.ON_NODES):
+            raise WrongArgument(prob=field.getName(), method="from_medcoupling", arg="field",
+                                condition="only fields on cells or nodes are supported")
+        values = field.getArray()
+        array = values.toNumPyArray()
+        unit = values.getInfoOnComponent(0)
+        natures = {getattr(mc, nature): nature for nature in FieldNature.ALL}
+        return cls(field.getName(), array.copy() if copy else array,
+                   Mesh.from_medcoupling(field.getMesh()),
+                   unit=unit[1:-1] if unit.startswith("[") and unit.endswith("]") else unit,
+                   time=field.getTime()[0], nature=natures[field.getNature()],
+                   on_nodes=support == mc.ON_NODES)
@@ -0,0 +1,266 @@
+"""
+Integer handles on the fields and scalar values of a :class:`icoco.problem.Problem`.
+
+The ICoCo API identifies fields and values by name: implementations typically validate the name
+against ``getOutputValuesNames()`` (or the like) and look it up at each call. A
+:class:`HandleRegistry` resolves each name once, after ``initialize``, into an integer handle::
+
+    handles = HandleRegistry(problem)
+    power = handles.resolve("power")
+    for _ in range(n_steps):
+        ...
+        handles.getOutputDoubleValue(power)
+
+:class:`HandleRegistry` itself is the default adapter over the string-based API: names are
+validated once by :meth:`HandleRegistry.resolve`, and the methods taking a handle call the ICoCo
+methods of the problem with the resolved name. For a problem implementing
+:meth:`icoco.problem.Problem.getValuesHandle`, the double and int scalar values are accessed
+instead through the batched methods, with a :class:`icoco.problem.ValuesHandle` of the single
+name obtained once per handle: the code resolves the name once, not at each call. A code may also
+provide a subclass whose methods use the handles directly (for instance as indices in its arrays
+of values), skipping both the lookup and the validation of the names.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from .exception import WrongArgument
+from .problem import Problem, ValueType, ValuesHandle
+
+HANDLE_METHODS = ["getFieldType", "getFieldUnit",
+                  "getInputMEDDoubleFieldTemplate", "setInputMEDDoubleField",
+                  "getOutputMEDDoubleField", "updateOutputMEDDoubleField",
+                  "getInputMEDIntFieldTemplate", "setInputMEDIntField",
+                  "getOutputMEDIntField", "updateOutputMEDIntField",
+                  "getInputMEDStringFieldTemplate", "setInputMEDStringField",
+                  "getOutputMEDStringField", "updateOutputMEDStringField",
+                  "getValueType", "getValueUnit",
+                  "setInputDoubleValue", "getOutputDoubleValue",
+                  "setInputIntValue", "getOutputIntValue",
+                  "setInputStringValue", "getOutputStringValue"]
+"""ICoCo methods identifying a field or a value by name, available with a handle instead."""
+
+_NAMES_METHODS = ["getInputFieldsNames", "getOutputFieldsNames",
+                  "getInputValuesNames", "getOutputValuesNames"]
+
+
+class HandleRegistry:  # pylint: disable=too-many-public-methods
+    """Resolves the names of fields and values of a problem into integer handles.
+
+    For each method of :data:`HANDLE_METHODS`, the registry has a method with the same name taking
+    a handle instead of the name.
+    """
+
+    def __init__(self, problem: Problem, *, validate: bool = True) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        problem : Problem
+            problem whose names are resolved.
+        validate : bool
+            if True, :meth:`resolve` checks the names against the names declared by the problem
+            (``getInputFieldsNames``, ``getOutputValuesNames``...) when it provides them.
+        """
+        self._problem = problem
+        self._validate = validate
+        self._names: List[str] = []
+        self._handles: Dict[str, int] = {}
+        self._declared: Optional[Set[str]] = None
+        self._batched = type(problem).getValuesHandle is not Problem.getValuesHandle
+        self._values_handles: List[Optional[ValuesHandle]] = []  # by handle, if batched
+
+    @property
+    def problem(self) -> Problem:
+        """Problem whose names are resolved."""
+        return self._problem
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._handles
+
+    def refresh(self) -> None:
+        """Reads again the names declared by the problem, on the next :meth:`resolve`.
+
+        To be called if the problem is initialized again. Handles already resolved are kept, their
+        :class:`icoco.problem.ValuesHandle` are obtained again from the problem.
+        """
+        self._declared = None
+        self._values_handles = [None] * len(self._names)
+
+    def _declared_names(self) -> Set[str]:
+        """Returns the names declared by the problem (empty if it declares none)."""
+        if self._declared is None:
+            self._declared = set()
+            for method in _NAMES_METHODS:
+                if self._problem.supports(method):
+                    self._declared.update(getattr(self._problem, method)())
+        return self._declared
+
+    def resolve(self, name: str) -> int:
+        """Returns the handle of a field or value name, resolving it on first call.
+
+        Parameters
+        ----------
+        name : str
+            name of a field or of a scalar value of the problem.
+
+        Returns
+        -------
+        int
+            handle of the name, valid for the lifetime of the registry.
+
+        Raises
+        ------
+        WrongArgument
+            exception if names are validated and the problem declares names, but not this one.
+        """
+        handle = self._handles.get(name)
+        if handle is None:
+            if self._validate:
+                declared = self._declared_names()
+                if declared and name not in declared:
+                    raise WrongArgument(
+                        prob=self._problem._problem_name,  # pylint: disable=protected-access
+                        method="resolve", arg="name",
+                        condition=f"'{name}' is not a field or value name of the problem")
+            handle = self._handles[name] = len(self._names)
+            self._names.append(name)
+            self._values_handles.append(None)
+        return handle
+
+    def resolve_all(self, names: Sequence[str]) -> List[int]:
+        """Returns the handles of several names (see :meth:`resolve`)."""
+        return [self.resolve(name) for name in names]
+
+    def name(self, handle: int) -> str:
+        """Returns the name of a handle."""
+        return self._names[handle]
+
+    def values_handle(self, handles: Sequence[int]) -> ValuesHandle:
+        """Returns the handle of the batched scalar values I/O methods for several handles.
+
+        See :meth:`icoco.problem.Problem.getValuesHandle`.
+        """
+        return self._problem.getValuesHandle([self._names[handle] for handle in handles])
+
+    def _values_handle(self, handle: int) -> ValuesHandle:
+        """Returns the ValuesHandle of the single name of a handle, obtained on first call."""
+        values_handle = self._values_handles[handle]
+        if values_handle is None:
+            values_handle = self._problem.getValuesHandle((self._names[handle], ))
+            self._values_handles[handle] = values_handle
+        return values_handle
+
+    def getFieldType(self, handle: int) -> ValueType:
+        """Same as :meth:`icoco.problem.Problem.getFieldType`, by handle."""
+        return self._problem.getFieldType(self._names[handle])
+
+    def getFieldUnit(self, handle: int) -> str:
+        """Same as :meth:`icoco.problem.Problem.getFieldUnit`, by handle."""
+        return self._problem.getFieldUnit(self._names[handle])
+
+    def getInputMEDDoubleFieldTemplate(self, handle: int) -> Any:
+        """Same as :meth:`icoco.problem.Problem.getInputMEDDoubleFieldTemplate`, by handle."""
+        return self._problem.getInputMEDDoubleFieldTemplate(self._names[handle])
+
+    def setInputMEDDoubleField(self, handle: int, afield: Any) -> None:
+        """Same as :meth:`icoco.problem.Problem.setInputMEDDoubleField`, by handle."""
+        self._problem.setInputMEDDoubleField(self._names[handle], afield)
+
+    def getOutputMEDDoubleField(self, handle: int) -> Any:
+        """Same as :meth:`icoco.problem.Problem.getOutputMEDDoubleField`, by handle."""
+        return self._problem.getOutputMEDDoubleField(self._names[handle])
+
+    def updateOutputMEDDoubleField(self, handle: int, afield: Any) -> None:
+        """Same as :meth:`icoco.problem.Problem.updateOutputMEDDoubleField`, by handle."""
+        self._problem.updateOutputMEDDoubleField(self._names[handle], afield)
+
+    def getInputMEDIntFieldTemplate(self, handle: int) -> Any:
+        """Same as :meth:`icoco.problem.Problem.getInputMEDIntFieldTemplate`, by handle."""
+        return self._problem.getInputMEDIntFieldTemplate(self._names[handle])
+
+    def setInputMEDIntField(self, handle: int, afield: Any) -> None:
+        """Same as :meth:`icoco.problem.Problem.setInputMEDIntField`, by handle."""
+        self._problem.setInputMEDIntField(self._names[handle], afield)
+
+    def getOutputMEDIntField(self, handle: int) -> Any:
+        """Same as :meth:`icoco.problem.Problem.getOutputMEDIntField`, by handle."""
+        return self._problem.getOutputMEDIntField(self._names[handle])
+
+    def updateOutputMEDIntField(self, handle: int, afield: Any) -> None:
+        """Same as :meth:`icoco.problem.Problem.updateOutputMEDIntField`, by handle."""
+        self._problem.updateOutputMEDIntField(self._names[handle], afield)
+
+    def getInputMEDStringFieldTemplate(self, handle: int) -> Any:
+        """Same as :meth:`icoco.problem.Problem.getInputMEDStringFieldTemplate`, by handle."""
+        return self._problem.getInputMEDStringFieldTemplate(self._names[handle])
+
+    def setInputMEDStringField(self, handle: int, afield: Any) -> None:
+        """Same as :meth:`icoco.problem.Problem.setInputMEDStringField`, by handle."""
+        self._problem.setInputMEDStringField(self._names[handle], afield)
+
+    def getOutputMEDStringField(self, handle: int) -> Any:
+        """Same as :meth:`icoco.problem.Problem.getOutputMEDStringField`, by handle."""
+        return self._problem.getOutputMEDStringField(self._names[handle])
+
+    def updateOutputMEDStringField(self, handle: int, afield: Any) -> None:
+        """Same as :meth:`icoco.problem.Problem.updateOutputMEDStringField`, by handle."""
+        self._problem.updateOutputMEDStringField(self._names[handle], afield)
+
+    def getValueType(self, handle: int) -> ValueType:
+        """Same as :meth:`icoco.problem.Problem.getValueType`, by handle."""
+        return self._problem.getValueType(self._names[handle])
+
+    def getValueUnit(self, handle: int) -> str:
+        """Same as :meth:`icoco.problem.Problem.getValueUnit`, by handle."""
+        return self._problem.getValueUnit(self._names[handle])
+
+    def setInputDoubleValue(self, handle: int, val: float) -> None:
+        """Same as :meth:`icoco.problem.Problem.setInputDoubleValue`, by handle.
+
+        Calls ``setInputDoubleValues`` if the problem implements ``getValuesHandle``.
+        """
+        if self._batched:
+            self._problem.setInputDoubleValues(self._values_handle(handle), (val, ))
+        else:
+            self._problem.setInputDoubleValue(self._names[handle], val)
+
+    def getOutputDoubleValue(self, handle: int) -> float:
+        """Same as :meth:`icoco.problem.Problem.getOutputDoubleValue`, by handle.
+
+        Calls ``getOutputDoubleValues`` if the problem implements ``getValuesHandle``.
+        """
+        if self._batched:
+            return float(self._problem.getOutputDoubleValues(self._values_handle(handle))[0])
+        return self._problem.getOutputDoubleValue(self._names[handle])
+
+    def setInputIntValue(self, handle: int, val: int) -> None:
+        """Same as :meth:`icoco.problem.Problem.setInputIntValue`, by handle.
+
+        Calls ``setInputIntValues`` if the problem implements ``getValuesHandle``.
+        """
+        if self._batched:
+            self._problem.setInputIntValues(self._values_handle(handle), (val, ))
+        else:
+            self._problem.setInputIntValue(self._names[handle], val)
+
+    def getOutputIntValue(self, handle: int) -> int:
+        """Same as :meth:`icoco.problem.Problem.getOutputIntValue`, by handle.
+
+        Calls ``getOutputIntValues`` if the problem implements ``getValuesHandle``.
+        """
+        if self._batched:
+            return int(self._problem.getOutputIntValues(self._values_handle(handle))[0])
+        return self._problem.getOutputIntValue(self._names[handle])
+
+    def setInputStringValue(self, handle: int, val: str) -> None:
+        """Same as :meth:`icoco.problem.Problem.setInputStringValue`, by handle."""
+        self._problem.setInputStringValue(self._names[handle], val)
+
+    def getOutputStringValue(self, handle: int) -> str:
+        """Same as :meth:`icoco.problem.Problem.getOutputStringValue`, by handle."""
+        return self._problem.getOutputStringValue(self._names[handle])
@@ -0,0 +1,422 @@
+"""
+Implicit (fixed-point) coupling of several :class:`icoco.problem.Problem` instances.
+
+Within each time step, :class:`FixedPointCoupling` iterates the resolution of the problems and the
+exchanges between them until the exchanged data converge. The data are gathered in a single NumPy
+vector so that residual norms and relaxation are vectorized. The relaxation is pluggable:
+:class:`ConstantRelaxation` or :class:`AitkenRelaxation` (dynamic under-relaxation).
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .coupling import CouplingDriver, CouplingPhase
+from .field import Field
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .problem import Problem  # pylint: disable=unused-import
+
+
+class Exchange(ABC):
+    """Coupling datum transferred from an output of a source problem to an input of a target
+    problem.
+
+    Subclasses implement :meth:`read` and :meth:`write`.
+    """
+
+    def __init__(self,
+                 source: Problem,
+                 output_name: str,
+                 target: Problem,
+                 input_name: Optional[str] = None) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        source : Problem
+            problem providing the datum.
+        output_name : str
+            name of the output of the source problem.
+        target : Problem
+            problem receiving the datum.
+        input_name : str
+            name of the input of the target problem (``output_name`` if None).
+        """
+        self.source = source
+        """Problem providing the datum."""
+        self.output_name = output_name
+        """Name of the output of the source problem."""
+        self.target = target
+        """Problem receiving the datum."""
+        self.input_name = output_name if input_name is None else input_name
+        """Name of the input of the target problem."""
+
+    @abstractmethod
+    def read(self) -> Any:
+        """Reads the datum from the source problem.
+
+        Returns
+        -------
+        Any
+            the values of the datum (float or array-like, flattened).
+        """
+
+    @abstractmethod
+    def write(self, values: np.ndarray) -> None:
+        """Writes the datum to the target problem.
+
+        Parameters
+        ----------
+        values : np.ndarray
+            the (1D) values of the datum.
+        """
+
+
+class ValueExchange(Exchange):
+    """Exchange of a double scalar value (``getOutputDoubleValue`` / ``setInputDoubleValue``)."""
+
+    def read(self) -> float:
+        return self.source.getOutputDoubleValue(self.output_name)
+
+    def write(self, values: np.ndarray) -> None:
+        self.target.setInputDoubleValue(self.input_name, float(values[0]))
+
+
+class FieldExchange(Exchange):
+    """Exchange of a double field (``getOutputMEDDoubleField`` / ``setInputMEDDoubleField``).
+
+    The field read is used as template of the field written: the source and target meshes must
+    match. The field only needs to provide ``getArray().toNumPyArray()`` (sharing memory with the
+    field) and ``deepCopy()``, as medcoupling fields do. Fields may also be
+    :class:`icoco.field.Field` or plain NumPy arrays.
+    """
+
+    def __init__(self,
+                 source: Problem,
+                 output_name: str,
+                 target: Problem,
+                 input_name: Optional[str] = None) -> None:
+        super().__init__(source, output_name, target, input_name)
+        self._field = None
+
+    def read(self) -> np.ndarray:
+        field = self.source.getOutputMEDDoubleField(self.output_name)
+        if self._field is None:
+            if isinstance(field, np.ndarray):
+                self._field = field.astype(np.float64)
+            else:
+                self._field = field.copy() if isinstance(field, Field) else field.deepCopy()
+        return _values(field)
+
+    def write(self, values: np.ndarray) -> None:
+        _values(self._field)[:] = values
+        self.target.setInputMEDDoubleField(self.input_name, self._field)
+
+
+def _values(field) -> np.ndarray:
+    """Returns the flattened values of a field, without copy."""
+    if isinstance(field, np.ndarray):
+        return field.reshape(-1)
+    if isinstance(field, Field):
+        return field.array.reshape(-1)
+    return field.getArray().toNumPyArray().reshape(-1)
+
+
+class ConstantRelaxation:
+    """Constant relaxation: x <- x + omega * (F(x) - x)."""
+
+    def __init__(self, omega: float = 1.0) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        omega : float
+            relaxation factor (1.0 for no relaxation).
+        """
+        self.omega = omega
+        """Current relaxation factor."""
+
+    def reset(self) -> None:
+        """Called at the beginning of each time step."""
+
+    def update(self, x: np.ndarray, residual: np.ndarray) -> None:
+        """Computes the next iterate, in place.
+
+        Parameters
+        ----------
+        x : np.ndarray
+            current iterate, overwritten by the next one.
+        residual : np.ndarray
+            F(x) - x.
+        """
+        x += self.omega * residual
+
+
+class AitkenRelaxation(ConstantRelaxation):
+    """Dynamic Aitken under-relaxation.
+
+    omega_k = -omega_{k-1} * (r_{k-1} . (r_k - r_{k-1})) / |r_k - r_{k-1}|^2, bounded by
+    ``omega_max`` in absolute value. The first iteration of each time step uses ``omega`` (or the
+    last factor of the previous time step if ``reuse``).
+    """
+
+    def __init__(self, omega: float = 0.5, omega_max: float = 1.0, reuse: bool = False) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        omega : float
+            relaxation factor of the first iteration.
+        omega_max : float
+            upper bound of the absolute value of the relaxation factor.
+        reuse : bool
+            if True, the first iteration of a time step uses the last factor of the previous one.
+        """
+        super().__init__(omega)
+        self._omega_init = omega
+        self._omega_max = omega_max
+        self._reuse = reuse
+        self._previous = np.empty(0)
+        self._delta = np.empty(0)
+        self._first = True
+
+    def reset(self) -> None:
+        self._first = True
+        if not self._reuse:
+            self.omega = self._omega_init
+
+    def update(self, x: np.ndarray, residual: np.ndarray) -> None:
+        if self._previous.shape != residual.shape:
+            self._previous = np.empty_like(residual)
+            self._delta = np.empty_like(residual)
+            self._first = True
+        delta = self._delta
+        if not self._first:
+            np.subtract(residual, self._previous, out=delta)
+            denominator = np.dot(delta, delta)
+            if denominator > 0.0:
+                omega = -self.omega * np.dot(self._previous, delta) / denominator
+                self.omega = float(min(max(omega, -self._omega_max), self._omega_max))
+        self._first = False
+        self._previous[:] = residual
+        np.multiply(residual, self.omega, out=delta)
+        x += delta
+
+
+class FixedPointCoupling(CouplingDriver):  # pylint: disable=too-many-instance-attributes
+    """Implicit coupling of N problems by fixed-point iterations within each time step.
+
+    The data of the relaxed exchanges form the vector x. Each coupling iteration:
+
+    - x is written to the targets;
+    - the problems solve the time step (``solveTimeStep``, or a single ``iterateTimeStep`` with
+      ``use_iterate``);
+    - F(x) is read from the sources, the residual F(x) - x is computed;
+    - the iterations stop when, for each exchange, |F(x) - x| <= tolerance * |F(x)| (and all the
+      problems converged with ``use_iterate``). Otherwise x is updated by the relaxation and, except
+      with ``use_iterate``, the time step is aborted (and the problems restored with
+      ``save_method``) and initialized again.
+
+    With the Jacobi scheme (default), all the problems solve with the same x, possibly concurrently
+    (see :class:`icoco.coupling.CouplingDriver`) and all the exchanges are relaxed. With the
+    Gauss-Seidel scheme (``gauss_seidel=True``), the problems solve one after the other in the order
+    of ``problems``: an exchange to a later problem is transferred as soon as its source solved,
+    only the exchanges to the same or an earlier problem are relaxed.
+
+    The time step negotiation, the reduction of the time step on failure (a failed resolution or no
+    convergence within ``max_iterations``) and the timings are those of
+    :class:`icoco.coupling.CouplingDriver`. The number of coupling iterations of each validated time
+    step is appended to :attr:`iterations`, and is the indicator given to the ``controller``.
+    """
+
+    save_label: int = 0
+    """Label used with ``save_method``."""
+
+    def __init__(self,  # pylint: disable=too-many-arguments
+                 problems: Sequence[Problem],
+                 exchanges: Sequence[Exchange],
+                 relaxation: Optional[ConstantRelaxation] = None,
+                 tolerance: float = 1.e-6,
+                 max_iterations: int = 20,
+                 *,
+                 gauss_seidel: bool = False,
+                 use_iterate: bool = False,
+                 save_method: Optional[str] = None,
+                 **kwargs) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        problems : Sequence[Problem]
+            coupled problems.
+        exchanges : Sequence[Exchange]
+            coupling data.
+        relaxation : ConstantRelaxation
+            relaxation of the exchanged data (:class:`AitkenRelaxation` if None).
+        tolerance : float
+            relative tolerance of the residual of each exchange.
+        max_iterations : int
+            maximum number of coupling iterations per time step.
+        gauss_seidel : bool
+            use the Gauss-Seidel scheme instead of the Jacobi one.
+        use_iterate : bool
+            use ``iterateTimeStep`` (one per coupling iteration) instead of ``solveTimeStep``.
+        save_method : str
+            if not None, the problems are saved before each time step with this method and
+            restored after each abort.
+        kwargs
+            other arguments of :class:`icoco.coupling.CouplingDriver` (``dt_factor``,
+            ``max_retries``, ``max_workers``, ``thread_unsafe``, ``controller``).
+        """
+        super().__init__(problems, **kwargs)
+        self._relaxation = AitkenRelaxation() if relaxation is None else relaxation
+        self._tolerance = tolerance
+        self._max_iterations = max_iterations
+        self._gauss_seidel = gauss_seidel
+        self._use_iterate = use_iterate
+        self._save_method = save_method
+        index = {id(problem): rank for rank, problem in enumerate(self._problems)}
+        relaxed = [exchange for exchange in exchanges
+                   if not gauss_seidel or index[id(exchange.target)] <= index[id(exchange.source)]]
+        self._relaxed = tuple(relaxed)
+        self._forward = tuple(tuple(exchange for exchange in exchanges
+                                    if exchange not in relaxed and exchange.source is problem)
+                              for problem in self._problems)
+        self._x = np.empty(0)
+        self._fx = np.empty(0)
+        self._residual = np.empty(0)
+        self._offsets = np.zeros(1, dtype=np.intp)
+        self.iterations: List[int] = []
+        """Number of coupling iterations of each validated time step."""
+        self.residuals = np.empty(0)
+        """Relative residual of each relaxed exchange at the last coupling iteration."""
+
+    @property
+    def relaxation(self) -> ConstantRelaxation:
+        """Relaxation of the exchanged data."""
+        return self._relaxation
+
+    def _read(self, name: str) -> None:
+        """Reads the relaxed exchanges into the vector name (allocated at the first call)."""
+        start = perf_counter()
+        offsets = self._offsets
+        if len(offsets) != len(self._relaxed) + 1:
+            values = [np.atleast_1d(np.asarray(exchange.read(), dtype=np.float64))
+                      for exchange in self._relaxed]
+            self._offsets = offsets = np.cumsum([0] + [len(value) for value in values])
+            for vector in ("_x", "_fx", "_residual"):
+                setattr(self, vector, np.empty(offsets[-1]))
+            out = getattr(self, name)
+            for rank, value in enumerate(values):
+                out[offsets[rank]:offsets[rank + 1]] = value
+        else:
+            out = getattr(self, name)
+            for rank, exchange in enumerate(self._relaxed):
+                out[offsets[rank]:offsets[rank + 1]] = exchange.read()
+        self._timings[CouplingPhase.EXCHANGE] += perf_counter() - start
+
+    def _write(self) -> None:
+        """Writes x to the targets of the relaxed exchanges."""
+        start = perf_counter()
+        x = self._x
+        offsets = self._offsets
+        for rank, exchange in enumerate(self._relaxed):
+            exchange.write(x[offsets[rank]:offsets[rank + 1]])
+        self._timings[CouplingPhase.EXCHANGE] += perf_counter() - start
+
+    def _solve_iteration(self) -> Tuple[bool, bool]:
+        """Solves (or iterates) all problems, returns (all converged, all succeeded)."""
+        if not self._gauss_seidel:
+            if self._use_iterate:
+                success, converged = self.iterate_time_step()
+                return converged, success
+            return True, self.solve_time_step()
+        converged = True
+        for rank, method in enumerate(self._iterate if self._use_iterate else self._solve):
+            start = perf_counter()
+            success = method()
+            if self._use_iterate:
+                success, problem_converged = success
+                converged = converged and problem_converged
+            self._timings[CouplingPhase.SOLVE] += perf_counter() - start
+            if not success:
+                return converged, False
+            start = perf_counter()
+            for exchange in self._forward[rank]:
+                exchange.write(np.atleast_1d(np.asarray(exchange.read(), dtype=np.float64)))
+            self._timings[CouplingPhase.EXCHANGE] += perf_counter() - start
+        return converged, True
+
+    def _call_save_method(self, name: str) -> None:
+        """Calls save, restore or forget on all problems with ``save_method`` (if not None)."""
+        if self._save_method is not None:
+            for problem in self._problems:
+                getattr(problem, name)(self.save_label, self._save_method)
+
+    def _restart(self, dt: float) -> bool:
+        """Aborts the time step, restores the problems and initializes the time step again."""
+        self.abort_time_step()
+        self.n_aborts -= 1  # the time step itself is not aborted
+        self._call_save_method("restore")
+        return self.init_time_step(dt)
+
+    def _converged(self) -> bool:
+        """Computes the residual and checks the convergence of each exchange."""
+        np.subtract(self._fx, self._x, out=self._residual)
+        starts = self._offsets[:-1]
+        residual_norms = np.sqrt(np.add.reduceat(self._residual * self._residual, starts))
+        value_norms = np.sqrt(np.add.reduceat(self._fx * self._fx, starts))
+        self.residuals = residual_norms / np.maximum(value_norms, np.finfo(np.float64).tiny)
+        return bool(np.all(self.residuals <= self._tolerance))
+
+    def try_time_step(self, dt: float) -> bool:
+        """Tries to compute a coupled time step by fixed-point iterations.
+
+        Parameters
+        ----------
+        dt : float
+            time step.
+
+        Returns
+        -------
+        bool
+            True if the time step converged and is validated, False if it is aborted.
+        """
+        self._call_save_method("save")
+        self._relaxation.reset()
+        success = self.init_time_step(dt)
+        if success and self._relaxed:
+            self._read("_x")
+        iteration = 0
+        while success:
+            iteration += 1
+            self._write()
+            converged, success = self._solve_iteration()
+            if success and self._relaxed:
+                self._read("_fx")
+                converged = self._converged() and converged
+                if not converged:
+                    self._relaxation.update(self._x, self._residual)
+            if not success or converged:
+                break
+            if iteration == self._max_iterations:
+                success = False
+            elif not self._use_iterate:
+                success = self._restart(dt)
+        if success:
+            self.validate_time_step()
+            self.iterations.append(iteration)
+        else:
+            self.abort_time_step()
+            self._call_save_method("restore")
+        self._call_save_method("forget")
+        return success
+
+    def _indicator(self) -> Optional[float]:
+        """Returns the number of coupling iterations of the last validated time step."""
+        return self.iterations[-1]
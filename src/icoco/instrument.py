@@ -0,0 +1,324 @@
+"""
+Timing of the ICoCo methods of problems, exportable as a Chrome trace.
+
+:func:`instrument` wraps the ICoCo methods of a problem instance (or class) with
+``time.perf_counter_ns`` timers, which record each call into the ring buffers of a
+:class:`Recorder`::
+
+    recorder = Recorder()
+    instrument(neutronics, recorder, label="neutronics")
+    instrument(thermohydraulics, recorder, label="thermohydraulics")
+    ...  # coupled run
+    print(recorder.stats())
+    recorder.export_chrome_trace("run.json")  # to open with https://ui.perfetto.dev
+
+The buffers are preallocated: a call only stores its start, duration and identifier. The records
+are accumulated into streaming statistics and histograms (per problem and method) when the ring
+wraps around or when statistics are queried, so that these cover all the calls while the trace
+keeps the last ``capacity`` calls of each ring.
+
+An instrumented instance records into its own ring, bound to its timers: a problem is not called
+concurrently. The instances of an instrumented class share the timers, so they record into one
+ring per thread (looked up at each call). Problems run concurrently (for instance by
+:class:`icoco.coupling.CouplingDriver` with ``max_workers > 0``) are thus timed without lock on the
+calls: only the flushes of the rings are serialized.
+
+Without :func:`instrument` (or with ``enabled=False``), nothing is wrapped: there is no overhead.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .problem import Problem
+from .utils import ICoCoMethods
+
+INSTRUMENTED_METHODS = [name for name in ICoCoMethods.ALL if name != "GetICoCoMajorVersion"]
+"""Methods wrapped by :func:`instrument`."""
+
+_N_BUCKETS = 64
+
+
+class MethodStats(NamedTuple):
+    """Statistics of the calls of a method of a problem."""
+
+    calls: int
+    """Number of calls."""
+    total: float
+    """Total time (in seconds)."""
+    histogram: np.ndarray
+    """Number of calls per duration bucket: bucket ``k`` counts durations in [2^(k-1), 2^k) ns."""
+
+    @property
+    def mean(self) -> float:
+        """Mean time (in seconds) of a call."""
+        return self.total / self.calls if self.calls else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Returns an upper bound (in seconds) of the q-quantile of the durations (0 <= q <= 1)."""
+        if not self.calls:
+            return 0.0
+        bucket = int(np.searchsorted(np.cumsum(self.histogram), q * self.calls))
+        return float(2 ** bucket) * 1.e-9
+
+
+class _Ring:  # pylint: disable=too-few-public-methods
+    """Ring buffer of the calls of an instrumented instance, or of a thread."""
+
+    __slots__ = ("cursor", "starts", "durations", "idents", "flushed", "wrapped")
+
+    def __init__(self, capacity: int) -> None:
+        self.cursor = 0  # index of the next record, only modified by the calls recorded
+        self.starts = [0] * capacity
+        self.durations = [0] * capacity  # only the durations and idents are read by the flushes
+        self.idents = [0] * capacity
+        self.flushed = 0
+        self.wrapped = False
+
+
+class _Local(threading.local):  # pylint: disable=too-few-public-methods
+    """Ring of the current thread (attribute ``ring``) for the timers of instrumented classes,
+    created on the first access of a thread: the timers look it up without handling its
+    absence."""
+
+    def __init__(self, recorder: Recorder) -> None:
+        super().__init__()
+        self.ring = recorder._new_ring()  # pylint: disable=protected-access
+
+
+def _array(values: List[int], begin: int, end: int) -> np.ndarray:
+    """Returns values[begin:end] as an int64 array (without copying the list if it is whole)."""
+    return np.array(values if begin == 0 and end == len(values) else values[begin:end],
+                    dtype=np.int64)
+
+
+class Recorder:  # pylint: disable=too-many-instance-attributes
+    """Ring buffers of the calls of instrumented methods, and their statistics."""
+
+    def __init__(self, capacity: int = 1 << 16) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        capacity : int
+            number of calls kept for the trace, per ring (instrumented instance or thread).
+        """
+        self.capacity = capacity
+        """Number of calls kept for the trace, per ring (instrumented instance or thread)."""
+        self.labels: List[str] = []
+        """Labels of the registered problems."""
+        self._rings: List[_Ring] = []
+        self._lock = threading.Lock()  # serializes the flushes and the creation of rings
+        self._local: Optional[_Local] = None  # created when a class is instrumented
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._totals = np.zeros(0, dtype=np.int64)
+        self._histograms = np.zeros((0, _N_BUCKETS), dtype=np.int64)
+
+    def register(self, label: str) -> int:
+        """Registers a problem, returns its index (used as thread id in the trace)."""
+        self.labels.append(label)
+        size = len(self.labels) * len(INSTRUMENTED_METHODS)
+        self._counts = np.resize(self._counts, size)
+        self._totals = np.resize(self._totals, size)
+        self._histograms = np.resize(self._histograms, (size, _N_BUCKETS))
+        self._counts[-len(INSTRUMENTED_METHODS):] = 0
+        self._totals[-len(INSTRUMENTED_METHODS):] = 0
+        self._histograms[-len(INSTRUMENTED_METHODS):] = 0
+        return len(self.labels) - 1
+
+    def _new_ring(self) -> _Ring:
+        """Creates a ring."""
+        ring = _Ring(self.capacity)
+        with self._lock:
+            self._rings.append(ring)
+        return ring
+
+    def _flush_ring(self, ring: _Ring, end: int) -> None:
+        """Accumulates the calls recorded in ring since last flush (up to end) into the statistics.
+
+        Called with the lock held.
+        """
+        begin = ring.flushed
+        if end > begin:
+            idents = _array(ring.idents, begin, end)
+            durations = _array(ring.durations, begin, end)
+            size = len(self._counts)
+            self._counts += np.bincount(idents, minlength=size)
+            self._totals += np.bincount(idents, weights=durations, minlength=size).astype(np.int64)
+            buckets = np.minimum(np.frexp(durations.astype(np.float64))[1], _N_BUCKETS - 1)
+            self._histograms += np.bincount(idents * _N_BUCKETS + buckets,
+                                            minlength=size * _N_BUCKETS).reshape(size, _N_BUCKETS)
+        ring.flushed = end
+
+    def _flush(self) -> None:
+        """Accumulates the calls recorded since last flush into the statistics."""
+        with self._lock:
+            for ring in self._rings:
+                self._flush_ring(ring, ring.cursor)
+
+    def _wrap_around(self, ring: _Ring) -> None:
+        """Called by the timer filling a ring: flushes it and starts again from its beginning."""
+        with self._lock:
+            self._flush_ring(ring, self.capacity)
+            ring.cursor = ring.flushed = 0
+            ring.wrapped = True
+
+    def stats(self) -> Dict[Tuple[str, str], MethodStats]:
+        """Returns the statistics of the methods called, per (problem label, method name)."""
+        self._flush()
+        stats = {}
+        n_methods = len(INSTRUMENTED_METHODS)
+        for ident in np.flatnonzero(self._counts):
+            label, method = divmod(int(ident), n_methods)
+            stats[(self.labels[label], INSTRUMENTED_METHODS[method])] = MethodStats(
+                int(self._counts[ident]), self._totals[ident] * 1.e-9,
+                self._histograms[ident].copy())
+        return stats
+
+    def reset(self) -> None:
+        """Forgets all the calls recorded (the instrumented methods must not run meanwhile)."""
+        with self._lock:
+            for ring in self._rings:
+                ring.cursor = ring.flushed = 0
+                ring.wrapped = False
+        self._counts[:] = 0
+        self._totals[:] = 0
+        self._histograms[:] = 0
+
+    def trace_events(self) -> List[Dict[str, Any]]:
+        """Returns the calls kept in the rings as Chrome trace events, in chronological order."""
+        pid = os.getpid()
+        n_methods = len(INSTRUMENTED_METHODS)
+        calls = []
+        with self._lock:
+            rings = list(self._rings)
+        for ring in rings:
+            cursor = ring.cursor
+            order = list(range(cursor))
+            if ring.wrapped:
+                order = list(range(cursor, self.capacity)) + order
+            for index in order:
+                label, method = divmod(ring.idents[index], n_methods)
+                calls.append({"name": INSTRUMENTED_METHODS[method], "cat": "icoco", "ph": "X",
+                              "ts": ring.starts[index] / 1000.0,
+                              "dur": ring.durations[index] / 1000.0,
+                              "pid": pid, "tid": label})
+        calls.sort(key=lambda event: event["ts"])
+        return [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                 "args": {"name": label}} for tid, label in enumerate(self.labels)] + calls
+
+    def export_chrome_trace(self, path: str) -> None:
+        """Writes the calls kept in the rings as a Chrome trace-event JSON file.
+
+        Parameters
+        ----------
+        path : str
+            path of the file, to open with https://ui.perfetto.dev or chrome://tracing.
+        """
+        with open(path, "w", encoding="utf-8") as stream:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ns"}, stream)
+
+
+_TIMER = """
+def {name}({parameters}):
+    start = clock()
+    try:
+        return func({parameters})
+    finally:
+        duration = clock() - start{lookup}
+        index = ring.cursor
+        ring.starts[index] = start
+        ring.durations[index] = duration
+        ring.idents[index] = ident
+        if index == last:
+            wrap_around(ring)
+        else:
+            ring.cursor = index + 1
+"""
+
+
+def _timed(func: Callable, name: str, recorder: Recorder, ident: int,
+           ring: Optional[_Ring]) -> Callable:
+    """Wraps func (ICoCo method name) with a timer recording into recorder.
+
+    func is bound to an instrumented instance if ring (the ring of the instance) is given, the
+    timer then records into ring. Otherwise func is a method of an instrumented class, whose timer
+    records into the ring of the calling thread.
+
+    The timer has the exact signature of the ICoCo method: contrary to ``*args, **kwargs``, no
+    tuple and dict are built at each call.
+    """
+    # pylint: disable=protected-access
+    if ring is None and recorder._local is None:
+        recorder._local = _Local(recorder)
+    parameters = list(inspect.signature(getattr(Problem, name)).parameters)
+    namespace = {"clock": time.perf_counter_ns, "func": func, "ident": ident, "ring": ring,
+                 "local": recorder._local, "last": recorder.capacity - 1,
+                 "wrap_around": recorder._wrap_around}
+    exec(_TIMER.format(name=name,  # pylint: disable=exec-used
+                       parameters=", ".join(parameters if ring is None else parameters[1:]),
+                       lookup="\n        ring = local.ring" if ring is None else ""),
+         namespace)
+    timed = functools.wraps(func)(namespace[name])
+    timed.__icoco_timed__ = True
+    return timed
+
+
+def instrument(target: Any,
+               recorder: Recorder,
+               *,
+               label: Optional[str] = None,
+               enabled: bool = True) -> Any:
+    """Wraps the ICoCo methods of a problem instance or class with timers.
+
+    Parameters
+    ----------
+    target : Problem or type
+        problem instance, whose methods are wrapped in place, or problem class, replaced by a
+        subclass (with the same name and module) whose methods are wrapped. All the instances of
+        such a class share the same label.
+    recorder : Recorder
+        recorder of the calls.
+    label : str
+        label of the problem in the statistics and the trace. Defaults to the class name.
+    enabled : bool
+        if False, the target is returned unchanged.
+
+    Returns
+    -------
+    Problem or type
+        the instrumented problem (the instance itself) or class.
+    """
+    if not enabled:
+        return target
+    klass = target if isinstance(target, type) else type(target)
+    problem = recorder.register(label or klass.__name__)
+    first = problem * len(INSTRUMENTED_METHODS)
+    bound = not isinstance(target, type)
+    ring = recorder._new_ring() if bound else None  # pylint: disable=protected-access
+    wrapped = {name: _timed(getattr(target, name), name, recorder, first + index, ring)
+               for index, name in enumerate(INSTRUMENTED_METHODS)}
+    if bound:
+        target.__dict__.update(wrapped)
+        return target
+    wrapped.update({"__module__": klass.__module__, "__qualname__": klass.__qualname__,
+                    "__doc__": klass.__doc__,
+                    "detect_implemented_methods": classmethod(
+                        lambda _: klass.implemented_methods())})
+    return type(klass)(klass.__name__, (klass,), wrapped)
+
+
+def uninstrument(problem: Any) -> Any:
+    """Removes the timers installed by :func:`instrument` on a problem instance, returns it."""
+    for name in INSTRUMENTED_METHODS:
+        if getattr(problem.__dict__.get(name), "__icoco_timed__", False):
+            del problem.__dict__[name]
+    return problem
@@ -0,0 +1,134 @@
+"""
+Cache of the metadata queries of a :class:`icoco.problem.Problem`.
+
+Names, types and units of the fields and values of a code are static after ``initialize`` for
+nearly every code, yet coupling scripts query them at each time step. :class:`CachedProblem` wraps
+a problem and memoizes these queries (see :data:`CACHED_METHODS`), which is worth it when each
+call is costly (for instance crossing the language boundary of a wrapped code)::
+
+    problem = CachedProblem(problem)
+    problem.initialize()
+    ...
+    problem.getFieldType("temperature")  # computed by the code once, then from the cache
+
+The cache is invalidated by the methods which may change the metadata (see
+:data:`INVALIDATING_METHODS`) and by :meth:`CachedProblem.invalidate`.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, FrozenSet, Tuple
+
+from .problem import Problem
+from .utils import ICoCoExtensions, ICoCoMethods
+
+CACHED_METHODS = ["getInputFieldsNames", "getOutputFieldsNames", "getFieldType", "getMeshUnit",
+                  "getFieldUnit", "getInputValuesNames", "getOutputValuesNames", "getValueType",
+                  "getValueUnit"]
+"""ICoCo methods whose results are cached."""
+
+INVALIDATING_METHODS = ["setDataFile", "initialize", "terminate", "restore"]
+"""ICoCo methods invalidating the cache."""
+
+
+class CachedProblem(Problem):  # pylint: disable=abstract-method
+    """Problem forwarding the ICoCo methods to another problem, caching its metadata.
+
+    Results are cached per method and arguments. Lists of names are returned as copies of the
+    cached lists. Exceptions are not cached.
+    """
+
+    def __init__(self, problem: Problem) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        problem : Problem
+            the problem to wrap.
+        """
+        super().__init__()
+        self._problem = problem
+        self._cache: Dict[Tuple, Any] = {}
+        self.hits = 0
+        """Number of queries answered from the cache."""
+        self.misses = 0
+        """Number of queries forwarded to the problem."""
+
+    @property
+    def problem(self) -> Problem:
+        """The wrapped problem."""
+        return self._problem
+
+    def implemented_methods(self) -> FrozenSet[str]:  # pylint: disable=arguments-differ
+        """Returns the names of the ICoCo methods implemented by the wrapped problem (an instance
+        method: they depend on the wrapped problem)."""
+        return self._problem.implemented_methods()
+
+    def supports(self, method: str) -> bool:
+        """Tells whether an ICoCo method is implemented by the wrapped problem."""
+        return self._problem.supports(method)
+
+    def invalidate(self) -> None:
+        """Empties the cache, to be called when the metadata of the problem change."""
+        self._cache.clear()
+
+    def _cached(self, key: Tuple) -> Any:
+        """Returns the result of a cached method, key being the method name and arguments."""
+        try:
+            result = self._cache[key]
+        except KeyError:
+            self.misses += 1
+            result = self._cache[key] = getattr(self._problem, key[0])(*key[1:])
+        else:
+            self.hits += 1
+        return list(result) if isinstance(result, list) else result
+
+
+def _forward(name: str):
+    """Returns the method of CachedProblem forwarding ICoCo method name."""
+
+    def method(self, *args, **kwargs):
+        return getattr(self._problem, name)(*args, **kwargs)  # pylint: disable=protected-access
+
+    method.__name__ = name
+    method.__qualname__ = f"CachedProblem.{name}"
+    method.__doc__ = getattr(Problem, name).__doc__
+    return method
+
+
+def _cached(name: str):
+    """Returns the method of CachedProblem caching the results of ICoCo method name."""
+
+    def method(self, *args, **kwargs):
+        # pylint: disable=protected-access
+        return self._cached((name, *args, *kwargs.values()))
+
+    method.__name__ = name
+    method.__qualname__ = f"CachedProblem.{name}"
+    method.__doc__ = getattr(Problem, name).__doc__
+    return method
+
+
+def _invalidating(name: str):
+    """Returns the method of CachedProblem forwarding ICoCo method name, then invalidating."""
+
+    def method(self, *args, **kwargs):
+        try:
+            return getattr(self._problem, name)(*args, **kwargs)  # pylint: disable=protected-access
+        finally:
+            self.invalidate()
+
+    method.__name__ = name
+    method.__qualname__ = f"CachedProblem.{name}"
+    method.__doc__ = getattr(Problem, name).__doc__
+    return method
+
+
+for _name in ICoCoMethods.ALL + ICoCoExtensions.ALL:
+    if _name in CACHED_METHODS:
+        setattr(CachedProblem, _name, _cached(_name))
+    elif _name in INVALIDATING_METHODS:
+        setattr(CachedProblem, _name, _invalidating(_name))
+    elif _name != "GetICoCoMajorVersion":
+        setattr(CachedProblem, _name, _forward(_name))
+CachedProblem.__abstractmethods__ = frozenset()
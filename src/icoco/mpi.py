@@ -0,0 +1,598 @@
+"""
+Coupling of problems running on separate groups of MPI ranks (mpi4py).
+
+:class:`RankGroups` splits ``MPI.COMM_WORLD`` into one group of ranks per problem and builds the
+intercommunicators between the groups. :class:`MPIExchanger` transfers double scalar values and
+double fields from the outputs of the problem of a group to the inputs of the problem of another
+group, with non-blocking point-to-point communications on NumPy buffers (``Isend`` / ``Irecv``,
+nothing is pickled). The same script runs on all ranks (``mpirun -n 4 python3 coupling.py``)::
+
+    groups = RankGroups(["neutronics", "thermohydraulics"], sizes=[1, 3])
+    problems = {name: PROBLEM_TYPES[name]() for name in groups.local}
+    for problem in problems.values():
+        problem.setMPIComm(groups.comm)
+        problem.initialize()
+    with MPIExchanger(groups, problems) as exchanger:
+        exchanger.add_values("neutronics", ["power"], "thermohydraulics")
+        exchanger.add_field("thermohydraulics", "temperature", "neutronics")
+        exchanger.post()  # receives of the first exchange
+        ...  # time loop, the exchanges being made by exchanger.exchange()
+
+All ranks declare the same exchanges, in the same order. :meth:`MPIExchanger.exchange` sends the
+outputs of the local problem, completes the receives of its inputs and posts the receives of the
+next exchange at once, so that the data sent by the other groups arrive while the local problem
+solves its time step. :meth:`MPIExchanger.send`, :meth:`MPIExchanger.post` and
+:meth:`MPIExchanger.receive` allow to send the outputs as soon as they are computed.
+
+:class:`StepReducer` reduces the time steps, stop requests, successes, stationarity and residual
+norms of all the ranks in a single ``Allreduce`` (or ``Iallreduce``).
+
+Without mpi4py (or with a single MPI process), all the groups are local: the problems of all the
+groups run in the same process and the exchanges are copies, so that coupling scripts run
+unchanged in serial.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .exception import WrongArgument
+from .implicit import _values
+
+try:
+    from mpi4py import MPI  # type: ignore
+except ImportError:  # pragma: no cover
+    MPI = None
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .problem import Problem  # pylint: disable=unused-import
+
+
+class RankGroups:
+    """Split of the MPI processes in one group of consecutive ranks per problem."""
+
+    def __init__(self,
+                 names: Sequence[str],
+                 sizes: Optional[Sequence[int]] = None,
+                 comm: Any = None) -> None:
+        """Constructor, collective over comm.
+
+        Parameters
+        ----------
+        names : Sequence[str]
+            names of the groups (one per coupled problem).
+        sizes : Sequence[int]
+            number of processes of each group, the processes being split as evenly as possible
+            if None. Ignored when the groups are local.
+        comm : MPI.Intracomm
+            communicator to split, ``MPI.COMM_WORLD`` if None.
+
+        Raises
+        ------
+        WrongArgument
+            exception if the sizes do not match the number of processes.
+        """
+        self.names = list(names)
+        """Names of the groups."""
+        self._comm = comm if comm is not None or MPI is None else MPI.COMM_WORLD
+        self._world = self._comm
+        self._index = 0
+        self._intercomms: Dict[str, Any] = {}
+        self.parallel = self._comm is not None and self._comm.Get_size() > 1
+        """True if the groups run on separate processes, False if they are all local."""
+        if self.parallel:
+            self._split(sizes)
+
+    def _split(self, sizes: Optional[Sequence[int]]) -> None:
+        """Splits the communicator and builds the intercommunicators."""
+        world = self._comm
+        n_groups = len(self.names)
+        if sizes is None:
+            quotient, remainder = divmod(world.Get_size(), n_groups)
+            sizes = [quotient + (index < remainder) for index in range(n_groups)]
+        if len(sizes) != n_groups or min(sizes) < 1 or sum(sizes) != world.Get_size():
+            raise WrongArgument(prob="RankGroups", method="RankGroups", arg="sizes",
+                                condition=f"{list(sizes)} does not split {world.Get_size()} "
+                                f"processes into {n_groups} groups")
+        leaders = np.cumsum([0] + list(sizes[:-1])).tolist()
+        self._index = int(np.searchsorted(leaders, world.Get_rank(), side="right")) - 1
+        self._comm = world.Split(self._index, world.Get_rank())
+        # intercommunicators created in the same (lexicographic) order on all groups: no deadlock
+        for other in range(n_groups):
+            if other != self._index:
+                first, second = sorted((self._index, other))
+                self._intercomms[self.names[other]] = self._comm.Create_intercomm(
+                    0, world, leaders[other], first * n_groups + second)
+
+    @property
+    def local(self) -> List[str]:
+        """Names of the groups of this process: all of them if the groups are not parallel."""
+        return [self.names[self._index]] if self.parallel else list(self.names)
+
+    @property
+    def comm(self) -> Any:
+        """Communicator of the group of this process (to give to ``setMPIComm``).
+
+        None without mpi4py, the split communicator otherwise.
+        """
+        return self._comm
+
+    @property
+    def world(self) -> Any:
+        """Communicator of all the groups (the one split), None without mpi4py."""
+        return self._world
+
+    def intercomm(self, name: str) -> Any:
+        """Returns the intercommunicator with another group.
+
+        Parameters
+        ----------
+        name : str
+            name of the remote group.
+
+        Returns
+        -------
+        MPI.Intercomm
+            intercommunicator between the group of this process and the group name.
+
+        Raises
+        ------
+        WrongArgument
+            exception if name is not a remote group.
+        """
+        try:
+            return self._intercomms[name]
+        except KeyError:
+            raise WrongArgument(prob="RankGroups", method="intercomm", arg="name",
+                                condition=f"'{name}' is not a remote group") from None
+
+    def free(self) -> None:
+        """Frees the communicators, collective over the initial communicator."""
+        if self.parallel:
+            for intercomm in self._intercomms.values():
+                intercomm.Free()
+            self._intercomms.clear()
+            self._comm.Free()
+
+
+class _Transfer(ABC):
+    """Transfer of outputs of the problem of a group to inputs of the problem of another group.
+
+    ``read`` fills the send buffer from the source problem, ``write`` writes the receive buffer to
+    the target problem. In parallel, the source and target groups exchange the buffers of their
+    ranks of same index; subclasses may override :meth:`peers`.
+    """
+
+    def __init__(self, source: str, target: str, tag: int) -> None:
+        self.source = source
+        self.target = target
+        self.tag = tag
+        self.sent: Optional[np.ndarray] = None
+        self.received: Optional[np.ndarray] = None
+
+    @abstractmethod
+    def read(self, problem: Problem) -> None:
+        """Reads the outputs of the source problem into the send buffer."""
+
+    @abstractmethod
+    def allocate(self, problem: Problem) -> np.ndarray:
+        """Returns the receive buffer, allocated for the inputs of the target problem."""
+
+    @abstractmethod
+    def write(self, problem: Problem) -> None:
+        """Writes the receive buffer to the inputs of the target problem."""
+
+    def peers(self, rank: int, remote_size: int, sending: bool) -> List[int]:
+        """Returns the remote ranks to send to (or to receive from) for the local rank."""
+        # pylint: disable=unused-argument
+        return [rank] if rank < remote_size else []
+
+
+class _ValuesTransfer(_Transfer):
+    """Batched transfer of double scalar values, from the root of the source group to all the
+    ranks of the target group."""
+
+    def __init__(self, source: str, target: str, tag: int,  # pylint: disable=too-many-arguments
+                 names: Sequence[str], input_names: Sequence[str]) -> None:
+        super().__init__(source, target, tag)
+        self.names = list(names)
+        self.input_names = list(input_names)
+        self._handles = [None, None]  # of the outputs and of the inputs, resolved on first use
+
+    def read(self, problem: Problem) -> None:
+        if self._handles[0] is None:
+            self._handles[0] = problem.getValuesHandle(self.names)
+            self.sent = np.empty(len(self.names), dtype=np.float64)
+        np.copyto(self.sent, problem.getOutputDoubleValues(self._handles[0]))
+
+    def allocate(self, problem: Problem) -> np.ndarray:
+        if self._handles[1] is None:
+            self._handles[1] = problem.getValuesHandle(self.input_names)
+            self.received = np.empty(len(self.input_names), dtype=np.float64)
+        return self.received
+
+    def write(self, problem: Problem) -> None:
+        problem.setInputDoubleValues(self._handles[1], self.received)
+
+    def peers(self, rank: int, remote_size: int, sending: bool) -> List[int]:
+        if sending:
+            return list(range(remote_size)) if rank == 0 else []
+        return [0]
+
+
+class _FieldTransfer(_Transfer):  # pylint: disable=too-many-instance-attributes
+    """Transfer of a double field, each rank of the source group sending its part of the field to
+    the rank of same index of the target group (the groups must have the same size)."""
+
+    def __init__(self, source: str, target: str, tag: int,  # pylint: disable=too-many-arguments
+                 output_name: str, input_name: str) -> None:
+        super().__init__(source, target, tag)
+        self.output_name = output_name
+        self.input_name = input_name
+        self._template = None
+
+    def read(self, problem: Problem) -> None:
+        values = _values(problem.getOutputMEDDoubleField(self.output_name))
+        if self.sent is None or self.sent.size != values.size:
+            self.sent = np.empty(values.size, dtype=np.float64)
+        np.copyto(self.sent, values)
+
+    def allocate(self, problem: Problem) -> np.ndarray:
+        if self._template is None:
+            template = problem.getInputMEDDoubleFieldTemplate(self.input_name)
+            self._template = template.astype(np.float64) if isinstance(template,
+                                                                        np.ndarray) else template
+            self.received = np.empty(_values(self._template).size, dtype=np.float64)
+        return self.received
+
+    def write(self, problem: Problem) -> None:
+        _values(self._template)[:] = self.received
+        problem.setInputMEDDoubleField(self.input_name, self._template)
+
+
+class MPIExchanger:
+    """Non-blocking exchanges between the problems of :class:`RankGroups`."""
+
+    def __init__(self, groups: RankGroups, problems: Mapping[str, Problem]) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        groups : RankGroups
+            groups of the problems.
+        problems : Mapping[str, Problem]
+            problems of the local groups (``groups.local``), by group name.
+
+        Raises
+        ------
+        WrongArgument
+            exception if problems are not the problems of the local groups.
+        """
+        if sorted(problems) != sorted(groups.local):
+            raise WrongArgument(prob="MPIExchanger", method="MPIExchanger", arg="problems",
+                                condition=f"groups {sorted(problems)} given instead of the local "
+                                f"groups {sorted(groups.local)}")
+        self._groups = groups
+        self._problems = dict(problems)
+        self._transfers: List[_Transfer] = []
+        self._send_requests: List[Any] = []
+        self._recv_requests: List[Any] = []
+        self._posted = False
+
+    def __enter__(self) -> MPIExchanger:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def groups(self) -> RankGroups:
+        """Groups of the problems."""
+        return self._groups
+
+    def _check(self, method: str, source: str, target: str) -> int:
+        """Checks the groups of a new transfer, returns its tag."""
+        for arg, name in (("source", source), ("target", target)):
+            if name not in self._groups.names:
+                raise WrongArgument(prob="MPIExchanger", method=method, arg=arg,
+                                    condition=f"'{name}' is not a group")
+        if source == target:
+            raise WrongArgument(prob="MPIExchanger", method=method, arg="target",
+                                condition="source and target groups are the same")
+        return len(self._transfers)
+
+    def add_values(self,
+                   source: str,
+                   names: Sequence[str],
+                   target: str,
+                   input_names: Optional[Sequence[str]] = None) -> None:
+        """Adds the transfer of double scalar values (``getOutputDoubleValues`` /
+        ``setInputDoubleValues``), sent in a single message.
+
+        Parameters
+        ----------
+        source : str
+            group of the problem providing the values.
+        names : Sequence[str]
+            names of the outputs of the source problem.
+        target : str
+            group of the problem receiving the values.
+        input_names : Sequence[str]
+            names of the inputs of the target problem (``names`` if None).
+        """
+        tag = self._check("add_values", source, target)
+        input_names = names if input_names is None else input_names
+        if len(input_names) != len(names):
+            raise WrongArgument(prob="MPIExchanger", method="add_values", arg="input_names",
+                                condition=f"{len(input_names)} input names for {len(names)} "
+                                "output names")
+        self._transfers.append(_ValuesTransfer(source, target, tag, names, input_names))
+
+    def add_field(self,
+                  source: str,
+                  output_name: str,
+                  target: str,
+                  input_name: Optional[str] = None) -> None:
+        """Adds the transfer of a double field (``getOutputMEDDoubleField`` /
+        ``setInputMEDDoubleField``).
+
+        The field received is written in the template of the target problem
+        (``getInputMEDDoubleFieldTemplate``): each rank of the target group must receive as many
+        values as the rank of same index of the source group sends.
+
+        Parameters
+        ----------
+        source : str
+            group of the problem providing the field.
+        output_name : str
+            name of the output field of the source problem.
+        target : str
+            group of the problem receiving the field.
+        input_name : str
+            name of the input field of the target problem (``output_name`` if None).
+
+        Raises
+        ------
+        WrongArgument
+            exception if the groups do not have the same size (raised on the ranks of both
+            groups).
+        """
+        tag = self._check("add_field", source, target)
+        groups = self._groups
+        if groups.parallel:
+            for local, remote in ((source, target), (target, source)):
+                if (local in groups.local
+                        and groups.comm.Get_size() != groups.intercomm(remote).Get_remote_size()):
+                    raise WrongArgument(prob="MPIExchanger", method="add_field", arg="target",
+                                        condition=f"groups {source} and {target} do not have the "
+                                        "same size")
+        self._transfers.append(_FieldTransfer(source, target, tag, output_name,
+                                              output_name if input_name is None else input_name))
+
+    def send(self) -> None:
+        """Reads the outputs of the local problems and sends them (without waiting for the
+        receivers). The previous sends are completed first."""
+        self._wait_sends()
+        for transfer in self._transfers:
+            if transfer.source in self._problems:
+                transfer.read(self._problems[transfer.source])
+                if self._groups.parallel:
+                    intercomm = self._groups.intercomm(transfer.target)
+                    for peer in transfer.peers(self._groups.comm.Get_rank(),
+                                               intercomm.Get_remote_size(), sending=True):
+                        self._send_requests.append(
+                            intercomm.Isend(transfer.sent, dest=peer, tag=transfer.tag))
+
+    def post(self) -> None:
+        """Posts the receives of the inputs of the local problems, if not already posted."""
+        if self._posted:
+            return
+        for transfer in self._transfers:
+            if transfer.target in self._problems:
+                buffer = transfer.allocate(self._problems[transfer.target])
+                if self._groups.parallel:
+                    intercomm = self._groups.intercomm(transfer.source)
+                    for peer in transfer.peers(self._groups.comm.Get_rank(),
+                                               intercomm.Get_remote_size(), sending=False):
+                        self._recv_requests.append(
+                            intercomm.Irecv(buffer, source=peer, tag=transfer.tag))
+        self._posted = True
+
+    def receive(self) -> None:
+        """Waits for the inputs of the local problems (posting their receives if needed) and
+        writes them to the problems.
+
+        Without parallel groups, the inputs are the outputs read by the last :meth:`send`.
+        """
+        self.post()
+        if self._groups.parallel:
+            MPI.Request.Waitall(self._recv_requests)
+            self._recv_requests.clear()
+        for transfer in self._transfers:
+            if transfer.target in self._problems:
+                if not self._groups.parallel:
+                    np.copyto(transfer.received, transfer.sent)
+                transfer.write(self._problems[transfer.target])
+        self._posted = False
+
+    def exchange(self) -> None:
+        """Sends the outputs of the local problems, receives their inputs and posts the receives
+        of the next exchange, which complete while the problems solve their time step.
+
+        Usable as exchange callback of :class:`icoco.coupling.CouplingDriver`.
+        """
+        self.send()
+        self.receive()
+        self.post()
+
+    def _wait_sends(self) -> None:
+        if self._send_requests:
+            MPI.Request.Waitall(self._send_requests)
+            self._send_requests.clear()
+
+    def close(self) -> None:
+        """Completes the pending sends and cancels the pending receives."""
+        self._wait_sends()
+        for request in self._recv_requests:
+            request.Cancel()
+            request.Wait()
+        self._recv_requests.clear()
+        self._posted = False
+
+
+class StepReducer:
+    """Reduction across ranks of the quantities negotiated at each time step, in one message.
+
+    The ranks add their local contributions (:meth:`add_time_step`, :meth:`add_success`,
+    :meth:`add_stationary`, :meth:`add_residual`), possibly several times if they run several
+    problems, then reduce them all at once with :meth:`allreduce` (or :meth:`start` and
+    :meth:`wait` to overlap the reduction with work). The contributions are packed in a
+    preallocated buffer, reduced by a single ``Allreduce`` (``MPI.MAX``): a time loop needs one
+    reduction after ``solveTimeStep`` and one after ``validateTimeStep`` (time step and stationarity
+    of the next step) instead of one per quantity::
+
+        reducer = StepReducer(groups.world, n_residuals=1)
+        ...
+        success = problem.solveTimeStep()
+        reducer.add_success(success)
+        reducer.add_residual(0, residual_norm)
+        reducer.allreduce()
+        if reducer.success:
+            problem.validateTimeStep()
+        ...
+        reducer.add_time_step(*problem.computeTimeStep())
+        reducer.add_stationary(problem.isStationary())
+        reducer.allreduce()
+        if reducer.stop or reducer.stationary:
+            ...
+
+    Contributions not added by a rank do not change the result. They are cleared by each
+    reduction.
+    """
+
+    _DT, _STOP, _FAILED, _UNSTEADY = range(4)  # slots of the buffer, the residuals following
+
+    def __init__(self, comm: Any = None, n_residuals: int = 0) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        comm : MPI.Intracomm
+            communicator of the ranks (the one given to ``setMPIComm``, or
+            :attr:`RankGroups.world` for coupled groups). Without communicator (or without
+            mpi4py), the reductions are local.
+        n_residuals : int
+            number of residual norms reduced.
+        """
+        self._comm = comm if comm is not None and comm.Get_size() > 1 else None
+        self._local = np.empty(4 + n_residuals, dtype=np.float64)
+        self._global = np.empty(4 + n_residuals, dtype=np.float64)
+        self._sending = np.empty(4 + n_residuals, dtype=np.float64)  # of the pending reduction
+        self._request = None
+        self.clear()
+        self._global[:] = self._local
+
+    def clear(self) -> None:
+        """Clears the local contributions (done by each reduction)."""
+        self._local[self._DT] = -np.inf  # dt = -max(-dt)
+        self._local[self._DT + 1:] = 0.0  # flags (0 or 1) and residual norms (positive)
+
+    def add_time_step(self, dt: float, stop: bool = False) -> None:
+        """Adds a time step (the minimum is kept) and a request to stop (any stops).
+
+        Parameters
+        ----------
+        dt : float
+            time step of the rank, as returned by ``computeTimeStep``.
+        stop : bool
+            stop request of the rank, as returned by ``computeTimeStep``.
+        """
+        local = self._local
+        local[self._DT] = max(local[self._DT], -dt)
+        if stop:
+            local[self._STOP] = 1.0
+
+    def add_success(self, success: bool) -> None:
+        """Adds the success of a resolution (succeeds if all succeed)."""
+        if not success:
+            self._local[self._FAILED] = 1.0
+
+    def add_stationary(self, stationary: bool) -> None:
+        """Adds the stationarity of a problem (stationary if all are)."""
+        if not stationary:
+            self._local[self._UNSTEADY] = 1.0
+
+    def add_residual(self, index: int, norm: float) -> None:
+        """Adds a residual norm (the maximum is kept).
+
+        Parameters
+        ----------
+        index : int
+            index of the residual, lower than ``n_residuals``.
+        norm : float
+            norm of the residual on the rank.
+        """
+        local = self._local
+        local[4 + index] = max(local[4 + index], norm)
+
+    def allreduce(self) -> None:
+        """Reduces the contributions of all the ranks (blocking), then clears them.
+
+        A reduction started by :meth:`start` is completed first.
+        """
+        self.wait()
+        if self._comm is not None:
+            self._comm.Allreduce(self._local, self._global, op=MPI.MAX)
+        else:
+            np.copyto(self._global, self._local)
+        self.clear()
+
+    def start(self) -> None:
+        """Starts the reduction of the contributions of all the ranks (non-blocking).
+
+        The results are available after :meth:`wait`. Contributions may be added for the next
+        reduction in the meantime.
+        """
+        self.wait()
+        if self._comm is not None:
+            np.copyto(self._sending, self._local)
+            self._request = self._comm.Iallreduce(self._sending, self._global, op=MPI.MAX)
+        else:
+            np.copyto(self._global, self._local)
+        self.clear()
+
+    def wait(self) -> None:
+        """Completes the reduction started by :meth:`start`."""
+        if self._request is not None:
+            self._request.Wait()
+            self._request = None
+
+    @property
+    def dt(self) -> float:
+        """Minimum of the time steps (inf if none was added)."""
+        return -float(self._global[self._DT])
+
+    @property
+    def stop(self) -> bool:
+        """True if a stop was requested."""
+        return bool(self._global[self._STOP])
+
+    @property
+    def success(self) -> bool:
+        """True if all the resolutions succeeded."""
+        return not self._global[self._FAILED]
+
+    @property
+    def stationary(self) -> bool:
+        """True if all the problems are stationary."""
+        return not self._global[self._UNSTEADY]
+
+    @property
+    def residuals(self) -> np.ndarray:
+        """Maximum of the residual norms (read-only view)."""
+        residuals = self._global[4:]
+        residuals.flags.writeable = False
+        return residuals
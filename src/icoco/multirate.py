@@ -0,0 +1,348 @@
+"""
+Multi-rate coupling of slow and fast :class:`icoco.problem.Problem` instances.
+
+:class:`MultiRateCoupling` lets the fast problems subcycle within the time steps (the coupling
+windows) of the slow problems, instead of forcing the slow problems down to the small time step.
+The inputs of the fast problems are interpolated in time (:class:`TimeInterpolation`, linear or
+cubic) from the outputs of the slow problems at the window boundaries. The data are exchanged with
+the :class:`icoco.implicit.Exchange` classes.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+import numpy as np
+
+from .coupling import CouplingDriver
+from .exception import WrongArgument, WrongContext
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .adaptive import TimeStepController  # pylint: disable=unused-import
+    from .implicit import Exchange  # pylint: disable=unused-import
+    from .problem import Problem  # pylint: disable=unused-import
+
+
+class TimeInterpolation:
+    """Values of an exchange at successive times, interpolated in time for its target.
+
+    The last ``order + 1`` values read from the source are kept in a preallocated buffer and
+    interpolated with Lagrange polynomials: linear (``order=1``) between the last two values, cubic
+    (``order=3``) through the last four. With fewer values, the degree is reduced (constant with a
+    single value). Times out of the stored range are extrapolated.
+    """
+
+    def __init__(self, exchange: Exchange, order: int = 1) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        exchange : Exchange
+            exchange whose source values are interpolated for its target.
+        order : int
+            degree of the interpolation: 1 (linear) or 3 (cubic).
+        """
+        if order not in (1, 3):
+            raise WrongArgument(prob="TimeInterpolation", method="TimeInterpolation",
+                                arg="order", condition="order must be 1 (linear) or 3 (cubic)")
+        self._exchange = exchange
+        self._order = order
+        self._times: List[float] = [0.0] * (order + 1)
+        self._weights = np.zeros(order + 1)
+        self._values = np.empty((0, 0))
+        self._result = np.empty(0)
+        self._count = 0
+
+    @property
+    def exchange(self) -> Exchange:
+        """Interpolated exchange."""
+        return self._exchange
+
+    @property
+    def order(self) -> int:
+        """Degree of the interpolation."""
+        return self._order
+
+    @property
+    def last_time(self) -> float:
+        """Time of the last stored values (-inf if none)."""
+        if self._count == 0:
+            return -np.inf
+        return self._times[(self._count - 1) % (self._order + 1)]
+
+    def clear(self) -> None:
+        """Forgets the stored values."""
+        self._count = 0
+
+    def push(self, time: float) -> None:
+        """Reads the values of the source and stores them as the values at time.
+
+        Values stored at the same time as the last ones replace them.
+
+        Parameters
+        ----------
+        time : float
+            time of the values, greater than (or equal to) the time of the last values.
+        """
+        values = np.asarray(self._exchange.read(), dtype=np.float64).reshape(-1)
+        if self._values.shape[1] != values.size:
+            self._values = np.zeros((self._order + 1, values.size))
+            self._result = np.empty(values.size)
+            self._count = 0
+        if self._count > 0 and time == self.last_time:
+            self._count -= 1
+        slot = self._count % (self._order + 1)
+        self._times[slot] = time
+        self._values[slot] = values
+        self._count += 1
+
+    def interpolate(self, time: float) -> np.ndarray:
+        """Interpolates the stored values at time.
+
+        Parameters
+        ----------
+        time : float
+            interpolation time.
+
+        Returns
+        -------
+        np.ndarray
+            the (1D) interpolated values, in a buffer overwritten by the next call.
+        """
+        if self._count == 0:
+            raise WrongContext(prob="TimeInterpolation", method="interpolate",
+                               precondition="called before push")
+        times = self._times
+        weights = self._weights
+        n_times = min(self._count, self._order + 1)
+        for j in range(n_times):
+            weight = 1.0
+            for m in range(n_times):
+                if m != j:
+                    weight *= (time - times[m]) / (times[j] - times[m])
+            weights[j] = weight
+        return np.dot(weights, self._values, out=self._result)
+
+    def write(self, time: float) -> None:
+        """Writes the values interpolated at time to the target of the exchange.
+
+        Parameters
+        ----------
+        time : float
+            interpolation time.
+        """
+        self._exchange.write(self.interpolate(time))
+
+
+class _Subcycling(CouplingDriver):
+    """CouplingDriver recording the time step being tried."""
+
+    dt: float = 0.0
+    """Time step being tried."""
+
+    def try_time_step(self, dt: float) -> bool:
+        self.dt = dt
+        return super().try_time_step(dt)
+
+
+class MultiRateCoupling:  # pylint: disable=too-many-instance-attributes
+    """Explicit multi-rate coupling of slow and fast problems.
+
+    Each coupling window:
+
+    - the exchanges to the slow problems (``to_slow``) are transferred from the fast problems, at
+      the beginning of the window;
+    - the slow problems compute one time step (the window), negotiated with their
+      ``computeTimeStep`` (bounded by ``window``);
+    - the fast problems subcycle until the end of the window with their own time steps. Before each
+      of their time steps, the exchanges to the fast problems (``to_fast``) are interpolated in
+      time at the end of the time step, from the values of the slow problems at the boundaries of
+      the last windows (see :class:`TimeInterpolation`).
+
+    The slow and the fast problems are run by two :class:`icoco.coupling.CouplingDriver` (see
+    :attr:`slow_driver` and :attr:`fast_driver`): the time step negotiation, the reduction of the
+    time step on failure and the timings are theirs. The present time of the slow (fast) problems
+    is the one of the first slow (fast) problem.
+    """
+
+    def __init__(self,  # pylint: disable=too-many-arguments
+                 slow: Sequence[Problem],
+                 fast: Sequence[Problem],
+                 to_fast: Sequence[Exchange] = (),
+                 to_slow: Sequence[Exchange] = (),
+                 order: int = 1,
+                 *,
+                 window: float = float("inf"),
+                 slow_controller: Optional[TimeStepController] = None,
+                 fast_controller: Optional[TimeStepController] = None,
+                 **kwargs) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        slow : Sequence[Problem]
+            slow problems, defining the coupling windows.
+        fast : Sequence[Problem]
+            fast problems, subcycling within the coupling windows.
+        to_fast : Sequence[Exchange]
+            exchanges from the slow problems to the fast problems, interpolated in time.
+        to_slow : Sequence[Exchange]
+            exchanges from the fast problems to the slow problems, at the window beginning.
+        order : int
+            degree of the time interpolation: 1 (linear) or 3 (cubic).
+        window : float
+            upper bound of the coupling window.
+        slow_controller : TimeStepController
+            time-step controller of the coupling windows (see :mod:`icoco.adaptive`).
+        fast_controller : TimeStepController
+            time-step controller of the subcycles, distinct from ``slow_controller`` since a
+            controller predicts from the history of its own time steps.
+        kwargs
+            other arguments of both :class:`icoco.coupling.CouplingDriver` (``dt_factor``,
+            ``max_retries``, ``max_workers``, ``thread_unsafe``).
+
+        Raises
+        ------
+        WrongArgument
+            if ``controller`` is given (use ``slow_controller`` and ``fast_controller``), or if
+            the slow and fast controllers are the same object.
+        """
+        if "controller" in kwargs:
+            raise WrongArgument(prob="MultiRateCoupling", method="MultiRateCoupling",
+                                arg="controller", condition="a controller can not be shared by "
+                                "the slow and fast problems: use slow_controller and "
+                                "fast_controller")
+        if slow_controller is not None and slow_controller is fast_controller:
+            raise WrongArgument(prob="MultiRateCoupling", method="MultiRateCoupling",
+                                arg="fast_controller",
+                                condition="fast_controller must differ from slow_controller")
+        self._interpolations = tuple(TimeInterpolation(exchange, order) for exchange in to_fast)
+        self._to_slow = tuple(to_slow)
+        self._window = window
+        self._slow = CouplingDriver(slow, exchanges=[self._exchange_to_slow],
+                                    controller=slow_controller, **kwargs)
+        self._fast = _Subcycling(fast, exchanges=[self._exchange_to_fast],
+                                 controller=fast_controller, **kwargs)
+        self._slow_time = self._slow.problems[0].presentTime
+        self._fast_time = self._fast.problems[0].presentTime
+        self.n_windows = 0
+        """Number of computed coupling windows."""
+
+    def __enter__(self) -> MultiRateCoupling:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Releases the thread pools (if any)."""
+        self._slow.close()
+        self._fast.close()
+
+    @property
+    def slow_driver(self) -> CouplingDriver:
+        """Driver of the slow problems."""
+        return self._slow
+
+    @property
+    def fast_driver(self) -> CouplingDriver:
+        """Driver of the fast problems."""
+        return self._fast
+
+    @property
+    def interpolations(self) -> Sequence[TimeInterpolation]:
+        """Time interpolations of the exchanges to the fast problems."""
+        return self._interpolations
+
+    def initialize(self) -> bool:
+        """Initializes all problems and forgets the interpolated values.
+
+        Returns
+        -------
+        bool
+            True if all problems were successfully initialized.
+        """
+        for interpolation in self._interpolations:
+            interpolation.clear()
+        slow_success = self._slow.initialize()
+        return self._fast.initialize() and slow_success
+
+    def terminate(self) -> None:
+        """Terminates all problems."""
+        self._slow.terminate()
+        self._fast.terminate()
+
+    def _exchange_to_slow(self) -> None:
+        """Transfers the exchanges to the slow problems."""
+        for exchange in self._to_slow:
+            exchange.write(np.atleast_1d(np.asarray(exchange.read(), dtype=np.float64)))
+
+    def _exchange_to_fast(self) -> None:
+        """Writes the exchanges to the fast problems, interpolated at the end of their time step."""
+        time = self._fast_time() + self._fast.dt
+        for interpolation in self._interpolations:
+            interpolation.write(time)
+
+    def step(self, dt_max: float = float("inf")) -> bool:
+        """Computes one coupling window.
+
+        Parameters
+        ----------
+        dt_max : float
+            upper bound of the window.
+
+        Returns
+        -------
+        bool
+            False if a problem requested to stop, True otherwise. A slow problem requesting to stop
+            stops the coupling before the window, a fast problem within the window (the slow
+            problems being at its end).
+
+        Raises
+        ------
+        RuntimeError
+            if a time step still fails after ``max_retries`` reductions.
+        """
+        start = self._slow_time()
+        for interpolation in self._interpolations:
+            if interpolation.last_time != start:
+                interpolation.push(start)
+        if not self._slow.step(dt_max=min(dt_max, self._window)):
+            return False
+        end = self._slow_time()
+        for interpolation in self._interpolations:
+            interpolation.push(end)
+        self.n_windows += 1
+        time = self._fast_time()
+        while end - time > 1.e-12 * max(1.0, abs(end)):
+            if not self._fast.step(dt_max=end - time):
+                return False
+            time = self._fast_time()
+        return True
+
+    def run(self, time_max: float = float("inf"), max_windows: Optional[int] = None) -> int:
+        """Runs the coupling windows until a problem requests to stop, ``time_max`` is reached or
+        ``max_windows`` windows are computed.
+
+        ``time_max`` is considered as reached within a relative tolerance of 1e-12.
+
+        Parameters
+        ----------
+        time_max : float
+            final time.
+        max_windows : int
+            maximum number of coupling windows.
+
+        Returns
+        -------
+        int
+            number of computed coupling windows.
+        """
+        n_windows = 0
+        while max_windows is None or n_windows < max_windows:
+            time = self._slow_time()
+            remaining = time_max - time
+            if remaining <= 1.e-12 * max(1.0, abs(time)) or not self.step(dt_max=remaining):
+                break
+            n_windows += 1
+        return n_windows
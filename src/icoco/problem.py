@@ -13,9 +13,10 @@ This module contains the API for ICoCo specifications
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import TYPE_CHECKING, List, Tuple
+from typing import TYPE_CHECKING, FrozenSet, List, Sequence, Tuple, Union
 
-from .exception import NotImplementedMethod
+from .exception import NotImplementedMethod, WrongArgument
+from .utils import ICoCoMethods
 from .version import get_icoco_version, get_version_int
 
 
@@ -29,6 +30,7 @@ if TYPE_CHECKING:  # pragma: no cover
         class MEDCouplingField:  # pylint: disable=too-few-public-methods
             """dummy class for MEDCouplingField type hinting"""
     from mpi4py.MPI import Intracomm as MPIComm  # type: ignore  # pylint: disable=unused-import
+    import numpy as np
 
 
 ICOCO_VERSION = get_icoco_version()
@@ -38,6 +40,8 @@ ICOCO_MAJOR_VERSION = int(get_version_int()[0])
 ICOCO_MINOR_VERSION = int(get_version_int()[1])
 """ICoCo version minor Y."""
 
+_ICOCO_METHODS = frozenset(ICoCoMethods.ALL)
+
 
 class ValueType(Enum):
     """The various possible types for fields or scalar values."""
@@ -50,6 +54,30 @@ class ValueType(Enum):
     """String scalar value or field type"""
 
 
+class ValuesHandle:  # pylint: disable=too-few-public-methods
+    """Precompiled list of scalar value names, see :meth:`Problem.getValuesHandle`."""
+
+    __slots__ = ("names", "indices")
+
+    def __init__(self, names: Sequence[str], indices=None) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        names : Sequence[str]
+            names of the scalar values.
+        indices
+            code specific resolution of the names (for instance indices in an array of values).
+        """
+        self.names = tuple(names)
+        """Names of the scalar values."""
+        self.indices = indices
+        """Code specific resolution of the names, None by default."""
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
 class Problem(ABC):
     """
     API that a code has to implement in order to comply with the ICoCo (version 2) norm.
@@ -90,6 +118,14 @@ class Problem(ABC):
     Python SWIG.
     """
 
+    _problem_name = "icoco.problem.Problem"
+    """Qualified name of the class (``module.name``), used in the exceptions raised."""
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        # the name is computed once per class rather than at each exception raised
+        super().__init_subclass__(**kwargs)
+        cls._problem_name = f"{cls.__module__}.{cls.__name__}"
+
     @staticmethod
     def GetICoCoMajorVersion() -> int:
         """Return ICoCo interface major version number.
@@ -101,6 +137,72 @@ class Problem(ABC):
         """
         return ICOCO_MAJOR_VERSION
 
+    # ******************************************************
+    # section Capabilities (not part of the ICoCo norm)
+    # ******************************************************
+
+    @classmethod
+    def implemented_methods(cls) -> FrozenSet[str]:
+        """Returns the names of the ICoCo methods implemented by the class.
+
+        This allows to know whether an optional method is available without calling it (and
+        catching ``NotImplementedMethod``). The result is computed once per class, by
+        :meth:`detect_implemented_methods`.
+
+        Returns
+        -------
+        FrozenSet[str]
+            names of the implemented methods (among ``ICoCoMethods.ALL``).
+        """
+        implemented = cls.__dict__.get("_implemented_methods")
+        if implemented is None:
+            implemented = cls.detect_implemented_methods()
+            cls._implemented_methods = implemented
+        return implemented
+
+    @classmethod
+    def detect_implemented_methods(cls) -> FrozenSet[str]:
+        """Detects the ICoCo methods implemented by the class, see :meth:`implemented_methods`.
+
+        The default implementation returns ``GetICoCoMajorVersion`` and the methods overridden by
+        the class (or one of its bases). Classes whose methods always exist, such as SWIG proxies
+        of C++ codes, should override it to return the methods actually implemented by the code.
+
+        Returns
+        -------
+        FrozenSet[str]
+            names of the implemented methods (among ``ICoCoMethods.ALL``).
+        """
+        return frozenset(name for name in ICoCoMethods.ALL
+                         if name == "GetICoCoMajorVersion"
+                         or getattr(cls, name) is not getattr(Problem, name))
+
+    def supports(self, method: str) -> bool:
+        """Tells whether an ICoCo method is implemented, without calling it.
+
+        Parameters
+        ----------
+        method : str
+            name of the ICoCo method.
+
+        Returns
+        -------
+        bool
+            True if the method is implemented (see :meth:`implemented_methods`).
+
+        Raises
+        ------
+        WrongArgument
+            exception if method is not an ICoCo method.
+        """
+        if method in self.implemented_methods():
+            return True
+        if method not in _ICOCO_METHODS:
+            raise WrongArgument(prob=self._problem_name,
+                                method="supports", arg="method",
+                                condition=f"'{method}' is not an ICoCo method")
+        return False
+
     # ******************************************************
     # section Problem
     # ******************************************************
@@ -122,7 +224,7 @@ class Problem(ABC):
         WrongArgument
             exception if an invalid path is provided.
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="setDataFile")
 
     def setMPIComm(self, mpicomm: MPIComm) -> None:  # noqa: F821
@@ -144,7 +246,7 @@ class Problem(ABC):
         WrongArgument
             exception if an invalid path is provided.
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="setMPIComm")
 
     @abstractmethod
@@ -371,7 +473,7 @@ class Problem(ABC):
             meaning we shouldn't request this information while the computation of a new time
             step is in progress.
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="isStationary")
 
     def abortTimeStep(self) -> None:
@@ -387,7 +489,7 @@ class Problem(ABC):
             exception if called before initialize() or after terminate().
              exception if called outside the TIME_STEP_DEFINED context (see Problem documentation).
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="abortTimeStep")
 
     def resetTime(self, time: float) -> None:
@@ -411,7 +513,7 @@ class Problem(ABC):
             exception if called before initialize() or after terminate().
             exception if called inside the TIME_STEP_DEFINED context (see Problem documentation)
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="resetTime")
 
     def iterateTimeStep(self) -> Tuple[bool, bool]:
@@ -437,7 +539,7 @@ class Problem(ABC):
             exception if called before initialize() or after terminate().
             exception if called outside the TIME_STEP_DEFINED context (see Problem documentation)
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="iterateTimeStep")
 
     # ******************************************************
@@ -471,7 +573,7 @@ class Problem(ABC):
         WrongArgument
             exception if the method or label argument is invalid.
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="save")
 
     def restore(self, label: int, method: str) -> None:
@@ -502,7 +604,7 @@ class Problem(ABC):
         WrongArgument
             exception if the method or label argument is invalid.
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="restore")
 
     def forget(self, label: int, method: str) -> None:
@@ -529,7 +631,7 @@ class Problem(ABC):
         WrongArgument
             exception if the method or label argument is invalid.
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="forget")
 
     # ******************************************************
@@ -549,7 +651,7 @@ class Problem(ABC):
         WrongContext
             exception if called before initialize() or after terminate().
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="getInputFieldsNames")
 
     def getOutputFieldsNames(self) -> List[str]:
@@ -565,7 +667,7 @@ class Problem(ABC):
         WrongContext
             exception if called before initialize() or after terminate().
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="getOutputFieldsNames")
 
     def getFieldType(self, name: str) -> ValueType:
@@ -590,7 +692,7 @@ class Problem(ABC):
         WrongContext
             exception if called before initialize() or after terminate().
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="getFieldType")
 
     def getMeshUnit(self) -> str:
@@ -606,7 +708,7 @@ class Problem(ABC):
         WrongContext
             exception if called before initialize() or after terminate().
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="getMeshUnit")
 
     def getFieldUnit(self, name: str) -> str:
@@ -629,7 +731,7 @@ class Problem(ABC):
         WrongContext
             exception if called before initialize() or after terminate().
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="getFieldUnit")
 
     def getInputMEDDoubleFieldTemplate(self, name: str) -> medcoupling.MEDCouplingFieldDouble:
@@ -698,7 +800,7 @@ class Problem(ABC):
             exception if the time property of 'afield' does not belong to the currently computed
             time step ]t, t + dt]
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="setInputMEDDoubleField")
 
     def getOutputMEDDoubleField(self, name: str) -> medcoupling.MEDCouplingFieldDouble:
@@ -728,7 +830,7 @@ class Problem(ABC):
         WrongArgument
             exception if the field name ('name' parameter) is invalid.
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="getOutputMEDDoubleField")
 
     def updateOutputMEDDoubleField(self,
@@ -815,7 +917,7 @@ class Problem(ABC):
             exception if the time property of 'afield' does not belong to the currently computed
             time step ]t, t + dt]
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="setInputMEDIntField")
 
     def getOutputMEDIntField(self, name: str) -> medcoupling.MEDCouplingFieldInt:
@@ -842,7 +944,7 @@ class Problem(ABC):
         WrongArgument
             exception if the field name ('name' parameter) is invalid.
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="getOutputMEDIntField")
 
     def updateOutputMEDIntField(self,
@@ -869,7 +971,7 @@ class Problem(ABC):
             exception if the field name ('name' parameter) is invalid.
             exception if the field object is inconsistent with the field being requested.
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="updateOutputMEDIntField")
 
     def getInputMEDStringFieldTemplate(self, name: str) -> medcoupling.MEDCouplingField:
@@ -930,7 +1032,7 @@ class Problem(ABC):
             exception if the time property of 'afield' does not belong to the currently computed
             time step ]t, t + dt]
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="setInputMEDStringField")
 
     def getOutputMEDStringField(self, name: str) -> medcoupling.MEDCouplingField:
@@ -961,7 +1063,7 @@ class Problem(ABC):
         WrongArgument
             exception if the field name ('name' parameter) is invalid.
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="getOutputMEDStringField")
 
     def updateOutputMEDStringField(self,
@@ -1020,7 +1122,7 @@ class Problem(ABC):
         bool
             True if it is 64-bits
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="isMEDCoupling64Bits")
 
     # ******************************************************
@@ -1041,7 +1143,7 @@ class Problem(ABC):
             exception if called before initialize() or after terminate().
         """
 
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="getInputValuesNames")
 
     def getOutputValuesNames(self) -> List[str]:
@@ -1057,7 +1159,7 @@ class Problem(ABC):
         WrongContext
             exception if called before initialize() or after terminate().
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="getOutputValuesNames")
 
     def getValueType(self, name: str) -> ValueType:
@@ -1082,7 +1184,7 @@ class Problem(ABC):
         WrongContext
             exception if called before initialize() or after terminate().
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="getValueType")
 
     def getValueUnit(self, name: str) -> str:
@@ -1105,7 +1207,7 @@ class Problem(ABC):
         WrongContext
             exception if called before initialize() or after terminate().
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="getValueUnit")
 
     def setInputDoubleValue(self, name: str, val: float) -> None:
@@ -1127,7 +1229,7 @@ class Problem(ABC):
         WrongContext
             exception if called before initialize() or after terminate().
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="setInputDoubleValue")
 
     def getOutputDoubleValue(self, name: str) -> float:
@@ -1152,7 +1254,7 @@ class Problem(ABC):
         WrongContext
              exception if called before initialize() or after terminate().
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="getOutputDoubleValue")
 
     def setInputIntValue(self, name: str, val: int) -> None:
@@ -1174,7 +1276,7 @@ class Problem(ABC):
         WrongContext
             exception if called before initialize() or after terminate().
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="setInputIntValue")
 
     def getOutputIntValue(self, name: str) -> int:
@@ -1199,7 +1301,7 @@ class Problem(ABC):
         WrongContext
              exception if called before initialize() or after terminate().
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="getOutputIntValue")
 
     def setInputStringValue(self, name: str, val: str) -> None:
@@ -1221,7 +1323,7 @@ class Problem(ABC):
         WrongContext
             exception if called before initialize() or after terminate().
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="setInputStringValue")
 
     def getOutputStringValue(self, name: str) -> str:
@@ -1246,5 +1348,126 @@ class Problem(ABC):
         WrongContext
              exception if called before initialize() or after terminate().
         """
-        raise NotImplementedMethod(prob=f"{self.__class__.__module__}.{self.__class__.__name__}",
+        raise NotImplementedMethod(prob=self._problem_name,
                                    method="getOutputStringValue")
+
+    # ******************************************************
+    # section Batched scalar values I/O (not part of the ICoCo norm)
+    # ******************************************************
+
+    def getValuesHandle(self, names: Sequence[str]) -> ValuesHandle:
+        """Precompiles a list of scalar value names for the batched scalar values I/O methods.
+
+        The default implementation does not resolve the names (``indices`` is None). A code may
+        override it to resolve them once (for instance into indices in an array of values),
+        and use the resolution in its overrides of the batched methods.
+
+        Parameters
+        ----------
+        names : Sequence[str]
+            names of the scalar values.
+
+        Returns
+        -------
+        ValuesHandle
+            the handle to pass to the batched methods instead of the names.
+        """
+        return ValuesHandle(names)
+
+    def getOutputDoubleValues(self, names: Union[Sequence[str], ValuesHandle]) -> np.ndarray:
+        """Retrieves several scalar double values from the code.
+
+        The default implementation calls :meth:`getOutputDoubleValue` for each name.
+
+        Parameters
+        ----------
+        names : Union[Sequence[str], ValuesHandle]
+            names of the scalar values to be read from the code, or their handle.
+
+        Returns
+        -------
+        np.ndarray
+            the values read from the code (float64).
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel, redefined-outer-name
+        if isinstance(names, ValuesHandle):
+            names = names.names
+        return np.fromiter((self.getOutputDoubleValue(name) for name in names),
+                           dtype=np.float64, count=len(names))
+
+    def setInputDoubleValues(self,
+                             names: Union[Sequence[str], ValuesHandle],
+                             vals: np.ndarray) -> None:
+        """Provides the code with several scalar double data.
+
+        The default implementation calls :meth:`setInputDoubleValue` for each name.
+
+        Parameters
+        ----------
+        names : Union[Sequence[str], ValuesHandle]
+            names of the scalar values given to the code, or their handle.
+        vals : np.ndarray
+            values passed to the code, in the order of the names.
+
+        Raises
+        ------
+        WrongArgument
+            exception if names and vals do not have the same size.
+        """
+        for name, val in zip(names.names if isinstance(names, ValuesHandle) else names,
+                             self._batched_values(names, vals, "setInputDoubleValues", float)):
+            self.setInputDoubleValue(name, val)
+
+    def getOutputIntValues(self, names: Union[Sequence[str], ValuesHandle]) -> np.ndarray:
+        """Retrieves several int values from the code.
+
+        The default implementation calls :meth:`getOutputIntValue` for each name.
+
+        Parameters
+        ----------
+        names : Union[Sequence[str], ValuesHandle]
+            names of the int values to be read from the code, or their handle.
+
+        Returns
+        -------
+        np.ndarray
+            the values read from the code (int64).
+        """
+        import numpy as np  # pylint: disable=import-outside-toplevel, redefined-outer-name
+        if isinstance(names, ValuesHandle):
+            names = names.names
+        return np.fromiter((self.getOutputIntValue(name) for name in names),
+                           dtype=np.int64, count=len(names))
+
+    def setInputIntValues(self,
+                          names: Union[Sequence[str], ValuesHandle],
+                          vals: np.ndarray) -> None:
+        """Provides the code with several int data.
+
+        The default implementation calls :meth:`setInputIntValue` for each name.
+
+        Parameters
+        ----------
+        names : Union[Sequence[str], ValuesHandle]
+            names of the int values given to the code, or their handle.
+        vals : np.ndarray
+            values passed to the code, in the order of the names.
+
+        Raises
+        ------
+        WrongArgument
+            exception if names and vals do not have the same size.
+        """
+        for name, val in zip(names.names if isinstance(names, ValuesHandle) else names,
+                             self._batched_values(names, vals, "setInputIntValues", int)):
+            self.setInputIntValue(name, val)
+
+    def _batched_values(self, names, vals, method: str, dtype: type) -> list:
+        """Returns vals as a list of Python scalars, after checking its size."""
+        import numpy as np  # pylint: disable=import-outside-toplevel, redefined-outer-name
+        vals = np.asarray(vals, dtype=dtype).reshape(-1)
+        if vals.size != len(names):
+            raise WrongArgument(prob=self._problem_name,
+                                method=method, arg="vals",
+                                condition=f"{vals.size} values for {len(names)} names")
+        return vals.tolist()
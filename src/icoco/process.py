@@ -0,0 +1,335 @@
+"""
+Out-of-process :class:`icoco.problem.Problem` proxy.
+
+:class:`ProcessProblem` instantiates a problem in a worker process and forwards it all the ICoCo
+methods through a pipe. NumPy arrays (and the arrays of :class:`icoco.field.Field` and of its
+:class:`icoco.field.Mesh`) passed as arguments or returned by the methods are not pickled: they
+are copied into shared memory blocks (``multiprocessing.shared_memory``, Python >= 3.8) which are
+reused from call to call as long as the arrays fit in.
+
+This allows to run several non thread-safe codes concurrently on one node, and isolates crashes
+of the codes from the supervisor.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from typing import Any, Dict, FrozenSet, Hashable, Optional, Sequence, Type
+
+import numpy as np
+
+from .exception import WrongArgument
+from .field import Field, Mesh
+from .problem import Problem
+from .utils import ICoCoExtensions, ICoCoMethods
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # pragma: no cover
+    resource_tracker = shared_memory = None  # pylint: disable=invalid-name
+
+
+class _SharedArray:  # pylint: disable=too-few-public-methods
+    """Reference to an array stored in a shared memory block."""
+
+    __slots__ = ("key", "block", "dtype", "shape")
+
+    def __init__(self, key: Hashable, block: str, dtype: str, shape: tuple) -> None:
+        self.key = key
+        self.block = block
+        self.dtype = dtype
+        self.shape = shape
+
+
+_MESH_ARRAYS = ("coordinates", "connectivity", "connectivity_index")
+
+
+class _SharedMesh:  # pylint: disable=too-few-public-methods
+    """Mesh whose arrays are stored in shared memory blocks."""
+
+    __slots__ = ("name", "dimension", "arrays")
+
+    def __init__(self, mesh: Mesh, arrays: Sequence[_SharedArray]) -> None:
+        self.name = mesh.name
+        self.dimension = mesh.dimension
+        self.arrays = tuple(arrays)  # in the order of _MESH_ARRAYS
+
+
+class _SharedField:  # pylint: disable=too-few-public-methods
+    """Field whose array (and the arrays of its mesh) are stored in shared memory blocks."""
+
+    __slots__ = ("name", "mesh", "attributes", "array")
+
+    def __init__(self, field: Field, array: _SharedArray, mesh: Optional[_SharedMesh]) -> None:
+        self.name = field.name
+        self.mesh = mesh
+        self.attributes = {"unit": field.unit, "time": field.time, "nature": field.nature,
+                           "on_nodes": field.on_nodes}
+        self.array = array
+
+
+class _SharedArrays:
+    """Shared memory blocks of one side of the pipe.
+
+    Blocks written by this side are owned (created and unlinked) by it, one per key (argument
+    position or returned value of a method). Blocks written by the other side are attached, and
+    kept attached as long as the other side reuses them.
+
+    The meshes received are copied out of shared memory, since the copies of a field share its
+    mesh, and kept per key: while the other side sends the same mesh, the kept one is returned
+    (its arrays are only compared).
+    """
+
+    def __init__(self) -> None:
+        self._owned: Dict[Hashable, Any] = {}
+        self._attached: Dict[Hashable, Any] = {}
+        self._stale = []
+        self._meshes: Dict[Hashable, Mesh] = {}
+
+    def encode(self, key: Hashable, value: Any) -> Any:
+        """Copies an array (or the arrays of a field and of its mesh) into the shared blocks of
+        key, returns other values unchanged."""
+        if isinstance(value, Field):
+            array = self.encode(key, value.array)
+            if not isinstance(array, _SharedArray):
+                return value
+            mesh = None
+            if value.mesh is not None:
+                mesh = _SharedMesh(value.mesh, [self.encode((key, name), getattr(value.mesh, name))
+                                                for name in _MESH_ARRAYS])
+            return _SharedField(value, array, mesh)
+        if (shared_memory is None or not isinstance(value, np.ndarray)
+                or value.dtype.hasobject):
+            return value
+        block = self._owned.get(key)
+        if block is None or block.size < value.nbytes:
+            if block is not None:
+                self._release(block, unlink=True)
+            block = shared_memory.SharedMemory(create=True, size=max(value.nbytes, 1))
+            self._owned[key] = block
+        np.ndarray(value.shape, dtype=value.dtype, buffer=block.buf)[...] = value
+        return _SharedArray(key, block.name, value.dtype.str, value.shape)
+
+    def decode(self, value: Any, copy: bool) -> Any:
+        """Returns the array referenced by value (a view on shared memory if not copy)."""
+        if isinstance(value, _SharedField):
+            mesh = None if value.mesh is None else self._decode_mesh(value.array.key, value.mesh)
+            return Field(value.name, self.decode(value.array, copy), mesh, **value.attributes)
+        if not isinstance(value, _SharedArray):
+            return value
+        block = self._attached.get(value.key)
+        if block is None or block.name != value.block:
+            if block is not None:
+                self._release(block, unlink=False)
+            block = shared_memory.SharedMemory(name=value.block)
+            self._attached[value.key] = block
+        dtype = np.dtype(value.dtype)
+        if copy:
+            return np.ndarray(value.shape, dtype=dtype, buffer=block.buf).copy()
+        # contrary to np.ndarray, np.frombuffer keeps block.buf exported as long as the array
+        # lives, which prevents closing the block under its feet.
+        count = int(np.prod(value.shape, dtype=np.int64))
+        return np.frombuffer(block.buf, dtype=dtype, count=count).reshape(value.shape)
+
+    def _decode_mesh(self, key: Hashable, shared: _SharedMesh) -> Mesh:
+        """Returns the mesh received for key: the kept one if unchanged, a copy otherwise."""
+        arrays = [self.decode(array, copy=False) for array in shared.arrays]
+        mesh = self._meshes.get(key)
+        if (mesh is None or (mesh.name, mesh.dimension) != (shared.name, shared.dimension)
+                or not all(np.array_equal(getattr(mesh, name), array)
+                           for name, array in zip(_MESH_ARRAYS, arrays))):
+            mesh = Mesh(shared.name, shared.dimension, *[array.copy() for array in arrays])
+            self._meshes[key] = mesh
+        return mesh
+
+    def _release(self, block, unlink: bool) -> None:
+        """Closes (and unlinks) a block, keeps it open (as stale) if some array still uses it."""
+        if unlink:
+            block.unlink()
+        try:
+            block.close()
+        except BufferError:
+            self._stale.append(block)
+
+    def close(self) -> None:
+        """Releases all the blocks."""
+        stale, self._stale = self._stale, []
+        for block in self._owned.values():
+            self._release(block, unlink=True)
+        for block in stale + list(self._attached.values()):
+            self._release(block, unlink=False)
+        self._owned.clear()
+        self._attached.clear()
+        self._meshes.clear()
+
+
+def _serve(conn, problem_type: Type[Problem], args: tuple, kwargs: dict) -> None:
+    """Worker loop: instantiates the problem and executes the requests received on conn.
+
+    A request is ``(method name, args, kwargs)``, the answer ``(True, result)`` or
+    ``(False, exception)``. ``None`` ends the loop. Arrays received are views on shared memory,
+    only valid during the call. If the problem can not be instantiated, all requests are answered
+    with the exception raised by its constructor.
+    """
+    # pylint: disable=broad-exception-caught
+    transport = _SharedArrays()
+    answer = None
+    try:
+        problem = problem_type(*args, **kwargs)
+    except Exception as error:
+        problem = None
+        answer = (False, error)
+    try:
+        request = conn.recv()
+        while request is not None:
+            name, args, kwargs = request
+            if problem is not None:
+                try:
+                    result = getattr(problem, name)(
+                        *[transport.decode(arg, copy=False) for arg in args],
+                        **{key: transport.decode(arg, copy=False) for key, arg in kwargs.items()})
+                    answer = (True, transport.encode(name, result))
+                except Exception as error:
+                    answer = (False, error)
+            try:
+                conn.send(answer)
+            except Exception as error:
+                conn.send((False, RuntimeError(f"{name} answer can not be sent: {error}")))
+            request = conn.recv()
+    finally:
+        transport.close()
+        conn.close()
+
+
+class ProcessProblem(Problem):  # pylint: disable=abstract-method
+    """Proxy forwarding all ICoCo methods to a problem running in a worker process.
+
+    The worker process is started by the constructor and stopped by :meth:`close` (or at the exit of
+    a ``with`` statement). Exceptions raised by the problem (``WrongContext``, ``WrongArgument``,
+    ``NotImplementedMethod``, ...) are raised again by the proxy. If the worker process dies, a
+    ``RuntimeError`` is raised.
+
+    NumPy arrays go through shared memory (see module documentation). Arrays received by the
+    problem are views on shared memory, only valid during the call: the problem must copy them if it
+    needs to keep them. Arrays returned by the proxy are copies.
+    """
+
+    def __init__(self,
+                 problem_type: Type[Problem],
+                 args: Sequence = (),
+                 kwargs: Optional[Dict[str, Any]] = None,
+                 start_method: Optional[str] = None) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        problem_type : Type[Problem]
+            class of the problem to instantiate in the worker process (must be picklable for the
+            'spawn' and 'forkserver' start methods).
+        args : Sequence
+            positional arguments of the problem constructor.
+        kwargs : Dict[str, Any]
+            keyword arguments of the problem constructor.
+        start_method : str
+            multiprocessing start method, None for the default one.
+        """
+        super().__init__()
+        self._name = f"{problem_type.__module__}.{problem_type.__name__}"
+        if resource_tracker is not None:
+            # the worker must share the tracker of the supervisor, otherwise its own tracker would
+            # unlink the blocks of the supervisor when it exits.
+            resource_tracker.ensure_running()
+        context = multiprocessing.get_context(start_method)
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(target=_serve,
+                                        args=(child_conn, problem_type, tuple(args),
+                                              dict(kwargs or {})),
+                                        name=f"icoco-{problem_type.__name__}",
+                                        daemon=True)
+        self._process.start()
+        child_conn.close()
+        self._transport = _SharedArrays()
+        self._implemented: Optional[FrozenSet[str]] = None
+
+    def __enter__(self) -> ProcessProblem:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def process(self) -> multiprocessing.process.BaseProcess:
+        """Worker process."""
+        return self._process
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stops the worker process and releases shared memory.
+
+        Parameters
+        ----------
+        timeout : float
+            time (in seconds) let to the worker process to stop before being killed.
+        """
+        if self._process.is_alive():
+            try:
+                self._conn.send(None)
+            except OSError:  # pragma: no cover
+                pass
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.kill()
+                self._process.join()
+        self._conn.close()
+        self._transport.close()
+
+    def implemented_methods(self) -> FrozenSet[str]:  # pylint: disable=arguments-differ
+        """Returns the names of the ICoCo methods implemented by the problem of the worker process
+        (an instance method: they depend on the problem type of the instance).
+
+        The implemented methods are queried once from the worker process.
+        """
+        if self._implemented is None:
+            self._implemented = self._call("implemented_methods", (), {})
+        return self._implemented
+
+    def supports(self, method: str) -> bool:
+        """Tells whether an ICoCo method is implemented by the problem of the worker process."""
+        implemented = self.implemented_methods()
+        if method not in implemented and method not in ICoCoMethods.ALL:
+            raise WrongArgument(prob=self._name, method="supports", arg="method",
+                                condition=f"'{method}' is not an ICoCo method")
+        return method in implemented
+
+    def _call(self, name: str, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        """Executes a method in the worker process."""
+        encode = self._transport.encode
+        request = (name,
+                   tuple(encode((name, index), arg) for index, arg in enumerate(args)),
+                   {key: encode((name, key), arg) for key, arg in kwargs.items()})
+        try:
+            self._conn.send(request)
+            success, result = self._conn.recv()
+        except (EOFError, OSError) as error:
+            raise RuntimeError(f"Worker process of problem {self._name} died "
+                               f"(exit code {self._process.exitcode})") from error
+        if not success:
+            raise result
+        return self._transport.decode(result, copy=True)
+
+
+def _forward(name: str):
+    """Returns the method of ProcessProblem forwarding ICoCo method name to the worker process."""
+
+    def method(self, *args, **kwargs):
+        return self._call(name, args, kwargs)  # pylint: disable=protected-access
+
+    method.__name__ = name
+    method.__qualname__ = f"ProcessProblem.{name}"
+    method.__doc__ = getattr(Problem, name).__doc__
+    return method
+
+
+for _name in ICoCoMethods.ALL + ICoCoExtensions.ALL:
+    if _name != "GetICoCoMajorVersion":
+        setattr(ProcessProblem, _name, _forward(_name))
+ProcessProblem.__abstractmethods__ = frozenset()
@@ -0,0 +1,181 @@
+"""
+Interface quasi-Newton accelerators for :class:`icoco.implicit.FixedPointCoupling`.
+
+:class:`IQNILSRelaxation` (interface quasi-Newton with inverse Jacobian from a least-squares model)
+and :class:`AndersonRelaxation` (Anderson mixing) replace the relaxation of the coupling iterations.
+Both approximate the inverse Jacobian of the residual from the differences of the residuals and of
+the values F(x) of the previous iterations::
+
+    gamma = argmin |r - dR gamma|
+    x <- x + mixing * r - (dF - (1 - mixing) * dR) gamma
+
+IQN-ILS is Anderson mixing with ``mixing = 1``: x <- F(x) - dF gamma.
+
+The differences are kept in preallocated NumPy arrays: the QR factorization of dR is updated
+incrementally (Gram-Schmidt for a new column, Givens rotations to drop the oldest one) and dF is a
+ring buffer, so that an iteration costs O(n m) for n coupling data and m columns.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+
+import numpy as np
+
+from .implicit import ConstantRelaxation
+
+
+class AndersonRelaxation(ConstantRelaxation):  # pylint: disable=too-many-instance-attributes
+    """Anderson mixing of the coupling iterations.
+
+    The first iteration without history is a constant relaxation by ``omega``. A new pair of
+    differences is dropped if its residual difference is (numerically) a linear combination of the
+    kept ones.
+    """
+
+    def __init__(self,
+                 omega: float = 0.5,
+                 mixing: float = 1.0,
+                 history: int = 20,
+                 reuse: int = 0) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        omega : float
+            relaxation factor used when there is no history.
+        mixing : float
+            mixing parameter (1.0: IQN-ILS).
+        history : int
+            maximum number of kept differences.
+        reuse : int
+            number of previous time steps whose differences are kept at the beginning of a time
+            step (0: history restarts at each time step).
+        """
+        super().__init__(omega)
+        self.mixing = mixing
+        """Mixing parameter."""
+        self._history = history
+        self._reuse = reuse
+        self._size = -1
+        self._count = 0
+        self._head = 0
+        self._step = 0
+        self._steps = deque()
+        self._q = self._r = self._df = np.empty((0, 0))
+        self._previous_r = self._previous_f = self._work = self._gamma = np.empty(0)
+        self._first = True
+
+    @property
+    def columns(self) -> int:
+        """Number of differences currently kept."""
+        return self._count
+
+    def _allocate(self, size: int) -> None:
+        """(Re)allocates the buffers for size coupling data and clears the history."""
+        history = self._history
+        self._size = size
+        self._count = self._head = 0
+        self._steps.clear()
+        self._q = np.zeros((history, size))
+        self._r = np.zeros((history, history))
+        self._df = np.zeros((history, size))
+        self._previous_r = np.empty(size)
+        self._previous_f = np.empty(size)
+        self._work = np.empty(size)
+        self._gamma = np.zeros(history)
+        self._first = True
+
+    def _drop_oldest(self) -> None:
+        """Removes the oldest column: Givens rotations bring R[:, 1:] back to triangular form."""
+        count = self._count
+        q, r = self._q, self._r
+        r[:count, :count - 1] = r[:count, 1:count]
+        r[:count, count - 1] = 0.0
+        for j in range(count - 1):
+            a, b = r[j, j], r[j + 1, j]
+            norm = np.hypot(a, b)
+            if norm == 0.0:  # pragma: no cover
+                continue
+            c, s = a / norm, b / norm
+            r[j], r[j + 1] = c * r[j] + s * r[j + 1], c * r[j + 1] - s * r[j]
+            q[j], q[j + 1] = c * q[j] + s * q[j + 1], c * q[j + 1] - s * q[j]
+            r[j + 1, j] = 0.0
+        r[count - 1, :] = 0.0
+        self._count -= 1
+        self._head = (self._head + 1) % self._history
+        self._steps.popleft()
+
+    def _append(self, delta_r: np.ndarray, delta_f: np.ndarray) -> None:
+        """Appends a column (modified Gram-Schmidt with one reorthogonalization)."""
+        norm = np.linalg.norm(delta_r)
+        if norm == 0.0:
+            return
+        if self._count == self._history:
+            self._drop_oldest()
+        count = self._count
+        q = self._q[:count]
+        coefficients = q @ delta_r
+        orthogonal = delta_r - coefficients @ q
+        correction = q @ orthogonal
+        orthogonal -= correction @ q
+        coefficients += correction
+        orthogonal_norm = np.linalg.norm(orthogonal)
+        if orthogonal_norm <= 1.e-10 * norm:
+            return
+        self._q[count] = orthogonal / orthogonal_norm
+        self._r[:count, count] = coefficients
+        self._r[count, :count] = 0.0
+        self._r[count, count] = orthogonal_norm
+        self._df[(self._head + count) % self._history] = delta_f
+        self._steps.append(self._step)
+        self._count += 1
+
+    def reset(self) -> None:
+        self._first = True
+        self._step += 1
+        while self._steps and self._steps[0] < self._step - self._reuse:
+            self._drop_oldest()
+
+    def update(self, x: np.ndarray, residual: np.ndarray) -> None:
+        if residual.shape[0] != self._size:
+            self._allocate(residual.shape[0])
+        value = self._work
+        np.add(x, residual, out=value)
+        if not self._first:
+            self._append(residual - self._previous_r, value - self._previous_f)
+        self._first = False
+        self._previous_r[:] = residual
+        self._previous_f[:] = value
+        count = self._count
+        if count == 0:
+            x += self.omega * residual
+            return
+        rhs = self._q[:count] @ residual
+        gamma = np.linalg.solve(self._r[:count, :count], rhs)
+        # dF gamma with dF stored in a ring buffer: gamma is scattered to the physical rows
+        physical = self._gamma
+        physical[:] = 0.0
+        physical[(self._head + np.arange(count)) % self._history] = gamma
+        x += self.mixing * residual - physical @ self._df
+        if self.mixing != 1.0:
+            x += (1.0 - self.mixing) * (rhs @ self._q[:count])
+
+
+class IQNILSRelaxation(AndersonRelaxation):
+    """IQN-ILS acceleration of the coupling iterations (Anderson mixing with ``mixing = 1``)."""
+
+    def __init__(self, omega: float = 0.5, history: int = 20, reuse: int = 0) -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        omega : float
+            relaxation factor used when there is no history.
+        history : int
+            maximum number of kept differences.
+        reuse : int
+            number of previous time steps whose differences are kept at the beginning of a time
+            step (0: history restarts at each time step).
+        """
+        super().__init__(omega=omega, mixing=1.0, history=history, reuse=reuse)
@@ -0,0 +1,541 @@
+"""
+:class:`icoco.problem.Problem` proxy over a socket, to couple codes running in separate
+environments (containers, virtual environments with incompatible medcoupling builds...) of a
+machine.
+
+:class:`ProblemServer` wraps a problem and serves the ICoCo methods on a Unix socket (address
+given as a path) or a TCP socket (address given as ``(host, port)``)::
+
+    ProblemServer(Thermohydraulics(), "/tmp/thermo.sock").serve()  # in the code environment
+
+:class:`RemoteProblem` is the client, a problem forwarding all the ICoCo methods to the server::
+
+    with RemoteProblem("/tmp/thermo.sock") as thermo:
+        thermo.initialize()
+        ...
+
+A TCP server authenticates its clients with a key, given to both sides (see the trust model
+below)::
+
+    ProblemServer(Thermohydraulics(), ("127.0.0.1", 5000), authkey=key).serve()
+    thermo = RemoteProblem(("127.0.0.1", 5000), authkey=key)
+
+The messages use a compact binary framing: a fixed header (payload size, flags, method index)
+followed by the arguments (or the result) encoded with a type tag each. Scalars, strings and
+their containers are packed with :mod:`struct`, NumPy arrays (and the arrays of
+:class:`icoco.field.Field`) are sent as raw bytes, other objects (medcoupling fields, exceptions...)
+are pickled.
+
+The setters listed in :data:`PIPELINED_METHODS` do not wait for an answer: they return as soon as
+the request is sent, so that consecutive setters cost no round trip. The exception raised by a
+pipelined call is raised by the next call waiting for an answer (or by :meth:`RemoteProblem.flush`),
+the calls sent between them being discarded by the server, as if the failing call had raised.
+
+Trust model: pickled payloads can execute arbitrary code when they are decoded, so the server and
+the client must only talk to trusted peers. Only Unix sockets may be used without ``authkey``:
+they are created accessible to their owner only, so that the peers are the processes of the same
+user. TCP sockets, even on the loopback interface, can be reached by any local user: they always
+use an authkey (a random one is generated if none is given, see :attr:`ProblemServer.authkey`),
+each side proving to the other that it knows the key (HMAC-SHA256 of a random challenge, as
+:mod:`multiprocessing.connection` does) before any payload is decoded. The messages are not
+encrypted.
+"""
+
+from __future__ import annotations
+
+import hmac
+import os
+import pickle
+import socket
+import struct
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .exception import WrongArgument
+from .field import Field
+from .problem import Problem, ValueType
+from .utils import ICoCoExtensions, ICoCoMethods
+
+PIPELINED_METHODS = ["setInputDoubleValue", "setInputIntValue", "setInputStringValue",
+                     "setInputMEDDoubleField", "setInputMEDIntField", "setInputMEDStringField",
+                     "setInputDoubleValues", "setInputIntValues"]
+"""Methods sent without waiting for their answer."""
+
+Address = Union[str, Tuple[str, int]]
+"""Address of a server: path of a Unix socket, or (host, port) of a TCP socket."""
+
+_METHODS = ([name for name in ICoCoMethods.ALL if name != "GetICoCoMajorVersion"]
+            + ICoCoExtensions.ALL + ["implemented_methods"])
+_INDICES = {name: index for index, name in enumerate(_METHODS)}
+_FLUSH = 0xFFFF  # method index of the requests only answering the pending error
+
+_REQUEST = struct.Struct("<QBH")  # payload size, flags, method index
+_ANSWER = struct.Struct("<QB")  # payload size, success
+_NO_ANSWER = 1  # flag of the pipelined requests
+
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+_SIZE = struct.Struct("<Q")
+_INLINE_SIZE = 1 << 16  # payloads smaller than that are sent in a single buffer
+
+_CHALLENGE_SIZE = 32  # size of the authentication challenges (and of their HMAC-SHA256)
+
+
+def _encode(value: Any, chunks: List) -> None:
+    """Appends the encoding of value to chunks, whose last item is a bytearray being filled.
+
+    Arrays are appended as memoryviews (not copied), followed by a new bytearray.
+    """
+    # pylint: disable=too-many-branches
+    out = chunks[-1]
+    if value is None:
+        out += b"N"
+    elif value is True or value is False:
+        out += b"T" if value else b"F"
+    elif isinstance(value, float):
+        out += b"d"
+        out += _FLOAT.pack(value)
+    elif isinstance(value, (int, np.integer)) and -2 ** 63 <= value < 2 ** 63:
+        out += b"i"
+        out += _INT.pack(value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out += b"s"
+        out += _SIZE.pack(len(data))
+        out += data
+    elif isinstance(value, np.ndarray) and not value.dtype.hasobject:
+        value = np.ascontiguousarray(value)
+        dtype = value.dtype.str.encode("ascii")
+        out += b"a"
+        out += bytes((len(dtype), value.ndim))
+        out += dtype
+        out += struct.pack(f"<{value.ndim}Q", *value.shape)
+        out += _SIZE.pack(value.nbytes)
+        if value.nbytes:
+            chunks.append(memoryview(value).cast("B"))
+            chunks.append(bytearray())
+    elif isinstance(value, (list, tuple)):
+        out += b"l" if isinstance(value, list) else b"t"
+        out += _SIZE.pack(len(value))
+        for item in value:
+            _encode(item, chunks)
+    elif isinstance(value, dict) and all(isinstance(key, str) for key in value):
+        out += b"D"
+        out += _SIZE.pack(len(value))
+        for key, item in value.items():
+            _encode(key, chunks)
+            _encode(item, chunks)
+    elif isinstance(value, ValueType):
+        out += b"e"
+        out += bytes((value.value, ))
+    elif isinstance(value, Field):
+        out += b"f"
+        for item in (value.name, value.array, value.mesh,
+                     {"unit": value.unit, "time": value.time, "nature": value.nature,
+                      "on_nodes": value.on_nodes}):
+            _encode(item, chunks)
+    else:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        out += b"p"
+        out += _SIZE.pack(len(data))
+        out += data
+
+
+def _decode(buffer: memoryview, offset: int) -> Tuple[Any, int]:
+    """Decodes the value encoded at offset in buffer, returns it with the offset following it.
+
+    Arrays are views on buffer.
+    """
+    # pylint: disable=too-many-return-statements, too-many-locals
+    tag = buffer[offset]
+    offset += 1
+    if tag == 0x4E:  # N
+        return None, offset
+    if tag == 0x54:  # T
+        return True, offset
+    if tag == 0x46:  # F
+        return False, offset
+    if tag == 0x64:  # d
+        return _FLOAT.unpack_from(buffer, offset)[0], offset + 8
+    if tag == 0x69:  # i
+        return _INT.unpack_from(buffer, offset)[0], offset + 8
+    if tag in (0x73, 0x70):  # s, p
+        size = _SIZE.unpack_from(buffer, offset)[0]
+        offset += 8
+        data = buffer[offset:offset + size]
+        return (str(data, "utf-8") if tag == 0x73 else pickle.loads(data)), offset + size
+    if tag == 0x61:  # a
+        dtype_size, ndim = buffer[offset], buffer[offset + 1]
+        offset += 2
+        dtype = np.dtype(str(buffer[offset:offset + dtype_size], "ascii"))
+        offset += dtype_size
+        shape = struct.unpack_from(f"<{ndim}Q", buffer, offset)
+        offset += 8 * ndim
+        nbytes = _SIZE.unpack_from(buffer, offset)[0]
+        offset += 8
+        array = np.frombuffer(buffer[offset:offset + nbytes], dtype=dtype).reshape(shape)
+        return array, offset + nbytes
+    if tag in (0x6C, 0x74, 0x44):  # l, t, D
+        count = _SIZE.unpack_from(buffer, offset)[0]
+        offset += 8
+        items = []
+        for _ in range(count * (2 if tag == 0x44 else 1)):
+            item, offset = _decode(buffer, offset)
+            items.append(item)
+        if tag == 0x44:
+            return dict(zip(items[::2], items[1::2])), offset
+        return (items if tag == 0x6C else tuple(items)), offset
+    if tag == 0x65:  # e
+        return ValueType(buffer[offset]), offset + 1
+    name, offset = _decode(buffer, offset)  # f
+    array, offset = _decode(buffer, offset)
+    mesh, offset = _decode(buffer, offset)
+    attributes, offset = _decode(buffer, offset)
+    return Field(name, array, mesh, **attributes), offset
+
+
+def _send(sock: socket.socket, header: bytes, chunks: List) -> None:
+    """Sends a message: its header followed by the encoded payload."""
+    chunks[0][:0] = header
+    if len(chunks) == 1 or sum(len(chunk) for chunk in chunks) < _INLINE_SIZE:
+        sock.sendall(b"".join(chunks))
+    else:
+        for chunk in chunks:
+            sock.sendall(chunk)
+
+
+def _receive(stream, size: int) -> Optional[memoryview]:
+    """Reads size bytes from stream, returns None if the stream is closed."""
+    buffer = bytearray(size)
+    if stream.readinto(buffer) != size:
+        return None
+    return memoryview(buffer)
+
+
+def _payload(values: Any) -> List:
+    """Returns the chunks of the encoding of values."""
+    chunks = [bytearray()]
+    _encode(values, chunks)
+    return chunks
+
+
+def _error_payload(error: BaseException) -> List:
+    """Returns the chunks of the encoding of an exception (a RuntimeError if not picklable)."""
+    try:
+        return _payload(pickle.loads(pickle.dumps(error)))
+    except Exception:  # pylint: disable=broad-exception-caught
+        return _payload(RuntimeError(f"{type(error).__name__}: {error}"))
+
+
+def _socket_family(address: Address) -> int:
+    """Returns the socket family of an address."""
+    return socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+
+
+def _digest(authkey: bytes, challenge: bytes) -> bytes:
+    """Returns the answer to an authentication challenge."""
+    return hmac.new(authkey, challenge, "sha256").digest()
+
+
+class ProblemServer:
+    """Server of the ICoCo methods of a problem, for :class:`RemoteProblem` clients.
+
+    See the trust model in the :mod:`icoco.remote` documentation.
+    """
+
+    handshake_timeout: float = 10.0
+    """Timeout (in seconds) of the authentication of a client."""
+
+    def __init__(self, problem: Problem, address: Address = ("127.0.0.1", 0),
+                 authkey: Optional[bytes] = None) -> None:
+        """Constructor: binds the socket and listens to it.
+
+        Parameters
+        ----------
+        problem : Problem
+            the problem to serve.
+        address : Address
+            path of a Unix socket (created accessible to its owner only, and removed by
+            :meth:`close`), or (host, port) of a TCP socket (port 0 to let the system choose a free
+            port, see :attr:`address`).
+        authkey : bytes
+            key the clients must know. None to accept the clients without authentication on a
+            Unix socket, or to generate a random key for a TCP socket (see :attr:`authkey`).
+        """
+        if authkey is None and not isinstance(address, str):
+            authkey = os.urandom(_CHALLENGE_SIZE)
+        self._problem = problem
+        self._authkey = authkey
+        self._listener = socket.socket(_socket_family(address), socket.SOCK_STREAM)
+        if not isinstance(address, str):
+            self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(address)
+        if isinstance(address, str):
+            os.chmod(address, 0o600)
+        self._listener.listen(1)
+        self._address = self._listener.getsockname() if not isinstance(address, str) else address
+
+    def __enter__(self) -> ProblemServer:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def problem(self) -> Problem:
+        """The served problem."""
+        return self._problem
+
+    @property
+    def address(self) -> Address:
+        """Address of the server (with the actual port for TCP)."""
+        return self._address
+
+    @property
+    def authkey(self) -> Optional[bytes]:
+        """Key the clients must give to :class:`RemoteProblem` (None if not required)."""
+        return self._authkey
+
+    def serve(self, max_clients: Optional[int] = None) -> None:
+        """Serves the clients one after the other, until :meth:`close` is called (from another
+        thread) or max_clients clients were served.
+
+        Parameters
+        ----------
+        max_clients : int
+            number of clients to serve, None for no limit.
+        """
+        served = 0
+        while max_clients is None or served < max_clients:
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:  # closed
+                return
+            with conn:
+                self.serve_client(conn)
+            served += 1
+
+    def _authenticate(self, conn: socket.socket, stream) -> bool:
+        """Tells the client whether an authkey is required, returns whether it is authenticated.
+
+        The server sends a challenge, the client answers it followed by its own challenge, which
+        the server answers (after a success byte) to authenticate itself.
+        """
+        conn.settimeout(self.handshake_timeout)
+        try:
+            if self._authkey is None:
+                conn.sendall(b"\x00")
+                return True
+            challenge = os.urandom(_CHALLENGE_SIZE)
+            conn.sendall(b"\x01" + challenge)
+            answer = _receive(stream, 2 * _CHALLENGE_SIZE)
+            if answer is None or not hmac.compare_digest(bytes(answer[:_CHALLENGE_SIZE]),
+                                                         _digest(self._authkey, challenge)):
+                conn.sendall(b"\x00")
+                return False
+            conn.sendall(b"\x01" + _digest(self._authkey, bytes(answer[_CHALLENGE_SIZE:])))
+        except OSError:
+            return False
+        finally:
+            conn.settimeout(None)
+        return True
+
+    def serve_client(self, conn: socket.socket) -> None:
+        """Authenticates a connected client, then executes its requests until it disconnects.
+
+        A client failing the authentication is disconnected without executing any request.
+        """
+        if conn.family == socket.AF_INET:
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        stream = conn.makefile("rb")
+        if not self._authenticate(conn, stream):
+            stream.close()
+            return
+        error = None  # exception of a pipelined request, to answer to the next request
+        header = _receive(stream, _REQUEST.size)
+        while header is not None:
+            size, flags, method = _REQUEST.unpack(header)
+            payload = _receive(stream, size)
+            if payload is None:
+                break
+            result = None
+            if error is None and method != _FLUSH:
+                try:
+                    args, kwargs = _decode(payload, 0)[0]
+                    result = getattr(self._problem, _METHODS[method])(*args, **kwargs)
+                except Exception as exception:  # pylint: disable=broad-exception-caught
+                    error = exception
+            if not flags & _NO_ANSWER:
+                if error is None:
+                    try:
+                        chunks = _payload(result)
+                    except Exception as exception:  # pylint: disable=broad-exception-caught
+                        error = RuntimeError(f"{_METHODS[method]} answer can not be sent: "
+                                             f"{type(exception).__name__}: {exception}")
+                if error is not None:
+                    chunks = _error_payload(error)
+                try:
+                    _send(conn, _ANSWER.pack(sum(len(chunk) for chunk in chunks),
+                                             error is None), chunks)
+                except OSError:  # client disconnected (after a timeout...)
+                    break
+                error = None
+            header = _receive(stream, _REQUEST.size)
+        stream.close()
+
+    def close(self) -> None:
+        """Stops listening (and removes the Unix socket)."""
+        try:
+            self._listener.shutdown(socket.SHUT_RDWR)  # wakes up accept in serve
+        except OSError:
+            pass
+        self._listener.close()
+        if isinstance(self._address, str) and os.path.exists(self._address):
+            os.unlink(self._address)
+
+
+class RemoteProblem(Problem):  # pylint: disable=abstract-method
+    """Proxy forwarding all ICoCo methods to a problem served by a :class:`ProblemServer`.
+
+    Exceptions raised by the problem (``WrongContext``, ``WrongArgument``,
+    ``NotImplementedMethod``, ...) are raised again by the proxy. If the connection is lost (or
+    times out), it is closed and a ``RuntimeError`` is raised, by this call and all the following
+    ones. Arrays returned by the proxy are copies.
+
+    See the trust model in the :mod:`icoco.remote` documentation.
+    """
+
+    def __init__(self, address: Address, timeout: Optional[float] = None,
+                 authkey: Optional[bytes] = None) -> None:
+        """Constructor: connects to the server (and authenticates).
+
+        Parameters
+        ----------
+        address : Address
+            address of the server.
+        timeout : float
+            timeout (in seconds) of the connection and of the answers, None for no timeout.
+        authkey : bytes
+            key shared with the server, None if the server does not require one.
+
+        Raises
+        ------
+        RuntimeError
+            if the authentication fails (wrong authkey, or authkey given to a server without one
+            or missing).
+        """
+        super().__init__()
+        self._address = address
+        self._sock = socket.socket(_socket_family(address), socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(address)
+        if not isinstance(address, str):
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._stream = self._sock.makefile("rb")
+        self._implemented: Optional[FrozenSet[str]] = None
+        try:
+            self._authenticate(authkey)
+        except BaseException:
+            self.close()
+            raise
+
+    def _authenticate(self, authkey: Optional[bytes]) -> None:
+        """Answers the challenge of the server, and checks its answer to the client's one."""
+        mode = _receive(self._stream, 1)
+        if mode is None:
+            raise RuntimeError(f"Connection to the server {self._address} lost")
+        if (mode[0] == 1) != (authkey is not None):
+            raise RuntimeError(f"Authentication with the server {self._address} failed: the "
+                               + ("server requires an authkey" if mode[0] == 1
+                                  else "server does not use an authkey"))
+        if authkey is None:
+            return
+        challenge = _receive(self._stream, _CHALLENGE_SIZE)
+        if challenge is None:
+            raise RuntimeError(f"Connection to the server {self._address} lost")
+        own_challenge = os.urandom(_CHALLENGE_SIZE)
+        self._sock.sendall(_digest(authkey, bytes(challenge)) + own_challenge)
+        answer = _receive(self._stream, 1 + _CHALLENGE_SIZE)
+        if answer is None or answer[0] != 1 or not hmac.compare_digest(
+                bytes(answer[1:]), _digest(authkey, own_challenge)):
+            raise RuntimeError(f"Authentication with the server {self._address} failed: wrong "
+                               "authkey")
+
+    def __enter__(self) -> RemoteProblem:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the connection (the server then waits for its next client)."""
+        self._stream.close()
+        self._sock.close()
+
+    def flush(self) -> None:
+        """Waits for the pipelined calls to be executed, raises the exception of a failing one."""
+        self._call(_FLUSH, (), {})
+
+    def implemented_methods(self) -> FrozenSet[str]:  # pylint: disable=arguments-differ
+        """Returns the names of the ICoCo methods implemented by the served problem (an instance
+        method: they depend on the server of the instance).
+
+        The implemented methods are queried once from the server.
+        """
+        if self._implemented is None:
+            self._implemented = self._call(_INDICES["implemented_methods"], (), {})
+        return self._implemented
+
+    def supports(self, method: str) -> bool:
+        """Tells whether an ICoCo method is implemented by the served problem."""
+        implemented = self.implemented_methods()
+        if method not in implemented and method not in ICoCoMethods.ALL:
+            raise WrongArgument(prob=f"RemoteProblem({self._address})", method="supports",
+                                arg="method", condition=f"'{method}' is not an ICoCo method")
+        return method in implemented
+
+    def _call(self, method: int, args: tuple, kwargs: Dict[str, Any],
+              answer: bool = True) -> Any:
+        """Sends a request, returns its result (None without answer)."""
+        chunks = _payload((args, kwargs))
+        header = _REQUEST.pack(sum(len(chunk) for chunk in chunks), 0 if answer else _NO_ANSWER,
+                               method)
+        try:
+            _send(self._sock, header, chunks)
+            if not answer:
+                return None
+            header = _receive(self._stream, _ANSWER.size)
+            if header is None:
+                raise EOFError("connection closed by the server")
+            size, success = _ANSWER.unpack(header)
+            payload = _receive(self._stream, size)
+            if payload is None:
+                raise EOFError("connection closed by the server")  # pragma: no cover
+        except (EOFError, OSError) as error:
+            self.close()  # a message may be partially sent or received: the stream is out of sync
+            raise RuntimeError(f"Connection to the server {self._address} lost: {error}") from error
+        result = _decode(payload, 0)[0]
+        if not success:
+            raise result
+        return result
+
+
+def _forward(name: str):
+    """Returns the method of RemoteProblem forwarding ICoCo method name to the server."""
+    method_index = _INDICES[name]
+    answer = name not in PIPELINED_METHODS
+
+    def method(self, *args, **kwargs):
+        return self._call(method_index, args, kwargs, answer)  # pylint: disable=protected-access
+
+    method.__name__ = name
+    method.__qualname__ = f"RemoteProblem.{name}"
+    method.__doc__ = getattr(Problem, name).__doc__
+    return method
+
+
+for _name in ICoCoMethods.ALL + ICoCoExtensions.ALL:
+    if _name != "GetICoCoMajorVersion":
+        setattr(RemoteProblem, _name, _forward(_name))
+RemoteProblem.__abstractmethods__ = frozenset()
@@ -0,0 +1,512 @@
+"""
+Bounded in-memory storage of the states saved by :meth:`icoco.problem.Problem.save`.
+
+:class:`StateStore` keeps states identified by ``(label, method)`` within a byte budget, evicting
+states according to an :class:`EvictionPolicy` when needed. A problem delegates its save/restore
+methods to it, for instance::
+
+    def save(self, label: int, method: str) -> None:
+        self._store.save(label, method, (self._time, self._field))
+
+    def restore(self, label: int, method: str) -> None:
+        self._time, field = self._store.restore(label, method)
+        self._field[:] = field
+
+    def forget(self, label: int, method: str) -> None:
+        self._store.forget(label, method)
+
+States are pickled with protocol 5 (Python >= 3.8): NumPy arrays (and other objects supporting
+out-of-band buffers) are copied once, into buffers owned by the store, and not serialized into the
+pickle stream.
+
+:class:`DeltaStateStore` has the same interface but stores each state as the blocks of its buffers
+which differ from the previously saved state, for slowly varying states saved at each time step.
+"""
+
+from __future__ import annotations
+
+import pickle
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .exception import WrongArgument
+
+_OUT_OF_BAND = pickle.HIGHEST_PROTOCOL >= 5
+
+StateKey = Tuple[int, str]
+"""Identifier of a saved state: (label, method)."""
+
+Eviction = Callable[[Iterable[StateKey]], StateKey]
+"""Custom eviction policy, see :class:`EvictionPolicy`."""
+
+
+class EvictionPolicy:  # pylint: disable=too-few-public-methods
+    """Namespace listing the eviction policies of :class:`StateStore`.
+
+    A custom policy is a callable receiving the keys of the evictable (not pinned) states, from the
+    least to the most recently used, and returning the key to evict.
+    """
+
+    LRU = "lru"
+    """Evicts the least recently used (saved or restored) state."""
+    OLDEST = "oldest"
+    """Evicts the state with the lowest label (the least recently used one among equal labels)."""
+
+
+def _least_recently_used(keys: Iterable[StateKey]) -> StateKey:
+    return next(iter(keys))
+
+
+def _oldest_label(keys: Iterable[StateKey]) -> StateKey:
+    return min(keys, key=lambda key: key[0])
+
+
+_POLICIES = {EvictionPolicy.LRU: _least_recently_used, EvictionPolicy.OLDEST: _oldest_label}
+
+
+def snapshot(state: Any) -> Tuple[bytes, List[bytearray]]:
+    """Pickles a state, with copies of its out-of-band buffers (protocol 5, Python >= 3.8).
+
+    Parameters
+    ----------
+    state : Any
+        picklable state.
+
+    Returns
+    -------
+    Tuple[bytes, List[bytearray]]
+        the pickle stream and the copies of the out-of-band buffers.
+    """
+    buffers = []
+    if _OUT_OF_BAND:
+        data = pickle.dumps(state, protocol=5, buffer_callback=buffers.append)
+    else:  # pragma: no cover
+        data = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+    return data, [bytearray(buffer.raw()) for buffer in buffers]
+
+
+def load(data: bytes, buffers: List[Any]) -> Any:
+    """Unpickles a state pickled by :func:`snapshot`.
+
+    Parameters
+    ----------
+    data : bytes
+        the pickle stream.
+    buffers : List[Any]
+        the out-of-band buffers (bytes-like objects).
+
+    Returns
+    -------
+    Any
+        the state, whose NumPy arrays are views on the buffers.
+    """
+    if not buffers:
+        return pickle.loads(data)
+    return pickle.loads(data, buffers=buffers)
+
+
+class _State:  # pylint: disable=too-few-public-methods
+    """Pickled state and its out-of-band buffers."""
+
+    __slots__ = ("data", "buffers", "nbytes", "pinned")
+
+    def __init__(self, data: bytes, buffers: List[bytearray], pinned: bool) -> None:
+        self.data = data
+        self.buffers = buffers
+        self.nbytes = len(data) + sum(len(buffer) for buffer in buffers)
+        self.pinned = pinned
+
+
+class StateStore:  # pylint: disable=too-many-instance-attributes
+    """Storage of saved states with a byte budget and an eviction policy.
+
+    The size of a state is the size of its pickle stream plus the size of its out-of-band buffers.
+    When saving a state would exceed ``max_bytes``, states are evicted (pinned states never are)
+    until it fits. The counters :attr:`hits`, :attr:`misses` and :attr:`evictions` report the
+    efficiency of the store.
+    """
+
+    def __init__(self,
+                 max_bytes: Optional[int] = None,
+                 eviction: Union[str, Eviction] = EvictionPolicy.LRU,
+                 name: str = "StateStore") -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        max_bytes : int
+            byte budget, None for no limit.
+        eviction : Union[str, Eviction]
+            eviction policy, see :class:`EvictionPolicy`.
+        name : str
+            name of the problem owning the store, used in exception messages.
+
+        Raises
+        ------
+        WrongArgument
+            if the eviction policy is unknown.
+        """
+        if not callable(eviction):
+            if eviction not in _POLICIES:
+                raise WrongArgument(prob=name, method="StateStore", arg="eviction",
+                                    condition=f"'{eviction}' is not one of {list(_POLICIES)}")
+            eviction = _POLICIES[eviction]
+        self._max_bytes = max_bytes
+        self._eviction = eviction
+        self._name = name
+        self._states: Dict[StateKey, _State] = OrderedDict()
+        self._nbytes = 0
+        self.hits = 0
+        """Number of successful restores."""
+        self.misses = 0
+        """Number of restores of unknown (never saved, forgotten or evicted) states."""
+        self.evictions = 0
+        """Number of evicted states."""
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, key: StateKey) -> bool:
+        return key in self._states
+
+    @property
+    def nbytes(self) -> int:
+        """Size (in bytes) of the stored states."""
+        return self._nbytes
+
+    @property
+    def max_bytes(self) -> Optional[int]:
+        """Byte budget, None for no limit."""
+        return self._max_bytes
+
+    def keys(self) -> List[StateKey]:
+        """Returns the keys of the stored states, from the least to the most recently used."""
+        return list(self._states)
+
+    def save(self, label: int, method: str, state: Any, pin: bool = False) -> None:
+        """Stores a state (replacing the state of the same key, if any).
+
+        Parameters
+        ----------
+        label : int
+            label of the state.
+        method : str
+            method of the state.
+        state : Any
+            picklable state. Its out-of-band buffers (contiguous NumPy arrays...) are copied.
+        pin : bool
+            if True, the state is never evicted (see :meth:`pin`).
+
+        Raises
+        ------
+        WrongArgument
+            if the state does not fit in the budget, even after evicting all unpinned states.
+        """
+        key = (label, method)
+        entry = _State(*snapshot(state), pin)
+        if self._max_bytes is not None:
+            self._check_room(key, entry.nbytes)
+        self.forget(label, method)
+        if self._max_bytes is not None:
+            self._make_room(entry.nbytes)
+        self._states[key] = entry
+        self._nbytes += entry.nbytes
+
+    def _check_room(self, key: StateKey, nbytes: int) -> None:
+        """Raises if nbytes do not fit in the budget once the state of key and all unpinned states
+        are evicted (the store is left unchanged)."""
+        pinned = sum(entry.nbytes for other, entry in self._states.items()
+                     if entry.pinned and other != key)
+        if pinned + nbytes > self._max_bytes:
+            raise WrongArgument(prob=self._name, method="save", arg="state",
+                                condition=f"{nbytes} bytes do not fit in the budget of "
+                                f"{self._max_bytes} bytes ({pinned} bytes pinned)")
+
+    def _make_room(self, nbytes: int) -> None:
+        """Evicts states until nbytes more bytes fit in the budget (see :meth:`_check_room`)."""
+        while self._nbytes + nbytes > self._max_bytes:
+            key = self._eviction(key for key, entry in self._states.items() if not entry.pinned)
+            self._nbytes -= self._states.pop(key).nbytes
+            self.evictions += 1
+
+    def restore(self, label: int, method: str, copy: bool = False) -> Any:
+        """Returns a stored state.
+
+        Parameters
+        ----------
+        label : int
+            label of the state.
+        method : str
+            method of the state.
+        copy : bool
+            if False, the out-of-band buffers of the state (the data of NumPy arrays...) are
+            read-only views on the store, otherwise they are writable copies.
+
+        Returns
+        -------
+        Any
+            the state.
+
+        Raises
+        ------
+        WrongArgument
+            if the state is unknown (never saved, forgotten or evicted).
+        """
+        key = (label, method)
+        entry = self._states.get(key)
+        if entry is None:
+            self.misses += 1
+            raise WrongArgument(prob=self._name, method="restore", arg="(label, method)",
+                                condition=f"({label}, {method}) is not a known save state")
+        self.hits += 1
+        self._states.move_to_end(key)
+        if copy:
+            buffers = [bytearray(buffer) for buffer in entry.buffers]
+        else:
+            buffers = [memoryview(buffer).toreadonly() for buffer in entry.buffers]
+        return load(entry.data, buffers)
+
+    def forget(self, label: int, method: str) -> None:
+        """Removes a state (nothing happens if it is unknown).
+
+        Parameters
+        ----------
+        label : int
+            label of the state.
+        method : str
+            method of the state.
+        """
+        entry = self._states.pop((label, method), None)
+        if entry is not None:
+            self._nbytes -= entry.nbytes
+
+    def pin(self, label: int, method: str, pinned: bool = True) -> None:
+        """Pins (or unpins) a state: a pinned state is never evicted.
+
+        Parameters
+        ----------
+        label : int
+            label of the state.
+        method : str
+            method of the state.
+        pinned : bool
+            False to unpin the state.
+
+        Raises
+        ------
+        WrongArgument
+            if the state is unknown.
+        """
+        entry = self._states.get((label, method))
+        if entry is None:
+            raise WrongArgument(prob=self._name, method="pin", arg="(label, method)",
+                                condition=f"({label}, {method}) is not a known save state")
+        entry.pinned = pinned
+
+    def clear(self) -> None:
+        """Removes all states (counters are kept)."""
+        self._states.clear()
+        self._nbytes = 0
+
+
+class _Delta:  # pylint: disable=too-few-public-methods
+    """State stored as a full snapshot or as the blocks differing from its parent."""
+
+    __slots__ = ("data", "parent", "full", "blocks", "depth", "references", "nbytes")
+
+    def __init__(self, data: bytes, parent: Optional[_Delta], full: Optional[List[bytearray]],
+                 blocks: Optional[List[Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]]]
+                 ) -> None:
+        self.data = data
+        self.parent = parent
+        self.full = full
+        self.blocks = blocks
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.references = 1  # the store (or the deltas) referencing the entry
+        if full is not None:
+            self.nbytes = len(data) + sum(len(buffer) for buffer in full)
+        else:
+            self.nbytes = len(data) + sum(
+                indices.nbytes + values.nbytes + (0 if tail is None else tail.nbytes)
+                for indices, values, tail in blocks)
+
+
+def _words(buffer: Any, block_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the full blocks of buffer as a 2D array of words, and the trailing bytes."""
+    array = np.frombuffer(buffer, dtype=np.uint8)
+    head = len(array) - len(array) % block_size
+    return array[:head].view(np.uint64).reshape(-1, block_size // 8), array[head:]
+
+
+class DeltaStateStore:
+    """Storage of saved states as deltas (changed blocks) from the previously saved state.
+
+    The buffers of a state (see :func:`snapshot`) are split in blocks of ``block_size`` bytes.
+    A state whose buffers have the same sizes as the ones of the previously saved state (the
+    reference) only stores the blocks which differ (compared word by word), otherwise it is stored
+    as a full snapshot, as well as every ``full_every`` states of a delta chain. A state forgotten
+    while other states depend on it is kept (hidden) as long as needed. The reference is kept in
+    memory, in full, in addition to the stored states.
+    """
+
+    def __init__(self, block_size: int = 4096, full_every: int = 16,
+                 name: str = "DeltaStateStore") -> None:
+        """Constructor.
+
+        Parameters
+        ----------
+        block_size : int
+            size (in bytes) of the compared blocks, multiple of 8.
+        full_every : int
+            maximum length of a delta chain (a state is stored in full every full_every states).
+        name : str
+            name of the problem owning the store, used in exception messages.
+
+        Raises
+        ------
+        WrongArgument
+            if block_size is not a positive multiple of 8.
+        """
+        if block_size <= 0 or block_size % 8 != 0:
+            raise WrongArgument(prob=name, method="DeltaStateStore", arg="block_size",
+                                condition=f"{block_size} is not a positive multiple of 8")
+        self._block_size = block_size
+        self._full_every = full_every
+        self._name = name
+        self._states: Dict[StateKey, _Delta] = {}
+        self._reference: Optional[_Delta] = None
+        self._reference_buffers: List[bytearray] = []
+        self._nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, key: StateKey) -> bool:
+        return key in self._states
+
+    @property
+    def nbytes(self) -> int:
+        """Size (in bytes) of the stored states (including hidden ones, excluding the reference)."""
+        return self._nbytes
+
+    def keys(self) -> List[StateKey]:
+        """Returns the keys of the stored states."""
+        return list(self._states)
+
+    def _diff(self, buffers: List[bytearray]) -> Optional[list]:
+        """Returns the blocks of buffers differing from the reference (None if not comparable)."""
+        reference = self._reference_buffers
+        if (self._reference is None or self._reference.depth + 1 >= self._full_every
+                or len(reference) != len(buffers)
+                or any(len(old) != len(new) for old, new in zip(reference, buffers))):
+            return None
+        blocks = []
+        for old, new in zip(reference, buffers):
+            old_words, old_tail = _words(old, self._block_size)
+            new_words, new_tail = _words(new, self._block_size)
+            indices = np.flatnonzero((old_words != new_words).any(axis=1))
+            tail = None if np.array_equal(old_tail, new_tail) else new_tail.copy()
+            blocks.append((indices, new_words[indices], tail))
+        return blocks
+
+    def save(self, label: int, method: str, state: Any) -> None:
+        """Stores a state (replacing the state of the same key, if any).
+
+        Parameters
+        ----------
+        label : int
+            label of the state.
+        method : str
+            method of the state.
+        state : Any
+            picklable state.
+        """
+        data, buffers = snapshot(state)  # may raise: the previous state is still stored
+        blocks = self._diff(buffers)
+        if blocks is None:
+            entry = _Delta(data, None, buffers, None)
+        else:
+            entry = _Delta(data, self._reference, None, blocks)
+            self._reference.references += 1
+        self.forget(label, method)
+        self._nbytes += entry.nbytes
+        self._states[(label, method)] = entry
+        if self._reference is not None:
+            self._release(self._reference)
+        entry.references += 1
+        self._reference = entry
+        self._reference_buffers = buffers
+
+    def _release(self, entry: _Delta) -> None:
+        """Drops a reference to entry, and frees it (and its parents) if no longer referenced."""
+        while entry is not None:
+            entry.references -= 1
+            if entry.references > 0:
+                return
+            self._nbytes -= entry.nbytes
+            entry = entry.parent
+
+    def restore(self, label: int, method: str) -> Any:
+        """Returns a stored state, rebuilt from its delta chain.
+
+        Parameters
+        ----------
+        label : int
+            label of the state.
+        method : str
+            method of the state.
+
+        Returns
+        -------
+        Any
+            the state (its NumPy arrays are writable copies).
+
+        Raises
+        ------
+        WrongArgument
+            if the state is unknown (never saved or forgotten).
+        """
+        entry = self._states.get((label, method))
+        if entry is None:
+            raise WrongArgument(prob=self._name, method="restore", arg="(label, method)",
+                                condition=f"({label}, {method}) is not a known save state")
+        if entry is self._reference:
+            return load(entry.data, [bytearray(buffer) for buffer in self._reference_buffers])
+        chain = []
+        base = entry
+        while base.full is None:
+            chain.append(base)
+            base = base.parent
+        buffers = [bytearray(buffer) for buffer in base.full]
+        for delta in reversed(chain):
+            for buffer, (indices, values, tail) in zip(buffers, delta.blocks):
+                words, _ = _words(buffer, self._block_size)
+                words[indices] = values
+                if tail is not None:
+                    buffer[len(buffer) - len(tail):] = tail.tobytes()
+        return load(entry.data, buffers)
+
+    def forget(self, label: int, method: str) -> None:
+        """Removes a state (nothing happens if it is unknown).
+
+        Parameters
+        ----------
+        label : int
+            label of the state.
+        method : str
+            method of the state.
+        """
+        entry = self._states.pop((label, method), None)
+        if entry is not None:
+            self._release(entry)
+
+    def clear(self) -> None:
+        """Removes all states (and the reference)."""
+        for key in list(self._states):
+            self.forget(*key)
+        if self._reference is not None:
+            self._release(self._reference)
+        self._reference = None
+        self._reference_buffers = []
@@ -45,6 +45,17 @@ class ICoCoMethods:  # pylint: disable=too-few-public-methods
     """All ICoCo methods"""
 
 
+class ICoCoExtensions:  # pylint: disable=too-few-public-methods
+    """Namespace to list the methods of :class:`icoco.problem.Problem` out of the ICoCo norm."""
+
+    IO_VALUES = ["getValuesHandle", "getOutputDoubleValues", "setInputDoubleValues",
+                 "getOutputIntValues", "setInputIntValues"]
+    """Methods of section Batched scalar values I/O"""
+
+    ALL = IO_VALUES
+    """All extension methods"""
+
+
 class ICoCoMethodContext:  # pylint: disable=too-few-public-methods
     """Namespace to list all context restrictions for ICoCo methods."""
 
@@ -1,9 +1,16 @@
-"""Contains version informations."""
+"""Contains version informations.
 
-from pathlib import Path
+The ``VERSION`` file is read once, at the first call (parallel filesystems suffer from thousands of
+MPI ranks reading it at import). ``os.path`` is used rather than ``pathlib``, which is long to
+import.
+"""
+
+import os
+from functools import lru_cache
 from typing import Tuple
 
 
+@lru_cache(maxsize=None)
 def get_version() -> str:
     """Recovers ICoCo package version as string (standard).
 
@@ -12,9 +19,11 @@ def get_version() -> str:
     str
         version number as 'x.y.z'.
     """
-    return (Path(__file__).parent.resolve() / "VERSION").read_text(encoding="utf-8").strip()
+    with open(os.path.join(os.path.dirname(__file__), "VERSION"), encoding="utf-8") as stream:
+        return stream.read().strip()
 
 
+@lru_cache(maxsize=None)
 def get_version_int() -> Tuple[int, int, int]:
     """Recovers ICoCo package version as integers.
 
@@ -26,6 +35,7 @@ def get_version_int() -> Tuple[int, int, int]:
     return tuple(int(index) for index in get_version().split('.'))
 
 
+@lru_cache(maxsize=None)
 def get_icoco_version() -> str:
     """Recovers ICoCo version.
 
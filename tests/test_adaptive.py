@@ -0,0 +1,147 @@
+"""test icoco.adaptive module"""
+
+from typing import Tuple
+
+import pytest
+
+import icoco
+from icoco.adaptive import TimeStepController
+from icoco.coupling import CouplingDriver
+from icoco.implicit import FixedPointCoupling
+
+from conftest import MinimalProblem  # pylint: disable=wrong-import-order
+
+
+class StiffProblem(MinimalProblem):
+    """Problem failing with time steps above dt_ok, needing more iterations close to it"""
+
+    def __init__(self, dt_ok: float) -> None:
+        super().__init__()
+        self.dt_ok = dt_ok
+        self.iterations = 0
+
+    def computeTimeStep(self) -> Tuple[float, bool]:
+        return (1.0, False)
+
+    def solveTimeStep(self) -> bool:
+        self.iterations = 2 + int(8.0 * self._dt / self.dt_ok)
+        return self._dt <= self.dt_ok
+
+    def abortTimeStep(self) -> None:
+        self._dt = 0.0
+
+
+def test_controller_pid():
+    """Tests the time steps predicted from the indicator"""
+
+    with pytest.raises(icoco.WrongArgument, match="target must be positive"):
+        TimeStepController(target=0.0)
+    controller = TimeStepController(target=4.0)
+    assert controller.propose(0.1) == 0.1
+    controller.accept(0.1, indicator=8.0)  # I term only: f = 2 ** -0.3
+    assert controller.propose(1.0) == pytest.approx(0.1 * 2.0 ** -0.3)
+    controller.accept(0.1, indicator=4.0)  # P term only: f = 2 ** 0.4
+    assert controller.propose(1.0) == pytest.approx(0.1 * 2.0 ** 0.4)
+    assert controller.propose(0.05) == 0.05
+    controller.accept(0.1, indicator=4000.0)
+    assert controller.propose(1.0) == pytest.approx(0.02)
+    controller.accept(0.1)
+    assert controller.propose(1.0) == pytest.approx(0.2)
+
+    controller = TimeStepController(gains=(0.0, 0.0, 1.0), dt_min=0.01)
+    for indicator in (1.0, 1.0, 1.5):
+        controller.accept(0.1, indicator=indicator)
+    assert controller.propose(1.0) == pytest.approx(0.1 / 1.5)
+    controller.accept(0.1, indicator=1.5)  # e_0 - 2 e_1 + e_2 = -log(1.5)
+    assert controller.propose(1.0) == pytest.approx(0.15)
+    controller.accept(0.1, indicator=1000.0)
+    assert controller.propose(1.0) == pytest.approx(0.02)
+    assert controller.reject(0.01) == 0.01
+    assert controller.propose(1.0) == 0.01
+    assert controller.n_accepted == 5 and controller.rejected_ratio == pytest.approx(1.0 / 6.0)
+
+
+def test_controller_reject():
+    """Tests the bound learned from the rejected time steps and the statistics"""
+
+    iterations = [10]
+    controller = TimeStepController(target=5.0, gains=(1.0, 0.0, 0.0), factors=(0.2, 10.0),
+                                    indicator=lambda: iterations[0])
+    assert controller.rejected_ratio == 0.0
+    assert controller.limit == float("inf")
+    assert controller.reject(0.4, elapsed=2.0) == 0.2
+    assert controller.reject(0.2, elapsed=1.0) == 0.1
+    assert controller.limit == 0.2
+    controller.accept(0.1, elapsed=0.5, indicator=1.0)  # indicator of the controller: 10
+    assert controller.propose(1.0) == pytest.approx(0.05)
+    iterations[0] = 1
+    controller.accept(0.05, elapsed=0.5)
+    assert controller.limit == pytest.approx(0.2 * controller.limit_growth ** 2)
+    assert controller.propose(1.0) == pytest.approx(0.9 * controller.limit)
+    assert (controller.n_accepted, controller.n_rejected) == (2, 2)
+    assert controller.rejected_ratio == 0.5
+    assert (controller.solve_time, controller.wasted_time) == (1.0, 3.0)
+    controller.reset_statistics()
+    assert (controller.n_accepted, controller.n_rejected, controller.wasted_time) == (0, 0, 0.0)
+    assert controller.propose(1.0) < 1.0
+    controller.reset()
+    assert controller.propose(1.0) == 1.0
+
+
+def test_driver_controller():
+    """Tests the time loop driven by a controller"""
+
+    problem = StiffProblem(dt_ok=0.03)
+    controller = TimeStepController(target=6.0, indicator=lambda: problem.iterations)
+    driver = CouplingDriver([problem], controller=controller)
+    assert driver.controller is controller
+    driver.initialize()
+    assert driver.run(time_max=1.0) > 0
+    assert problem.presentTime() == pytest.approx(1.0)
+    assert controller.n_accepted == driver.n_steps
+    assert controller.n_rejected == driver.n_aborts
+    assert controller.rejected_ratio < 0.2
+    assert controller.wasted_time > 0.0
+
+    default = CouplingDriver([StiffProblem(dt_ok=0.03)])
+    assert default.controller is None
+    assert default.run(time_max=1.0) > 0
+    assert default.n_aborts > driver.n_aborts
+
+    driver = CouplingDriver([StiffProblem(dt_ok=-1.0)], controller=TimeStepController(),
+                            max_retries=2)
+    with pytest.raises(RuntimeError, match="failed 3 times"):
+        driver.step()
+    assert driver.controller.n_rejected == 3
+
+
+def test_controller_clipped():
+    """Tests that time steps cut by dt_max do not change the prediction"""
+
+    controller = TimeStepController()
+    driver = CouplingDriver([StiffProblem(dt_ok=10.0)], controller=controller)
+    driver.initialize()
+    assert driver.step()
+    assert controller.propose(10.0) == 2.0
+    assert driver.step(dt_max=1.e-3)
+    assert controller.propose(10.0) == 2.0
+    assert controller.n_accepted == 2
+    controller.accept(1.e-3, clipped=True)
+    assert controller.propose(10.0) == 2.0
+
+    driver = CouplingDriver([StiffProblem(dt_ok=1.e-3)], controller=TimeStepController())
+    assert driver.step(dt_max=0.1)  # rejected, then accepted with the retried time step
+    assert driver.controller.propose(10.0) < 0.01
+
+
+def test_fixed_point_controller():
+    """Tests the number of coupling iterations as indicator"""
+
+    problem = StiffProblem(dt_ok=1.0)
+    controller = TimeStepController(target=2.0, gains=(1.0, 0.0, 0.0))
+    driver = FixedPointCoupling([problem], [], controller=controller)
+    driver.initialize()
+    assert driver.step()
+    assert driver.iterations == [1]
+    assert controller.propose(1.0) == 1.0
+    assert controller.propose(10.0) == pytest.approx(2.0)
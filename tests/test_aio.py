@@ -0,0 +1,135 @@
+"""test icoco.aio module"""
+# pylint: disable=no-member
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
+
+import pytest
+
+import icoco
+from icoco.aio import AsyncProblem, compute_time_step, gather, try_time_step
+
+from conftest import MinimalProblem  # pylint: disable=wrong-import-order
+
+
+class SlowProblem(MinimalProblem):
+    """Problem sleeping in solveTimeStep, failing above dt_ok"""
+
+    def __init__(self, sleep: float = 0.0, dt_ok: float = 1.0, stop: bool = False) -> None:
+        super().__init__()
+        self._sleep = sleep
+        self._dt_ok = dt_ok
+        self._stop = stop
+        self.thread = None
+        self.aborted = 0
+
+    def computeTimeStep(self) -> Tuple[float, bool]:
+        return (self._dt_ok, self._stop)
+
+    def initTimeStep(self, dt: float) -> bool:
+        self._dt = dt
+        return dt <= 2.0 * self._dt_ok
+
+    def solveTimeStep(self) -> bool:
+        self.thread = threading.get_ident()
+        time.sleep(self._sleep)
+        return self._dt <= self._dt_ok
+
+    def abortTimeStep(self) -> None:
+        self.aborted += 1
+
+
+def test_async_problem(minimal_problem):
+    """Tests awaitable methods"""
+
+    async def run(problem: AsyncProblem):
+        assert await problem.initialize()
+        assert await problem.presentTime() == 0.0
+        assert await problem.initTimeStep(dt=0.1)
+        assert await problem.solveTimeStep()
+        await problem.validateTimeStep()
+        with pytest.raises(icoco.NotImplementedMethod):
+            await problem.isStationary()
+        return await problem.presentTime()
+
+    with AsyncProblem(minimal_problem) as problem:
+        assert problem.problem is minimal_problem
+        assert asyncio.run(run(problem)) == pytest.approx(0.1)
+    assert AsyncProblem.solveTimeStep.__name__ == "solveTimeStep"
+
+
+def test_async_problem_responsive():
+    """Tests that the event loop runs while problems are solving"""
+
+    async def run(problems):
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.ensure_future(tick())
+        start = time.perf_counter()
+        await gather(problems, "initTimeStep", 0.1)
+        assert await gather(problems, "solveTimeStep") == [True] * len(problems)
+        elapsed = time.perf_counter() - start
+        ticker.cancel()
+        return ticks, elapsed
+
+    problems = [AsyncProblem(SlowProblem(sleep=0.2)) for _ in range(4)]
+    ticks, elapsed = asyncio.run(run(problems))
+    assert ticks > 5
+    assert elapsed < 0.6
+    assert len({problem.problem.thread for problem in problems}) == 4
+    for problem in problems:
+        problem.close()
+
+
+def test_async_executor():
+    """Tests a user provided executor"""
+
+    executor = ThreadPoolExecutor(max_workers=2)
+    problem = AsyncProblem(SlowProblem(), executor=executor)
+    assert problem.executor is executor
+    problem.close()
+    assert asyncio.run(problem.initialize())
+    executor.shutdown()
+
+
+def test_async_time_step():
+    """Tests coupled time steps"""
+
+    async def run(problems, dt, exchange=None):
+        dt = min(dt, await compute_time_step(problems))
+        if dt < 0.0:
+            return None
+        return await try_time_step(problems, dt, exchange=exchange)
+
+    exchanged = []
+
+    async def async_exchange():
+        exchanged.append("async")
+
+    slow = SlowProblem(dt_ok=0.1)
+    fast = SlowProblem(dt_ok=0.5)
+    problems = [AsyncProblem(slow), AsyncProblem(fast)]
+    assert asyncio.run(run(problems, 1.0, exchange=lambda: exchanged.append("sync")))
+    assert asyncio.run(run(problems, 1.0, exchange=async_exchange))
+    assert exchanged == ["sync", "async"]
+    assert slow.presentTime() == pytest.approx(0.2)
+
+    assert not asyncio.run(try_time_step(problems, 0.15))
+    assert (slow.aborted, fast.aborted) == (1, 1)
+    assert not asyncio.run(try_time_step(problems, 0.3))
+    assert (slow.aborted, fast.aborted) == (1, 2)
+    assert slow.presentTime() == pytest.approx(0.2)
+
+    problems.append(AsyncProblem(SlowProblem(stop=True)))
+    assert asyncio.run(run(problems, 1.0)) is None
+    for problem in problems:
+        problem.close()
@@ -0,0 +1,156 @@
+"""test icoco.checkpoint module"""
+
+import mmap
+import os
+import shutil
+import struct
+import threading
+
+import numpy as np
+import pytest
+
+import icoco
+from icoco.checkpoint import DiskCheckpoints, MappedCheckpoints
+
+
+class BlockingCheckpoints(DiskCheckpoints):
+    """Checkpoints whose writes wait for an event"""
+
+    def __init__(self, directory: str) -> None:
+        super().__init__(directory, chunk_size=64)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def _write_section(self, stream, section, write) -> None:
+        self.started.set()
+        self.release.wait()
+        super()._write_section(stream, section, write)
+
+
+@pytest.mark.parametrize("compression", list(DiskCheckpoints.COMPRESSIONS))
+def test_save_restore(tmp_path, compression):
+    """Tests the round trip of a state through a file"""
+
+    field = np.linspace(0.0, 1.0, 1001)
+    with DiskCheckpoints(str(tmp_path / "ckpt"), compression=compression,
+                         chunk_size=1000) as checkpoints:
+        checkpoints.save(3, "file", {"time": 1.5, "field": field, "ints": np.arange(7)})
+        field[:] = 0.0
+        state = checkpoints.restore(3, "file")
+        assert state["time"] == 1.5
+        np.testing.assert_array_equal(state["field"], np.linspace(0.0, 1.0, 1001))
+        np.testing.assert_array_equal(state["ints"], np.arange(7))
+        state["field"][:] = 2.0
+        assert checkpoints.pending == 0
+        assert os.path.exists(checkpoints.path(3, "file"))
+
+    checkpoints = DiskCheckpoints(str(tmp_path / "ckpt"), background=False)
+    assert checkpoints.restore(3, "file")["time"] == 1.5
+    checkpoints.save(3, "file", 2.5)
+    assert checkpoints.pending == 0
+    assert checkpoints.restore(3, "file") == 2.5
+    checkpoints.forget(3, "file")
+    assert not os.listdir(checkpoints.directory)
+    checkpoints.close()
+
+
+def test_pending_writes(tmp_path):
+    """Tests restore and forget of pending writes"""
+
+    checkpoints = BlockingCheckpoints(str(tmp_path))
+    checkpoints.save(0, "file", np.ones(100))
+    checkpoints.started.wait()
+    checkpoints.save(1, "file", np.zeros(100))
+    checkpoints.save(1, "file", np.full(100, 2.0))
+    assert checkpoints.pending == 2
+    checkpoints.forget(1, "file")
+    assert checkpoints.pending == 1
+
+    timer = threading.Timer(0.1, checkpoints.release.set)
+    timer.start()
+    checkpoints.forget(0, "file")
+    timer.join()
+    assert not os.listdir(tmp_path)
+
+    checkpoints.save(2, "file", np.ones(100))
+    np.testing.assert_array_equal(checkpoints.restore(2, "file"), np.ones(100))
+    checkpoints.close()
+    checkpoints.save(4, "file", 4.0)
+    assert checkpoints.restore(4, "file") == 4.0
+
+
+def test_errors(tmp_path):
+    """Tests unknown checkpoints, invalid files and failed writes"""
+
+    with pytest.raises(icoco.WrongArgument, match="compression"):
+        DiskCheckpoints(str(tmp_path), compression="bz2")
+
+    checkpoints = DiskCheckpoints(str(tmp_path / "ckpt"), name="Prob")
+    with pytest.raises(icoco.WrongArgument, match="Prob.*not a known save state"):
+        checkpoints.restore(0, "file")
+    with open(checkpoints.path(0, "file"), "wb") as stream:
+        stream.write(b"0" * 100)
+    with pytest.raises(icoco.WrongArgument, match="not a checkpoint file"):
+        checkpoints.restore(0, "file")
+    with open(checkpoints.path(0, "file"), "wb") as stream:
+        stream.write(b"ICOCO")
+    with pytest.raises(icoco.WrongArgument, match="not a checkpoint file"):
+        checkpoints.restore(0, "file")
+
+    shutil.rmtree(checkpoints.directory)
+    checkpoints.save(1, "file", 1.0)
+    with pytest.raises(FileNotFoundError):
+        checkpoints.flush()
+    with pytest.raises(FileNotFoundError):
+        checkpoints.restore(1, "file")
+    checkpoints.forget(1, "file")
+    assert checkpoints.pending == 0
+    checkpoints.flush()
+    checkpoints.close()
+
+
+def test_mapped(tmp_path):
+    """Tests page-aligned checkpoints restored by memory mapping"""
+
+    field = np.linspace(0.0, 1.0, 10001)
+    with MappedCheckpoints(str(tmp_path), chunk_size=1000) as checkpoints:
+        checkpoints.save(0, "file", {"time": 1.5, "field": field, "empty": np.zeros(0)})
+        state = checkpoints.restore(0, "file")
+        assert state["time"] == 1.5
+        np.testing.assert_array_equal(state["field"], field)
+        assert not state["field"].flags.owndata
+        state["field"][:] = 2.0  # copy-on-write
+        np.testing.assert_array_equal(checkpoints.restore(0, "file")["field"], field)
+        assert state["empty"].size == 0
+
+        with open(checkpoints.path(0, "file"), "rb") as stream:
+            n_sections, = struct.unpack("<12xI", stream.read(16))
+            index = struct.unpack(f"<{2 * n_sections}Q", stream.read(16 * n_sections))
+        assert n_sections == 3
+        assert all(offset % mmap.PAGESIZE == 0 for offset in index[::2])
+
+        blocking = BlockingCheckpoints(str(tmp_path))
+        blocking.save(1, "file", 1.0)
+        blocking.release.set()
+        blocking.close()
+        with pytest.raises(icoco.WrongArgument, match="not a checkpoint file"):
+            checkpoints.restore(1, "file")
+        with open(checkpoints.path(2, "file"), "wb") as stream:
+            stream.write(b"0")
+        with pytest.raises(icoco.WrongArgument, match="not a checkpoint file"):
+            checkpoints.restore(2, "file")
+
+
+def test_mapped_cancel(tmp_path):
+    """Tests the cancellation of a pending mapped checkpoint"""
+
+    checkpoints = MappedCheckpoints(str(tmp_path), chunk_size=64)
+    release = threading.Event()
+    checkpoints._executor.submit(release.wait)  # pylint: disable=protected-access
+    checkpoints.save(0, "file", np.ones(100))
+    write = checkpoints._pending[(0, "file")]  # pylint: disable=protected-access
+    write.cancelled = True
+    release.set()
+    write.future.result()
+    assert not os.listdir(tmp_path)
+    checkpoints.close()
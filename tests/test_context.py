@@ -0,0 +1,102 @@
+"""test icoco.context module"""
+
+import pytest
+
+import icoco
+from icoco.context import CONTEXT_MASKS, ContextState, check_context, get_context_state
+
+
+def test_context_masks():
+    """Tests masks compiled from ICoCoMethodContext"""
+
+    assert CONTEXT_MASKS["setDataFile"] == ContextState.NOT_INITIALIZED
+    assert CONTEXT_MASKS["initialize"] == ContextState.NOT_INITIALIZED
+    assert CONTEXT_MASKS["terminate"] == ContextState.OUTSIDE_TIME_STEP
+    assert CONTEXT_MASKS["solveTimeStep"] == ContextState.INSIDE_TIME_STEP
+    assert CONTEXT_MASKS["getStationaryMode"] == (ContextState.OUTSIDE_TIME_STEP
+                                                  | ContextState.INSIDE_TIME_STEP)
+    assert CONTEXT_MASKS["isMEDCoupling64Bits"] == ContextState.ANY
+
+
+def test_check_context_release(minimal_problem):
+    """Tests that release mode returns the class unchanged"""
+
+    cls = minimal_problem.__class__
+    assert check_context(cls, enabled=False) is cls
+    assert check_context(enabled=False)(cls) is cls
+
+
+def test_check_context(minimal_problem):
+    """Tests the state machine on a time loop"""
+
+    cls = check_context(minimal_problem.__class__)
+    assert cls is not minimal_problem.__class__
+    assert issubclass(cls, minimal_problem.__class__)
+    assert cls.__name__ == minimal_problem.__class__.__name__
+
+    problem = cls()
+    assert get_context_state(problem) == ContextState.NOT_INITIALIZED
+    with pytest.raises(icoco.WrongContext) as error:
+        problem.presentTime()
+    assert "called before initialize() or after terminate()" in str(error.value)
+
+    assert problem.initialize()
+    assert get_context_state(problem) == ContextState.OUTSIDE_TIME_STEP
+    with pytest.raises(icoco.WrongContext) as error:
+        problem.initialize()
+    assert "called after initialize()" in str(error.value)
+    with pytest.raises(icoco.WrongContext) as error:
+        problem.solveTimeStep()
+    assert "called outside the TIME_STEP_DEFINED context" in str(error.value)
+
+    assert problem.initTimeStep(0.1)
+    assert get_context_state(problem) == ContextState.INSIDE_TIME_STEP
+    with pytest.raises(icoco.WrongContext) as error:
+        problem.computeTimeStep()
+    assert "called inside the TIME_STEP_DEFINED context" in str(error.value)
+    assert problem.solveTimeStep()
+    with pytest.raises(icoco.NotImplementedMethod):
+        problem.abortTimeStep()
+    assert get_context_state(problem) == ContextState.INSIDE_TIME_STEP
+    problem.validateTimeStep()
+    assert get_context_state(problem) == ContextState.OUTSIDE_TIME_STEP
+    assert problem.presentTime() == pytest.approx(0.1)
+
+    problem.terminate()
+    assert get_context_state(problem) == ContextState.NOT_INITIALIZED
+
+
+def test_check_context_failed_transition(minimal_problem):
+    """Tests that a call returning False does not change the state"""
+
+    @check_context
+    class RefusingProblem(minimal_problem.__class__):  # pylint: disable=too-few-public-methods
+        """Problem refusing any time step"""
+
+        def initTimeStep(self, dt: float) -> bool:
+            """Refuses the time step"""
+            return dt < 0.0
+
+    problem = RefusingProblem()
+    problem.initialize()
+    assert not problem.initTimeStep(0.1)
+    assert get_context_state(problem) == ContextState.OUTSIDE_TIME_STEP
+    assert problem.computeTimeStep() == (0.1, False)
+
+
+def test_check_context_supports(minimal_problem):
+    """Tests that the wrappers do not make methods look implemented"""
+
+    problem = check_context(minimal_problem.__class__)()
+    assert problem.supports("solveTimeStep")
+    assert not problem.supports("abortTimeStep")
+    assert not problem.supports("getInputFieldsNames")
+    assert problem.implemented_methods() == minimal_problem.implemented_methods()
+
+
+def test_check_context_abstract():
+    """Tests that abstract methods remain abstract"""
+
+    cls = check_context(icoco.Problem)
+    with pytest.raises(TypeError):
+        cls()  # pylint: disable=abstract-class-instantiated
@@ -0,0 +1,262 @@
+"""test icoco.coupling module"""
+
+import threading
+import time
+from typing import Tuple
+
+import pytest
+
+import icoco
+from icoco.coupling import CouplingDriver, CouplingPhase
+
+from conftest import MinimalProblem  # pylint: disable=wrong-import-order
+
+
+class StopProblem(MinimalProblem):
+    """Problem requesting to stop at a given time"""
+
+    def __init__(self, time_stop: float, dt: float = 0.1) -> None:
+        super().__init__()
+        self._time_stop = time_stop
+        self._dt_pref = dt
+
+    def computeTimeStep(self) -> Tuple[float, bool]:
+        return (self._dt_pref, self._time >= self._time_stop)
+
+
+class FailingProblem(MinimalProblem):
+    """Problem failing the resolution (or the initialization) with time steps above dt_ok"""
+
+    def __init__(self, dt_ok: float, fail_init: bool = False) -> None:
+        super().__init__()
+        self._dt_ok = dt_ok
+        self._fail_init = fail_init
+        self.aborted = 0
+
+    def initTimeStep(self, dt: float) -> bool:
+        self._dt = dt
+        return not self._fail_init or dt <= self._dt_ok
+
+    def solveTimeStep(self) -> bool:
+        return self._dt <= self._dt_ok
+
+    def abortTimeStep(self) -> None:
+        self.aborted += 1
+        self._dt = 0.0
+
+
+def test_coupling_run():
+    """Tests the time loop until time_max"""
+
+    problems = [MinimalProblem(), StopProblem(time_stop=10.0, dt=0.25)]
+    calls = []
+    driver = CouplingDriver(problems, exchanges=[lambda: calls.append(problems[0].presentTime())])
+    assert driver.problems == tuple(problems)
+    assert driver.initialize()
+
+    assert driver.run(time_max=1.0) == 10
+    assert problems[0].presentTime() == pytest.approx(1.0)
+    assert problems[1].presentTime() == pytest.approx(1.0)
+    assert len(calls) == 10
+    assert driver.n_steps == 10
+    assert driver.n_aborts == 0
+    assert set(driver.timings) == set(CouplingPhase.NAMES)
+    assert driver.timings["solveTimeStep"] > 0.0
+
+    assert driver.run(max_steps=3) == 3
+    assert problems[0].presentTime() == pytest.approx(1.3)
+
+    driver.reset_timings()
+    assert driver.n_steps == 0
+    assert all(value == 0.0 for value in driver.timings.values())
+    driver.terminate()
+
+
+def test_coupling_stop():
+    """Tests that the loop stops when a problem requests it"""
+
+    problems = [MinimalProblem(), StopProblem(time_stop=0.25)]
+    driver = CouplingDriver(problems)
+    driver.initialize()
+    assert driver.run() == 3
+    assert not driver.step()
+    assert problems[0].presentTime() == pytest.approx(0.3)
+
+
+@pytest.mark.parametrize("fail_init", [False, True])
+def test_coupling_abort(fail_init):
+    """Tests that failed time steps are aborted and retried with a smaller time step"""
+
+    failing = FailingProblem(dt_ok=0.03, fail_init=fail_init)
+    problems = [FailingProblem(dt_ok=1.0), failing]
+    driver = CouplingDriver(problems, dt_factor=0.5)
+    driver.initialize()
+    assert driver.step()
+    assert driver.n_aborts == 2
+    assert problems[0].aborted == 2
+    assert failing.aborted == (0 if fail_init else 2)
+    assert problems[0].presentTime() == pytest.approx(0.025)
+    assert failing.presentTime() == pytest.approx(0.025)
+
+
+def test_coupling_max_retries():
+    """Tests the error raised when the time step keeps failing"""
+
+    driver = CouplingDriver([FailingProblem(dt_ok=-1.0)], max_retries=2)
+    driver.initialize()
+    with pytest.raises(RuntimeError, match="failed 3 times"):
+        driver.step()
+    assert driver.n_aborts == 3
+
+
+class ThreadedProblem(MinimalProblem):
+    """Problem recording the threads it runs on, sleeping in solveTimeStep and iterateTimeStep"""
+
+    def __init__(self, sleep: float = 0.0, error: Exception = None) -> None:
+        super().__init__()
+        self._sleep = sleep
+        self._error = error
+        self.threads = set()
+        self.solved = 0
+
+    def initTimeStep(self, dt: float) -> bool:
+        self.threads.add(threading.current_thread().name)
+        return super().initTimeStep(dt)
+
+    def solveTimeStep(self) -> bool:
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self._sleep)
+        self.solved += 1
+        if self._error is not None:
+            raise self._error
+        return True
+
+    def iterateTimeStep(self) -> Tuple[bool, bool]:
+        self.threads.add(threading.current_thread().name)
+        return (True, self._dt > 0.05)
+
+    def abortTimeStep(self) -> None:
+        self._dt = 0.0
+
+
+def test_coupling_threads():
+    """Tests that problems run concurrently, except thread unsafe ones"""
+
+    problems = [ThreadedProblem(sleep=0.1) for _ in range(4)]
+    with CouplingDriver(problems, max_workers=4, thread_unsafe=problems[:1]) as driver:
+        driver.initialize()
+        start = time.perf_counter()
+        assert driver.run(max_steps=2) == 2
+        elapsed = time.perf_counter() - start
+        assert elapsed < 0.6
+        assert problems[0].threads == {threading.current_thread().name}
+        for problem in problems[1:]:
+            assert problem.threads
+            assert threading.current_thread().name not in problem.threads
+            assert problem.presentTime() == pytest.approx(0.2)
+
+        assert driver.init_time_step(0.1)
+        assert driver.iterate_time_step() == (True, True)
+        driver.abort_time_step()
+        assert driver.n_aborts == 1
+    driver.close()
+
+
+def test_coupling_threads_failure():
+    """Tests that failures of concurrent problems abort the time step"""
+
+    problems = [FailingProblem(dt_ok=1.0), FailingProblem(dt_ok=0.03, fail_init=True)]
+    with CouplingDriver(problems, max_workers=2) as driver:
+        driver.initialize()
+        assert driver.step()
+        assert driver.n_aborts == 2
+        assert [problem.aborted for problem in problems] == [2, 0]
+
+    problems = [FailingProblem(dt_ok=1.0), FailingProblem(dt_ok=0.03)]
+    with CouplingDriver(problems, max_workers=2) as driver:
+        driver.initialize()
+        assert driver.step()
+        assert [problem.aborted for problem in problems] == [2, 2]
+
+
+def test_coupling_threads_exceptions():
+    """Tests that exceptions are propagated once all problems returned"""
+
+    error = icoco.WrongArgument(prob="pb", method="solveTimeStep", arg="dt", condition="dt > 0")
+    problems = [ThreadedProblem(sleep=0.1), ThreadedProblem(error=error),
+                ThreadedProblem(error=icoco.WrongContext(prob="pb", method="solveTimeStep",
+                                                         precondition="called"))]
+    with CouplingDriver(problems, max_workers=2) as driver:
+        driver.initialize()
+        driver.init_time_step(0.1)
+        with pytest.raises(icoco.WrongArgument) as raised:
+            driver.solve_time_step()
+        assert raised.value is error
+        assert [problem.solved for problem in problems] == [1, 1, 1]
+
+    with CouplingDriver(problems, max_workers=2, thread_unsafe=problems[2:]) as driver:
+        driver.init_time_step(0.1)
+        with pytest.raises(icoco.WrongArgument) as raised:  # first problem raising
+            driver.solve_time_step()
+        assert raised.value is error
+        assert [problem.solved for problem in problems] == [2, 2, 2]
+    with CouplingDriver(problems[2:], max_workers=2, thread_unsafe=problems[2:]) as driver:
+        driver.init_time_step(0.1)
+        with pytest.raises(icoco.WrongContext):
+            driver.solve_time_step()
+
+
+class InitErrorProblem(MinimalProblem):
+    """Problem whose initTimeStep raises when error is set"""
+
+    error = False
+
+    def initTimeStep(self, dt: float) -> bool:
+        if self.error:
+            raise icoco.WrongArgument(prob="pb", method="initTimeStep", arg="dt",
+                                      condition="error")
+        return super().initTimeStep(dt)
+
+    def abortTimeStep(self) -> None:
+        self._dt = 0.0
+
+
+def test_coupling_entered():
+    """Tests that the problems which entered a time step are known after an exception"""
+
+    problems = [FailingProblem(dt_ok=0.05), InitErrorProblem(), FailingProblem(dt_ok=0.05)]
+    driver = CouplingDriver(problems)
+    driver.initialize()
+    assert driver.init_time_step(0.01)
+    driver.abort_time_step()
+    problems[1].error = True
+    with pytest.raises(icoco.WrongArgument, match="error"):
+        driver.init_time_step(0.01)
+    driver.abort_time_step()
+    assert [problems[0].aborted, problems[2].aborted] == [2, 1]
+
+
+def test_coupling_threads_entered():
+    """Tests that the problems which entered a time step are known after an exception"""
+
+    problems = [InitErrorProblem(), FailingProblem(dt_ok=0.05, fail_init=True)]
+    with CouplingDriver(problems, max_workers=2) as driver:
+        driver.initialize()
+        assert driver.init_time_step(0.01)
+        driver.abort_time_step()
+        assert problems[1].aborted == 1
+        problems[0].error = True
+        with pytest.raises(icoco.WrongArgument, match="error"):
+            driver.init_time_step(0.1)  # the second problem does not enter the time step
+        driver.abort_time_step()
+        assert problems[1].aborted == 1
+
+
+def test_coupling_iterate():
+    """Tests iterate_time_step without thread"""
+
+    problems = [ThreadedProblem(), ThreadedProblem()]
+    driver = CouplingDriver(problems)
+    driver.initialize()
+    assert driver.init_time_step(0.01)
+    assert driver.iterate_time_step() == (True, False)
@@ -4,10 +4,14 @@
 # You can import pytest and use its features.
 # import pytest
 
+import pickle
+
 import pytest
 
 import icoco
 
+from conftest import MinimalProblem  # pylint: disable=wrong-import-order
+
 
 def test_exception():
     """Tests exception sub package"""
@@ -32,3 +36,26 @@ def test_exception():
                                                    method="test_exception")
     assert ("NotImplemented in Problem instance with name: 'NotImplementedMethodPb'"
             " in method 'test_exception'") in str(error.value)
+
+
+def test_exception_message():
+    """Tests the messages formatted on demand, and the pickled exceptions"""
+
+    error = icoco.WrongArgument(prob="Pb", method="getFieldType", arg="name", condition="unknown")
+    assert error.args == ("Pb", "getFieldType", "name", "unknown")
+    assert str(error) == error._message  # pylint: disable=protected-access
+    for error in (error,
+                  icoco.WrongContext(prob="Pb", method="initialize", precondition="twice"),
+                  icoco.NotImplementedMethod(prob="Pb", method="save")):
+        copy = pickle.loads(pickle.dumps(error))
+        assert type(copy) is type(error) and str(copy) == str(error)
+        assert copy.args == error.args
+
+
+def test_problem_name():
+    """Tests the qualified name of the problems in their exceptions"""
+
+    with pytest.raises(icoco.NotImplementedMethod,
+                       match="name: 'conftest.MinimalProblem' in method 'save'"):
+        MinimalProblem().save(1, "memory")
+    assert icoco.Problem._problem_name == "icoco.problem.Problem"  # pylint: disable=protected-access
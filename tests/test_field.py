@@ -0,0 +1,126 @@
+"""test icoco.field module"""
+
+import sys
+
+import numpy as np
+import pytest
+
+import icoco
+from icoco.field import Field, FieldNature, Mesh
+
+
+def square_mesh() -> Mesh:
+    """Returns a mesh of 2 triangles (medcoupling type 3) on 4 nodes"""
+    return Mesh("square", 2, [[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]],
+                [3, 0, 1, 2, 3, 0, 2, 3], [0, 4, 8])
+
+
+def test_mesh():
+    """Tests the mesh descriptor"""
+
+    mesh = square_mesh()
+    assert (mesh.n_nodes, mesh.n_cells) == (4, 2)
+    assert mesh.connectivity.dtype == np.int64
+    assert Mesh("line", 1, np.arange(3.0), [], [0]).coordinates.shape == (3, 1)
+
+    with pytest.raises(icoco.WrongArgument, match="coordinates"):
+        Mesh("bad", 2, np.zeros((2, 2, 2)), [], [0])
+    for index in ([], [1, 8], [0, 4], [0, 8, 8]):
+        with pytest.raises(icoco.WrongArgument, match="connectivity_index"):
+            Mesh("bad", 2, np.zeros((4, 2)), [3, 0, 1, 2, 3, 0, 2, 3], index)
+
+
+def test_field():
+    """Tests the field attributes and the zero-copy accesses"""
+
+    array = np.arange(4.0)
+    field = Field("temperature", array, square_mesh(), unit="K", time=1.5,
+                  nature=FieldNature.INTENSIVE_MAXIMUM, on_nodes=True)
+    assert (field.n_tuples, field.n_components, len(field)) == (4, 1, 4)
+    assert repr(field) == "Field('temperature', 4x1 float64, time=1.5)"
+    assert np.shares_memory(np.asarray(field), array)
+    assert field.__array_interface__["data"][0] == array.__array_interface__["data"][0]
+    assert np.shares_memory(np.asarray(field.__buffer__(0)), array)
+    if sys.version_info >= (3, 12):
+        assert np.shares_memory(np.asarray(memoryview(field)), array)
+    else:
+        with pytest.raises(TypeError):
+            memoryview(field)
+        assert np.shares_memory(np.asarray(memoryview(field.array)), array)
+    assert not np.shares_memory(np.array(field), array)
+    assert np.asarray(field, dtype=np.float32).dtype == np.float32
+
+    copy = field.copy()
+    copy.array[:] = 0.0
+    np.testing.assert_array_equal(field.array[:, 0], np.arange(4.0))
+    assert (copy.unit, copy.time, copy.nature, copy.mesh) == ("K", 1.5, field.nature, field.mesh)
+
+    assert Field("strided", np.zeros((4, 2))[:, 0]).array.flags.c_contiguous
+    with pytest.raises(icoco.WrongArgument, match="tuples, components"):
+        Field("bad", np.zeros((2, 2, 2)))
+    with pytest.raises(icoco.WrongArgument, match="nature"):
+        Field("bad", np.zeros(2), nature="Intensive")
+    with pytest.raises(icoco.WrongArgument, match="4 tuples for 2 cells"):
+        Field("bad", np.zeros(4), square_mesh())
+
+
+def test_medcoupling():
+    """Tests the conversions from and to medcoupling"""
+
+    medcoupling = pytest.importorskip("medcoupling")
+    field = Field("temperature", np.arange(4.0).reshape(2, 2), square_mesh(), unit="K",
+                  time=1.5, nature=FieldNature.INTENSIVE_MAXIMUM)
+    mc_field = field.to_medcoupling()
+    assert isinstance(mc_field, medcoupling.MEDCouplingFieldDouble)
+    mc_field.checkConsistencyLight()
+    converted = Field.from_medcoupling(mc_field)
+    np.testing.assert_array_equal(converted.array, field.array)
+    assert (converted.unit, converted.time, converted.nature) == ("K", 1.5, field.nature)
+    np.testing.assert_array_equal(converted.mesh.connectivity, field.mesh.connectivity)
+
+    ints = Field("ids", np.arange(4), square_mesh(), on_nodes=True).to_medcoupling()
+    assert isinstance(ints, medcoupling.MEDCouplingFieldInt)
+    assert Field.from_medcoupling(ints, copy=False).on_nodes
+    with pytest.raises(icoco.WrongArgument, match="mesh"):
+        Field("no mesh", np.zeros(2)).to_medcoupling()
+
+
+def test_medcoupling_mesh():
+    """Tests the round trips of meshes and fields through medcoupling"""
+
+    medcoupling = pytest.importorskip("medcoupling")
+    mesh = square_mesh()
+    mc_mesh = mesh.to_medcoupling()
+    mc_mesh.checkConsistency()
+    assert (mc_mesh.getName(), mc_mesh.getNumberOfCells()) == ("square", 2)
+    converted = Mesh.from_medcoupling(mc_mesh)
+    assert (converted.name, converted.dimension) == (mesh.name, mesh.dimension)
+    for attribute in ("coordinates", "connectivity", "connectivity_index"):
+        np.testing.assert_array_equal(getattr(converted, attribute), getattr(mesh, attribute))
+
+    cartesian = medcoupling.MEDCouplingCMesh("grid")
+    cartesian.setCoords(medcoupling.DataArrayDouble([0.0, 1.0, 2.0]),
+                        medcoupling.DataArrayDouble([0.0, 1.0]))
+    grid = Mesh.from_medcoupling(cartesian)  # unstructured
+    assert (grid.n_nodes, grid.n_cells, grid.dimension) == (6, 2, 2)
+
+    field = Field("power", np.arange(2.0), grid, unit="W")
+    converted = Field.from_medcoupling(field.to_medcoupling())
+    assert (converted.unit, converted.nature) == ("W", FieldNature.NO_NATURE)
+    np.testing.assert_array_equal(converted.mesh.connectivity, grid.connectivity)
+    mc_field = field.to_medcoupling()
+    mc_field.getArray().setInfoOnComponents(["power"])
+    assert Field.from_medcoupling(mc_field).unit == "power"
+
+    gauss = medcoupling.MEDCouplingFieldDouble(medcoupling.ON_GAUSS_NE, medcoupling.ONE_TIME)
+    gauss.setMesh(mc_mesh)
+    with pytest.raises(icoco.WrongArgument, match="cells or nodes"):
+        Field.from_medcoupling(gauss)
+
+
+def test_without_medcoupling(monkeypatch):
+    """Tests the error raised by the conversions when medcoupling is not available"""
+
+    monkeypatch.setitem(sys.modules, "medcoupling", None)
+    with pytest.raises(ImportError, match="medcoupling is required"):
+        square_mesh().to_medcoupling()
@@ -0,0 +1,147 @@
+"""test icoco.handles module"""
+
+import numpy as np
+import pytest
+
+import icoco
+from icoco.handles import HANDLE_METHODS, HandleRegistry
+
+from conftest import MinimalProblem  # pylint: disable=wrong-import-order
+
+
+class NamedProblem(MinimalProblem):
+    """Problem declaring and validating its value names"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.values = {"p": 1.0, "q": 2.0}
+        self.listed = 0
+
+    def getOutputValuesNames(self):
+        self.listed += 1
+        return list(self.values)
+
+    def getInputValuesNames(self):
+        return list(self.values)
+
+    def setInputDoubleValue(self, name: str, val: float) -> None:
+        self.values[name] = val
+
+    def getOutputDoubleValue(self, name: str) -> float:
+        return self.values[name]
+
+    def getValueUnit(self, name: str) -> str:
+        return "Pa"
+
+
+class IndexedProblem(NamedProblem):
+    """Problem resolving its value names into indices in an array"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.array = np.array([1.0, 2.0])
+        self.ints = {"p": 0}
+        self.resolved = []
+
+    def getValuesHandle(self, names):
+        self.resolved.append(tuple(names))
+        return icoco.ValuesHandle(names, [list(self.values).index(name) for name in names])
+
+    def getOutputDoubleValues(self, names):
+        return self.array[names.indices]
+
+    def setInputDoubleValues(self, names, vals):
+        self.array[names.indices] = vals
+
+    def setInputIntValue(self, name: str, val: int) -> None:
+        self.ints[name] = val
+
+    def getOutputIntValue(self, name: str) -> int:
+        return self.ints[name]
+
+
+class ArrayHandles(HandleRegistry):
+    """Native handles: the handle is the index of the value in an array"""
+
+    def __init__(self, problem: NamedProblem) -> None:
+        super().__init__(problem)
+        self.array = np.zeros(4)
+
+    def getOutputDoubleValue(self, handle: int) -> float:
+        """Returns the value of the array at handle"""
+        return self.array[handle]
+
+
+def test_handles():
+    """Tests the resolution of names and the default adapter"""
+
+    problem = NamedProblem()
+    handles = HandleRegistry(problem)
+    assert handles.problem is problem
+    p_handle, q_handle = handles.resolve_all(["p", "q"])
+    assert handles.resolve("p") == p_handle
+    assert (len(handles), "q" in handles, handles.name(q_handle)) == (2, True, "q")
+    assert problem.listed == 1
+    assert handles.getOutputDoubleValue(q_handle) == 2.0
+    handles.setInputDoubleValue(p_handle, 3.0)
+    assert problem.values["p"] == 3.0
+    assert handles.getValueUnit(p_handle) == "Pa"
+    with pytest.raises(icoco.NotImplementedMethod):
+        handles.getOutputIntValue(p_handle)
+    with pytest.raises(icoco.WrongArgument, match="'r' is not a field or value name"):
+        handles.resolve("r")
+
+    problem.values["r"] = 4.0
+    handles.refresh()
+    assert handles.getOutputDoubleValue(handles.resolve("r")) == 4.0
+    assert problem.listed == 2
+    values_handle = handles.values_handle([q_handle, p_handle])
+    np.testing.assert_array_equal(problem.getOutputDoubleValues(values_handle), [2.0, 3.0])
+
+
+
+def test_handles_batched():
+    """Tests the scalar values accessed through the ValuesHandle of each handle"""
+
+    problem = IndexedProblem()
+    handles = HandleRegistry(problem)
+    p_handle, q_handle = handles.resolve_all(["p", "q"])
+    assert not problem.resolved
+    value = handles.getOutputDoubleValue(q_handle)
+    assert value == 2.0 and type(value) is float  # pylint: disable=unidiomatic-typecheck
+    handles.setInputDoubleValue(q_handle, 3.0)
+    assert handles.getOutputDoubleValue(q_handle) == 3.0
+    assert problem.array.tolist() == [1.0, 3.0] and problem.values["q"] == 2.0
+    handles.setInputIntValue(p_handle, 4)
+    assert handles.getOutputIntValue(p_handle) == 4
+    assert problem.resolved == [("q", ), ("p", )]  # once per handle
+    handles.refresh()
+    assert handles.getOutputDoubleValue(q_handle) == 3.0
+    assert problem.resolved[-1] == ("q", )
+
+
+def test_handle_methods(minimal_problem):
+    """Tests that all the methods by handle call the problem with the name"""
+
+    handles = HandleRegistry(minimal_problem)
+    handles.resolve("any")
+    for name in HANDLE_METHODS:
+        args = (None, ) if name.startswith(("set", "update")) else ()
+        with pytest.raises(icoco.NotImplementedMethod, match=name):
+            getattr(handles, name)(0, *args)
+
+
+def test_handles_no_validation(minimal_problem):
+    """Tests problems not declaring their names"""
+
+    assert HandleRegistry(minimal_problem).resolve("any") == 0
+    handles = HandleRegistry(NamedProblem(), validate=False)
+    assert handles.resolve("unknown") == 0
+
+
+def test_native_handles():
+    """Tests a registry with native handles"""
+
+    handles = ArrayHandles(NamedProblem())
+    handles.array[handles.resolve("q")] = 5.0
+    assert handles.getOutputDoubleValue(handles.resolve("q")) == 5.0
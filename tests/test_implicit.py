@@ -0,0 +1,204 @@
+"""test icoco.implicit module"""
+
+from typing import Tuple
+
+import numpy as np
+import pytest
+
+from icoco.field import Field
+from icoco.implicit import (AitkenRelaxation, ConstantRelaxation, Exchange, FieldExchange,
+                            FixedPointCoupling, ValueExchange)
+
+from conftest import MinimalProblem  # pylint: disable=wrong-import-order
+
+
+class ArrayField:
+    """Field with the subset of the medcoupling API used by FieldExchange"""
+
+    def __init__(self, array: np.ndarray) -> None:
+        self.array = array
+
+    def getArray(self):  # pylint: disable=invalid-name
+        """Returns the array holder (self)"""
+        return self
+
+    def toNumPyArray(self):  # pylint: disable=invalid-name
+        """Returns the array"""
+        return self.array
+
+    def deepCopy(self):  # pylint: disable=invalid-name
+        """Returns a copy"""
+        return ArrayField(self.array.copy())
+
+
+class LinearProblem(MinimalProblem):  # pylint: disable=too-many-instance-attributes
+    """Problem computing output = slope * input + offset, for a value and a field"""
+
+    def __init__(self, slope: float, offset: float, dt_ok: float = 1.0) -> None:
+        super().__init__()
+        self._slope = slope
+        self._offset = offset
+        self._dt_ok = dt_ok
+        self._input = 0.0
+        self._output = 0.0
+        self._saved = {}
+        self.solved = 0
+
+    def initTimeStep(self, dt: float) -> bool:
+        self._dt = dt
+        return dt <= 2.0 * self._dt_ok
+
+    def solveTimeStep(self) -> bool:
+        self.solved += 1
+        self._output = self._slope * self._input + self._offset
+        return self._dt <= self._dt_ok
+
+    def iterateTimeStep(self) -> Tuple[bool, bool]:
+        return (self.solveTimeStep(), self.solved % 2 == 0)
+
+    def abortTimeStep(self) -> None:
+        self._dt = 0.0
+
+    def save(self, label: int, method: str) -> None:
+        self._saved[(label, method)] = self._output
+
+    def restore(self, label: int, method: str) -> None:
+        self._output = self._saved[(label, method)]
+
+    def forget(self, label: int, method: str) -> None:
+        del self._saved[(label, method)]
+
+    def setInputDoubleValue(self, name: str, val: float) -> None:
+        self._input = val
+
+    def getOutputDoubleValue(self, name: str) -> float:
+        return self._output
+
+    def setInputMEDDoubleField(self, name: str, afield) -> None:
+        self._input = float(afield.getArray().toNumPyArray().mean())
+
+    def getOutputMEDDoubleField(self, name: str):
+        return ArrayField(np.full((2, 2), self._output))
+
+
+class FieldProblem(LinearProblem):
+    """Linear problem exchanging icoco.field.Field"""
+
+    def setInputMEDDoubleField(self, name: str, afield) -> None:
+        self._input = float(np.asarray(afield).mean())
+
+    def getOutputMEDDoubleField(self, name: str):
+        return Field(name, np.full(4, self._output), unit="K")
+
+
+def make_problems(slope: float = -0.9):
+    """Returns two problems with u = slope * u + 1.9 as fixed point (u = 1)"""
+    return [LinearProblem(slope=slope, offset=1.0), LinearProblem(slope=1.0, offset=0.9)]
+
+
+def test_exchange_base(minimal_problem):
+    """Tests the abstract exchange"""
+    with pytest.raises(TypeError, match="abstract"):
+        Exchange(minimal_problem, "a", minimal_problem)  # pylint: disable=abstract-class-instantiated
+    exchange = ValueExchange(minimal_problem, "a", minimal_problem)
+    assert exchange.input_name == "a"
+
+
+@pytest.mark.parametrize("gauss_seidel", [False, True])
+def test_fixed_point_aitken(gauss_seidel):
+    """Tests both relaxations (Aitken converges faster with Gauss-Seidel)"""
+
+    iterations = {}
+    for relaxation in (ConstantRelaxation(0.2), AitkenRelaxation(0.2)):
+        first, second = make_problems()
+        exchanges = [ValueExchange(first, "y", second, "u"), ValueExchange(second, "v", first)]
+        driver = FixedPointCoupling([first, second], exchanges, relaxation, tolerance=1.e-10,
+                                    max_iterations=200, gauss_seidel=gauss_seidel)
+        assert driver.relaxation is relaxation
+        assert driver.run(max_steps=3) == 3
+        assert first.getOutputDoubleValue("y") == pytest.approx(0.1)
+        assert second.getOutputDoubleValue("v") == pytest.approx(1.0)
+        assert len(driver.iterations) == 3
+        assert driver.n_aborts == 0
+        assert driver.timings["exchange"] > 0.0
+        assert np.all(driver.residuals <= 1.e-10)
+        assert len(driver.residuals) == (1 if gauss_seidel else 2)
+        iterations[type(relaxation)] = driver.iterations[0]
+    if gauss_seidel:
+        assert iterations[AitkenRelaxation] < iterations[ConstantRelaxation] / 3
+
+
+def test_fixed_point_fields():
+    """Tests field exchanges, save/restore and iterate mode"""
+
+    first, second = make_problems()
+    exchanges = [FieldExchange(first, "y", second, "u"), FieldExchange(second, "v", first)]
+    for use_iterate in (False, True):
+        driver = FixedPointCoupling([first, second], exchanges, ConstantRelaxation(0.5),
+                                    max_iterations=100, use_iterate=use_iterate,
+                                    save_method="memory")
+        assert driver.step()
+        assert second.getOutputDoubleValue("v") == pytest.approx(1.0)
+        assert len(driver.residuals) == 2
+        assert not first._saved  # pylint: disable=protected-access
+
+
+def test_fixed_point_icoco_fields():
+    """Tests exchanges of icoco.field.Field"""
+
+    first, second = FieldProblem(slope=-0.9, offset=1.0), FieldProblem(slope=1.0, offset=0.9)
+    exchanges = [FieldExchange(first, "y", second, "u"), FieldExchange(second, "v", first)]
+    driver = FixedPointCoupling([first, second], exchanges, AitkenRelaxation(0.5),
+                                max_iterations=100, gauss_seidel=True)
+    assert driver.step()
+    assert second.getOutputDoubleValue("v") == pytest.approx(1.0)
+
+
+def test_fixed_point_failures():
+    """Tests failed resolutions and non converged time steps"""
+
+    first, second = make_problems(slope=-2.0)
+    first._dt_ok = 0.25  # pylint: disable=protected-access
+    exchanges = [ValueExchange(first, "y", second, "u"), ValueExchange(second, "v", first)]
+    driver = FixedPointCoupling([first, second], exchanges, ConstantRelaxation(),
+                                max_iterations=5, save_method="memory", max_retries=3)
+    assert not driver.try_time_step(0.2)
+    assert not driver.try_time_step(1.0)
+    assert not driver.try_time_step(0.5)
+    assert driver.n_aborts == 3
+    assert not driver.iterations
+    with pytest.raises(RuntimeError, match="failed 4 times"):
+        driver.step()
+
+    driver = FixedPointCoupling([first, second], exchanges, max_iterations=5,
+                                gauss_seidel=True)
+    assert not driver.try_time_step(0.5)
+    assert driver.try_time_step(0.2)
+    assert second.getOutputDoubleValue("v") == pytest.approx(1.9 / 3.0)
+
+
+def test_fixed_point_no_relaxed_exchange():
+    """Tests Gauss-Seidel with one way exchanges only (and problems convergence)"""
+
+    first, second = make_problems()
+    driver = FixedPointCoupling([first, second], [ValueExchange(first, "y", second, "u")],
+                                gauss_seidel=True, use_iterate=True)
+    assert driver.step()
+    assert driver.iterations == [2]
+    assert second.getOutputDoubleValue("v") == pytest.approx(1.9)
+
+
+def test_aitken_reuse():
+    """Tests the reuse of the relaxation factor between time steps"""
+
+    relaxation = AitkenRelaxation(omega=0.5, omega_max=0.8, reuse=True)
+    x = np.zeros(2)
+    relaxation.update(x, np.ones(2))
+    np.testing.assert_allclose(x, [0.5, 0.5])
+    relaxation.update(x, np.full(2, 0.9))
+    assert relaxation.omega == pytest.approx(0.8)
+    relaxation.reset()
+    assert relaxation.omega == pytest.approx(0.8)
+    relaxation.update(x, np.ones(2))
+    relaxation.update(x, np.ones(2))
+    assert relaxation.omega == pytest.approx(0.8)
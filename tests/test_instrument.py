@@ -0,0 +1,102 @@
+"""test icoco.instrument module"""
+
+import json
+
+import numpy as np
+import pytest
+
+import icoco
+from icoco.coupling import CouplingDriver
+from icoco.instrument import MethodStats, Recorder, instrument, uninstrument
+
+from conftest import MinimalProblem  # pylint: disable=wrong-import-order
+
+
+def test_instrument_instance(tmp_path):
+    """Tests the statistics and the trace of an instrumented instance"""
+
+    recorder = Recorder(capacity=8)
+    problem = instrument(MinimalProblem(), recorder, label="minimal")
+    problem.initialize()
+    for _ in range(5):
+        problem.initTimeStep(dt=0.1)
+        problem.solveTimeStep()
+        problem.validateTimeStep()
+    with pytest.raises(icoco.NotImplementedMethod):
+        problem.isStationary()
+    assert problem.presentTime() == pytest.approx(0.5)
+    assert problem.solveTimeStep.__doc__ == MinimalProblem.solveTimeStep.__doc__
+
+    stats = recorder.stats()
+    assert stats[("minimal", "solveTimeStep")].calls == 5
+    assert stats[("minimal", "isStationary")].calls == 1
+    assert sum(value.calls for value in stats.values()) == 18
+    solve = stats[("minimal", "solveTimeStep")]
+    assert solve.histogram.sum() == 5
+    assert 0.0 < solve.mean <= solve.total
+    assert solve.quantile(0.5) <= solve.quantile(1.0)
+    assert solve.mean <= solve.quantile(1.0)
+
+    events = recorder.trace_events()
+    assert events[0] == {"name": "thread_name", "ph": "M", "pid": events[1]["pid"], "tid": 0,
+                         "args": {"name": "minimal"}}
+    assert [event["name"] for event in events[-3:]] == ["validateTimeStep", "isStationary",
+                                                        "presentTime"]
+    assert len(events) == 1 + 8
+    assert all(first["ts"] <= second["ts"] for first, second in zip(events[1:], events[2:]))
+    recorder.export_chrome_trace(str(tmp_path / "trace.json"))
+    with open(tmp_path / "trace.json", encoding="utf-8") as stream:
+        assert len(json.load(stream)["traceEvents"]) == 9
+
+    assert uninstrument(problem).solveTimeStep()
+    assert recorder.stats()[("minimal", "solveTimeStep")].calls == 5
+    recorder.reset()
+    assert not recorder.stats()
+    assert len(recorder.trace_events()) == 1
+
+
+def test_instrument_class():
+    """Tests an instrumented class, and disabled instrumentation"""
+
+    recorder = Recorder()
+    instrumented = instrument(MinimalProblem, recorder)
+    assert instrumented.__name__ == "MinimalProblem"
+    assert issubclass(instrumented, MinimalProblem)
+    for problem in (instrumented(), instrumented()):
+        problem.initialize()
+        problem.setStationaryMode(stationaryMode=True)
+    assert recorder.stats()[("MinimalProblem", "setStationaryMode")].calls == 2
+    assert instrumented.implemented_methods() == MinimalProblem.implemented_methods()
+
+    assert instrument(MinimalProblem, recorder, enabled=False) is MinimalProblem
+    assert recorder.labels == ["MinimalProblem"]
+
+
+def test_method_stats():
+    """Tests the statistics of methods never called"""
+
+    stats = MethodStats(0, 0.0, np.zeros(64, dtype=np.int64))
+    assert stats.mean == 0.0
+    assert stats.quantile(0.5) == 0.0
+
+
+def test_instrument_threads():
+    """Tests that problems run concurrently are all recorded (one ring per instrumented instance,
+    one ring per thread for an instrumented class)"""
+
+    recorder = Recorder(capacity=7)
+    problems = [instrument(MinimalProblem(), recorder, label=f"p{rank}") for rank in range(8)]
+    instrumented = instrument(MinimalProblem, recorder, label="class")
+    problems += [instrumented() for _ in range(8)]
+    with CouplingDriver(problems, max_workers=4) as driver:
+        assert driver.run(max_steps=300) == 300
+    stats = recorder.stats()
+    for rank in range(8):
+        for method in ("computeTimeStep", "initTimeStep", "solveTimeStep", "validateTimeStep"):
+            assert stats[(f"p{rank}", method)].calls == 300
+    for method in ("computeTimeStep", "initTimeStep", "solveTimeStep", "validateTimeStep"):
+        assert stats[("class", method)].calls == 8 * 300
+    events = recorder.trace_events()[9:]
+    # full rings: 8 instances, and the 4 workers and this thread
+    assert 7 * 8 + 7 < len(events) <= 7 * (8 + 5)
+    assert all(first["ts"] <= second["ts"] for first, second in zip(events, events[1:]))
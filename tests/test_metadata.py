@@ -0,0 +1,78 @@
+"""test icoco.metadata module"""
+# pylint: disable=abstract-class-instantiated
+
+import pytest
+
+import icoco
+from icoco.metadata import CACHED_METHODS, CachedProblem
+
+from conftest import SaveRestoreProblem  # pylint: disable=wrong-import-order
+
+
+class MetadataProblem(SaveRestoreProblem):
+    """Problem counting its metadata queries"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.queries = 0
+
+    def getOutputFieldsNames(self):
+        self.queries += 1
+        return ["temperature"]
+
+    def getFieldType(self, name: str) -> icoco.ValueType:
+        self.queries += 1
+        if name != "temperature":
+            raise icoco.WrongArgument(prob="MetadataProblem", method="getFieldType", arg="name",
+                                      condition=f"unknown field {name}")
+        return icoco.ValueType.Double
+
+    def getFieldUnit(self, name: str) -> str:
+        self.queries += 1
+        return "K"
+
+
+def test_cached_problem():
+    """Tests the cached metadata and their invalidation"""
+
+    problem = CachedProblem(MetadataProblem())
+    wrapped = problem.problem
+    assert problem.initialize()
+    for _ in range(3):
+        assert problem.getFieldType("temperature") == icoco.ValueType.Double
+        assert problem.getFieldType(name="temperature") == icoco.ValueType.Double
+        assert problem.getFieldUnit("temperature") == "K"
+    names = problem.getOutputFieldsNames()
+    names.append("modified")
+    assert problem.getOutputFieldsNames() == ["temperature"]
+    assert wrapped.queries == 3
+    assert (problem.hits, problem.misses) == (8, 3)
+
+    with pytest.raises(icoco.WrongArgument):
+        problem.getFieldType("pressure")
+    with pytest.raises(icoco.WrongArgument):
+        problem.getFieldType("pressure")
+    assert wrapped.queries == 5
+
+    assert problem.supports("save") and not problem.supports("isStationary")
+    assert problem.implemented_methods() == wrapped.implemented_methods()
+    problem.save(2, "memory")
+    problem.restore(2, "memory")
+    problem.getFieldUnit("temperature")
+    assert wrapped.queries == 6
+    with pytest.raises(icoco.WrongArgument):
+        problem.restore(3, "memory")
+    problem.getFieldUnit("temperature")
+    assert wrapped.queries == 7
+    problem.invalidate()
+    problem.getFieldUnit("temperature")
+    assert wrapped.queries == 8
+
+    assert problem.presentTime() == 0.0
+    problem.terminate()
+    problem.getFieldUnit("temperature")
+    assert wrapped.queries == 9
+    with pytest.raises(icoco.NotImplementedMethod):
+        problem.getValueUnit("power")
+    assert CachedProblem.getFieldType.__doc__ == icoco.Problem.getFieldType.__doc__
+    assert all(hasattr(CachedProblem, name) for name in CACHED_METHODS)
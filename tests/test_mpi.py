@@ -0,0 +1,402 @@
+"""test icoco.mpi module
+
+The module is also an MPI test, run by ``test_mpirun`` (``mpirun -n 4 python3 test_mpi.py``).
+"""
+
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+import icoco
+from icoco.coupling import CouplingDriver
+from icoco.mpi import MPIExchanger, RankGroups, StepReducer, _Transfer
+
+from conftest import MinimalProblem  # pylint: disable=wrong-import-order
+
+
+class CoupledProblem(MinimalProblem):
+    """Problem whose outputs depend on the number of validated time steps and on its rank"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.rank = 0
+        self.steps = 0
+        self.inputs = {}
+
+    def setMPIComm(self, mpicomm) -> None:
+        self.rank = 0 if mpicomm is None else mpicomm.Get_rank()
+
+    def validateTimeStep(self) -> None:
+        super().validateTimeStep()
+        self.steps += 1
+
+    def getOutputDoubleValue(self, name: str) -> float:
+        return 1000.0 + self.steps
+
+    def setInputDoubleValue(self, name: str, val: float) -> None:
+        self.inputs[name] = val
+
+    def getOutputMEDDoubleField(self, name: str) -> np.ndarray:
+        return np.arange(3.0) + 10.0 * self.rank + self.steps
+
+    def getInputMEDDoubleFieldTemplate(self, name: str) -> np.ndarray:
+        return np.zeros(3)
+
+    def setInputMEDDoubleField(self, name: str, afield: np.ndarray) -> None:
+        self.inputs[name] = afield.copy()
+
+
+def _run(groups: RankGroups):
+    """Runs 3 time steps of neutronics and thermo, returns the problems of the local groups"""
+    problems = {name: CoupledProblem() for name in groups.local}
+    for problem in problems.values():
+        problem.setMPIComm(groups.comm)
+        problem.initialize()
+    with MPIExchanger(groups, problems) as exchanger:
+        assert exchanger.groups is groups
+        exchanger.add_values("neutronics", ["power", "power"], "thermo", ["power", "power_copy"])
+        exchanger.add_field("thermo", "temperature", "neutronics", "fuel_temperature")
+        exchanger.post()
+        with CouplingDriver(list(problems.values()), exchanges=[exchanger.exchange]) as driver:
+            assert driver.run(max_steps=3) == 3
+    for problem in problems.values():
+        problem.terminate()
+    return problems
+
+
+def _check(name: str, problem: CoupledProblem) -> None:
+    """Checks the inputs received by a problem of _run at its last exchange (after 2 steps)"""
+    if name == "thermo":
+        assert problem.inputs == {"power": 1002.0, "power_copy": 1002.0}
+    else:
+        np.testing.assert_array_equal(problem.inputs["fuel_temperature"],
+                                      np.arange(3.0) + 10.0 * problem.rank + 2.0)
+
+
+def test_local_groups():
+    """Tests the exchanges between local groups (serial run)"""
+
+    groups = RankGroups(["neutronics", "thermo"])
+    assert not groups.parallel
+    assert groups.local == ["neutronics", "thermo"]
+    assert groups.world is groups.comm
+    for name, problem in _run(groups).items():
+        _check(name, problem)
+    with pytest.raises(icoco.WrongArgument, match="'thermo' is not a remote group"):
+        groups.intercomm("thermo")
+    groups.free()
+
+
+def test_exchanger_errors():
+    """Tests the declaration of wrong exchanges"""
+
+    groups = RankGroups(["neutronics", "thermo"])
+    if groups.parallel:  # pragma: no cover
+        pytest.skip("run in an MPI job")
+    with pytest.raises(icoco.WrongArgument, match="local groups"):
+        MPIExchanger(groups, {"neutronics": CoupledProblem()})
+    exchanger = MPIExchanger(groups, {"neutronics": CoupledProblem(), "thermo": CoupledProblem()})
+    with pytest.raises(icoco.WrongArgument, match="'fluid' is not a group"):
+        exchanger.add_values("neutronics", ["power"], "fluid")
+    with pytest.raises(icoco.WrongArgument, match="source and target groups are the same"):
+        exchanger.add_field("thermo", "temperature", "thermo")
+    with pytest.raises(icoco.WrongArgument, match="1 input names for 2 output names"):
+        exchanger.add_values("neutronics", ["power", "flux"], "thermo", ["power"])
+    exchanger.close()
+
+
+def test_abstract_transfer():
+    """Tests the abstract transfer"""
+
+    with pytest.raises(TypeError, match="abstract"):
+        _Transfer("neutronics", "thermo", 0)  # pylint: disable=abstract-class-instantiated
+
+
+def _reduce(comm, rank: int) -> StepReducer:
+    """Reduces contributions depending on the rank, checks the results"""
+    reducer = StepReducer(comm, n_residuals=2)
+    assert reducer.dt == np.inf and not reducer.stop and reducer.success and reducer.stationary
+    reducer.add_time_step(0.1 + rank)
+    reducer.add_time_step(0.2 + rank, stop=rank == 1)
+    reducer.add_success(rank != 2)
+    reducer.add_stationary(True)
+    reducer.add_residual(1, 1.0 + rank)
+    reducer.allreduce()
+    assert reducer.dt == pytest.approx(0.1 if comm else 0.1 + rank)
+    assert reducer.stop == (comm is not None or rank == 1)
+    assert reducer.success == (comm is None and rank != 2)
+    assert reducer.stationary
+    assert reducer.residuals.tolist() == [0.0, 1.0 + (comm.Get_size() - 1 if comm else rank)]
+    with pytest.raises(ValueError):
+        reducer.residuals[0] = 1.0
+
+    reducer.add_stationary(rank != 0)
+    reducer.start()
+    reducer.add_time_step(5.0)  # next reduction
+    reducer.wait()
+    assert reducer.stationary == (comm is None and rank != 0) and reducer.dt == np.inf
+    reducer.allreduce()
+    assert reducer.stationary and reducer.dt == 5.0
+    return reducer
+
+
+def test_step_reducer():
+    """Tests the local reductions"""
+
+    for rank in range(3):
+        _reduce(None, rank)
+
+
+class DelayedComm:
+    """Communicator of 2 ranks whose non-blocking reductions only complete in Wait"""
+
+    class Request:  # pylint: disable=too-few-public-methods
+        """Request completing a reduction"""
+
+        def __init__(self, complete) -> None:
+            self.Wait = complete  # pylint: disable=invalid-name
+
+    def __init__(self) -> None:
+        self.other = None  # contributions of the other rank: neutral ones
+
+    @staticmethod
+    def Get_size() -> int:  # pylint: disable=invalid-name
+        """Returns the number of ranks"""
+        return 2
+
+    def Allreduce(self, send, recv, op) -> None:  # pylint: disable=invalid-name, unused-argument
+        """Reduces (blocking)"""
+        if self.other is None:
+            self.other = np.where(np.arange(send.size) == 0, -np.inf, 0.0)
+        np.maximum(send, self.other, out=recv)
+
+    def Iallreduce(self, send, recv, op) -> Request:  # pylint: disable=invalid-name
+        """Reduces when the request is waited for"""
+        return self.Request(lambda: self.Allreduce(send, recv, op))
+
+
+def test_step_reducer_pending(monkeypatch):
+    """Tests allreduce while a reduction started by start is pending"""
+
+    monkeypatch.setattr(icoco.mpi, "MPI", type("MPI", (), {"MAX": "max"}))
+    reducer = StepReducer(DelayedComm())
+    reducer.add_stationary(False)
+    reducer.start()
+    assert reducer.stationary  # not completed
+    reducer.add_time_step(5.0)
+    reducer.allreduce()
+    assert reducer.dt == 5.0 and reducer.stationary
+    reducer.wait()  # the started reduction does not overwrite the last one
+    assert reducer.dt == 5.0 and reducer.stationary
+    reducer.add_stationary(False)
+    reducer.start()
+    reducer.wait()
+    assert not reducer.stationary and reducer.dt == np.inf
+
+
+class FakeWorld:
+    """In-process MPI world: its ranks are threads exchanging through queues"""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.barrier = threading.Barrier(size, timeout=30.0)
+        self.lock = threading.Lock()
+        self.colors = {}  # rank -> color, of the last Split
+        self.contributions = {}  # rank -> contribution, of the last Allreduce
+        self.queues = {}  # (context, source, destination, tag) -> messages
+
+    def queue(self, key) -> queue.Queue:
+        """Returns the queue of the messages of key"""
+        with self.lock:
+            return self.queues.setdefault(key, queue.Queue())
+
+    def run(self, function) -> list:
+        """Runs function(comm) on all the ranks, returns the results (re-raises the first error)"""
+        results = [None] * self.size
+        errors = [None] * self.size
+
+        def target(rank):
+            try:
+                results[rank] = function(FakeComm(self, list(range(self.size)), rank))
+            except Exception as error:  # pylint: disable=broad-except
+                errors[rank] = error
+                self.barrier.abort()
+
+        threads = [threading.Thread(target=target, args=(rank,)) for rank in range(self.size)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for error in errors:
+            if error is not None and not isinstance(error, threading.BrokenBarrierError):
+                raise error
+        return results
+
+
+class FakeRequest:
+    """Request of FakeComm, completed by Wait"""
+
+    def __init__(self, complete=None) -> None:
+        self.complete = complete
+        self.cancelled = False
+
+    def Cancel(self) -> None:  # pylint: disable=invalid-name
+        """Cancels the request"""
+        self.cancelled = True
+
+    def Wait(self) -> None:  # pylint: disable=invalid-name
+        """Completes the request, if not cancelled"""
+        if self.complete is not None and not self.cancelled:
+            self.complete()
+        self.complete = None
+
+    @staticmethod
+    def Waitall(requests) -> None:  # pylint: disable=invalid-name
+        """Completes the requests"""
+        for request in requests:
+            request.Wait()
+
+
+class FakeComm:
+    """Communicator (an intercommunicator if remote is given) of a FakeWorld"""
+
+    def __init__(self, world: FakeWorld, ranks: list, rank: int, remote: list = None) -> None:
+        self.world = world
+        self.ranks = ranks  # ranks in the world of the (local) group
+        self.rank = rank  # in the world
+        self.remote = remote  # ranks in the world of the remote group
+        self.freed = False
+
+    def Get_size(self) -> int:  # pylint: disable=invalid-name
+        """Returns the size of the (local) group"""
+        return len(self.ranks)
+
+    def Get_rank(self) -> int:  # pylint: disable=invalid-name
+        """Returns the rank in the (local) group"""
+        return self.ranks.index(self.rank)
+
+    def Get_remote_size(self) -> int:  # pylint: disable=invalid-name
+        """Returns the size of the remote group"""
+        return len(self.remote)
+
+    def Split(self, color: int, key: int) -> "FakeComm":  # pylint: disable=invalid-name
+        """Splits the communicator (collective)"""
+        self.world.colors[self.rank] = (color, key)
+        self.world.barrier.wait()
+        ranks = sorted((rank for rank in self.ranks if self.world.colors[rank][0] == color),
+                       key=lambda rank: self.world.colors[rank][1])
+        self.world.barrier.wait()
+        return FakeComm(self.world, ranks, self.rank)
+
+    def Create_intercomm(self, local_leader: int, peer_comm: "FakeComm",  # pylint: disable=invalid-name
+                         remote_leader: int, tag: int) -> "FakeComm":
+        """Creates the intercommunicator with the group of remote_leader in peer_comm"""
+        assert local_leader == 0 and peer_comm.remote is None and tag >= 0
+        remote = [rank for rank in peer_comm.ranks
+                  if self.world.colors[rank][0] == self.world.colors[remote_leader][0]]
+        return FakeComm(self.world, self.ranks, self.rank, remote)
+
+    def _queue(self, source: int, destination: int, tag: int) -> queue.Queue:
+        return self.world.queue((tuple(sorted(self.ranks + self.remote)), source, destination, tag))
+
+    def Isend(self, buf, dest: int, tag: int) -> FakeRequest:  # pylint: disable=invalid-name
+        """Sends a copy of buf to the rank dest of the remote group"""
+        self._queue(self.rank, self.remote[dest], tag).put(np.array(buf))
+        return FakeRequest()
+
+    def Irecv(self, buf, source: int, tag: int) -> FakeRequest:  # pylint: disable=invalid-name
+        """Receives buf from the rank source of the remote group when waited for"""
+        messages = self._queue(self.remote[source], self.rank, tag)
+        return FakeRequest(lambda: np.copyto(buf, messages.get(timeout=30.0)))
+
+    def Allreduce(self, send, recv, op) -> None:  # pylint: disable=invalid-name
+        """Reduces the maximum over the world (collective)"""
+        assert op == "max" and self.ranks == list(range(self.world.size))
+        self.world.contributions[self.rank] = np.array(send)
+        self.world.barrier.wait()
+        np.copyto(recv, np.max(list(self.world.contributions.values()), axis=0))
+        self.world.barrier.wait()
+
+    def Iallreduce(self, send, recv, op) -> FakeRequest:  # pylint: disable=invalid-name
+        """Reduces (collective, completed at once)"""
+        self.Allreduce(send, recv, op)
+        return FakeRequest()
+
+    def Free(self) -> None:  # pylint: disable=invalid-name
+        """Frees the communicator"""
+        assert not self.freed
+        self.freed = True
+
+
+def _parallel(comm) -> list:
+    """MPI test on 4 processes: 2 for neutronics, 2 for thermo. Returns the checked problems"""
+    groups = RankGroups(["neutronics", "thermo"], sizes=[2, 2], comm=comm)
+    assert groups.parallel
+    [name] = groups.local
+    assert groups.comm.Get_size() == 2
+    assert groups.intercomm("thermo" if name == "neutronics" else "neutronics").Get_remote_size() \
+        == 2
+    problems = _run(groups)
+    for name, problem in problems.items():
+        _check(name, problem)
+    _reduce(groups.world, groups.world.Get_rank())
+    groups.free()
+    return [(name, problem.rank) for name, problem in problems.items()]
+
+
+def test_fake_mpi(monkeypatch):
+    """Tests the parallel exchanges on an in-process MPI world of 4 ranks"""
+
+    monkeypatch.setattr(icoco.mpi, "MPI", type("MPI", (), {"MAX": "max", "Request": FakeRequest}))
+    results = FakeWorld(4).run(_parallel)
+    assert results == [[("neutronics", 0)], [("neutronics", 1)], [("thermo", 0)], [("thermo", 1)]]
+
+    def uneven(comm):
+        groups = RankGroups(["neutronics", "thermo"], sizes=[1, 3], comm=comm)
+        problems = {name: CoupledProblem() for name in groups.local}
+        with MPIExchanger(groups, problems) as exchanger:
+            exchanger.add_values("neutronics", ["power"], "thermo")
+            with pytest.raises(icoco.WrongArgument, match="do not have the same size"):
+                exchanger.add_field("neutronics", "temperature", "thermo")
+            for problem in problems.values():
+                problem.initialize()
+                problem.steps = 4
+            exchanger.exchange()
+        groups.free()
+        return {name: problem.inputs for name, problem in problems.items()}
+
+    # the size of the groups is checked on the ranks of both groups
+    results = FakeWorld(4).run(uneven)
+    assert results == [{"neutronics": {}}] + [{"thermo": {"power": 1004.0}}] * 3
+
+    # processes split as evenly as possible
+    results = FakeWorld(3).run(lambda comm: RankGroups(["neutronics", "thermo"], comm=comm).local)
+    assert results == [["neutronics"], ["neutronics"], ["thermo"]]
+    with pytest.raises(icoco.WrongArgument, match=r"\[1, 2\] does not split 4 processes"):
+        FakeWorld(4).run(lambda comm: RankGroups(["neutronics", "thermo"], [1, 2], comm))
+
+
+def test_mpirun():
+    """Runs this module on 4 MPI processes (2 per group)"""
+
+    pytest.importorskip("mpi4py")
+    mpirun = shutil.which("mpirun")
+    if mpirun is None:
+        pytest.skip("mpirun not found")
+    env = dict(os.environ, OMPI_ALLOW_RUN_AS_ROOT="1", OMPI_ALLOW_RUN_AS_ROOT_CONFIRM="1",
+               OMPI_MCA_rmaps_base_oversubscribe="1")
+    result = subprocess.run([mpirun, "-n", "4", sys.executable, __file__], env=env, check=False,
+                            capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert result.stdout.count("OK") == 4
+
+
+if __name__ == "__main__":  # pragma: no cover
+    for NAME, RANK in _parallel(None):
+        print("OK", NAME, RANK, flush=True)
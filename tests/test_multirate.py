@@ -0,0 +1,191 @@
+"""test icoco.multirate module"""
+
+from typing import Callable, Tuple
+
+import numpy as np
+import pytest
+
+import icoco
+from icoco.adaptive import TimeStepController
+from icoco.implicit import FieldExchange, ValueExchange
+from icoco.multirate import MultiRateCoupling, TimeInterpolation
+
+from conftest import MinimalProblem  # pylint: disable=wrong-import-order
+
+
+class RateProblem(MinimalProblem):
+    """Problem with its own time step, whose outputs are functions of time, recording its inputs"""
+
+    def __init__(self, dt: float, output: Callable[[float], float] = float,
+                 time_stop: float = np.inf) -> None:
+        super().__init__()
+        self._dt_pref = dt
+        self._output = output
+        self._time_stop = time_stop
+        self.inputs = []
+        self.solved = 0
+
+    def computeTimeStep(self) -> Tuple[float, bool]:
+        return (self._dt_pref, self._time >= self._time_stop - 1.e-12)
+
+    def solveTimeStep(self) -> bool:
+        self.solved += 1
+        return self._dt <= self._dt_pref
+
+    def abortTimeStep(self) -> None:
+        self._dt = 0.0
+
+    def getOutputDoubleValue(self, name: str) -> float:
+        return self._output(self._time)
+
+    def setInputDoubleValue(self, name: str, val: float) -> None:
+        self.inputs.append((self._time + self._dt, val))
+
+    def getOutputMEDDoubleField(self, name: str) -> np.ndarray:
+        return np.full(3, self._output(self._time))
+
+    def setInputMEDDoubleField(self, name: str, afield: np.ndarray) -> None:
+        self.inputs.append((self._time + self._dt, afield[0]))
+
+
+def test_multirate_linear():
+    """Tests the subcycling and the linear interpolation of the fast inputs"""
+
+    slow = RateProblem(dt=0.1, output=lambda time: 2.0 * time + 1.0)
+    fast = RateProblem(dt=0.03)
+    with MultiRateCoupling([slow], [fast], to_fast=[ValueExchange(slow, "u", fast)],
+                           to_slow=[ValueExchange(fast, "y", slow)]) as coupling:
+        assert coupling.initialize()
+        assert coupling.run(time_max=0.5) == 5
+        assert coupling.n_windows == 5
+        assert slow.presentTime() == pytest.approx(0.5)
+        assert fast.presentTime() == pytest.approx(0.5)
+        assert coupling.slow_driver.n_steps == 5
+        assert coupling.fast_driver.n_steps == 20  # 0.03, 0.03, 0.03, 0.01 per window
+        assert coupling.interpolations[0].order == 1
+        times, values = np.array(fast.inputs).T
+        np.testing.assert_allclose(values, 2.0 * times + 1.0)
+        np.testing.assert_allclose(np.array(slow.inputs)[:, 1], np.arange(0.0, 0.5, 0.1),
+                                   atol=1.e-12)
+        coupling.terminate()
+
+
+def test_multirate_cubic():
+    """Tests the cubic interpolation of fields and the window bound"""
+
+    slow = RateProblem(dt=1.0, output=lambda time: time ** 3 - time)
+    fast = RateProblem(dt=0.07)
+    exchange = FieldExchange(slow, "u", fast)
+    coupling = MultiRateCoupling([slow], [fast], to_fast=[exchange], order=3, window=0.2)
+    assert coupling.interpolations[0].exchange is exchange
+    coupling.initialize()
+    assert coupling.run(max_windows=6) == 6
+    assert fast.presentTime() == pytest.approx(1.2)
+    times, values = np.array(fast.inputs).T
+    exact = times ** 3 - times
+    assert np.abs(values - exact).max() > 1.e-3  # lower degree in the first windows
+    late = times > 0.6
+    np.testing.assert_allclose(values[late], exact[late])
+    coupling.close()
+
+
+def test_multirate_stop():
+    """Tests the stop requests of the slow and the fast problems"""
+
+    slow = RateProblem(dt=0.1, time_stop=0.2)
+    fast = RateProblem(dt=0.03)
+    coupling = MultiRateCoupling([slow], [fast])
+    coupling.initialize()
+    assert coupling.run() == 2
+    assert not coupling.step()
+    assert fast.presentTime() == pytest.approx(0.2)
+
+    slow = RateProblem(dt=0.1)
+    fast = RateProblem(dt=0.03, time_stop=0.15)
+    coupling = MultiRateCoupling([slow], [fast])
+    coupling.initialize()
+    assert coupling.run() == 1
+    assert coupling.n_windows == 2
+    assert slow.presentTime() == pytest.approx(0.2)
+    assert fast.presentTime() == pytest.approx(0.16)
+
+
+def test_multirate_abort():
+    """Tests the reduction of the fast time step on failure"""
+
+    slow = RateProblem(dt=0.1, output=lambda time: time)
+    fast = RateProblem(dt=0.08)
+    fast.computeTimeStep = lambda: (0.2, False)  # fails above 0.08
+    coupling = MultiRateCoupling([slow], [fast], to_fast=[ValueExchange(slow, "u", fast)],
+                                 dt_factor=0.25)
+    coupling.initialize()
+    assert coupling.step()
+    assert coupling.fast_driver.n_aborts == 1
+    assert fast.solved == 3  # 0.1 (failed), 0.025, 0.075
+    assert fast.inputs[-2:] == [pytest.approx((0.025, 0.025)), pytest.approx((0.1, 0.1))]
+
+
+def test_multirate_controllers():
+    """Tests the separate time-step controllers of the slow and fast problems"""
+
+    slow = RateProblem(dt=0.1, output=lambda time: time)
+    fast = RateProblem(dt=0.08)
+    fast.computeTimeStep = lambda: (0.2, False)  # fails above 0.08
+    slow_controller = TimeStepController()
+    fast_controller = TimeStepController()
+    coupling = MultiRateCoupling([slow], [fast], to_fast=[ValueExchange(slow, "u", fast)],
+                                 slow_controller=slow_controller, fast_controller=fast_controller)
+    assert coupling.slow_driver.controller is slow_controller
+    assert coupling.fast_driver.controller is fast_controller
+    coupling.initialize()
+    assert coupling.run(time_max=0.5) == 5
+    assert (slow_controller.n_accepted, slow_controller.n_rejected) == (5, 0)
+    assert fast_controller.n_rejected == coupling.fast_driver.n_aborts > 0
+    assert fast_controller.n_accepted == coupling.fast_driver.n_steps
+
+    slow = RateProblem(dt=0.1)
+    fast = RateProblem(dt=0.045)
+    fast_controller = TimeStepController(factors=(0.2, 1.2))
+    coupling = MultiRateCoupling([slow], [fast], fast_controller=fast_controller)
+    coupling.initialize()
+    assert coupling.run(time_max=0.5) == 5
+    assert coupling.fast_driver.n_steps == 15  # 0.045, 0.045, 0.01 (clipped) per window
+
+    controller = TimeStepController()
+    with pytest.raises(icoco.WrongArgument, match="use slow_controller and fast_controller"):
+        MultiRateCoupling([slow], [fast], controller=controller)
+    with pytest.raises(icoco.WrongArgument, match="must differ"):
+        MultiRateCoupling([slow], [fast], slow_controller=controller, fast_controller=controller)
+
+
+def test_time_interpolation():
+    """Tests the history of TimeInterpolation"""
+
+    source = RateProblem(dt=0.1, output=lambda time: 3.0 * time)
+    with pytest.raises(icoco.WrongArgument, match="order must be 1"):
+        TimeInterpolation(ValueExchange(source, "u", source), order=2)
+    interpolation = TimeInterpolation(ValueExchange(source, "u", source))
+    assert interpolation.last_time == -np.inf
+    with pytest.raises(icoco.WrongContext, match="called before push"):
+        interpolation.interpolate(0.0)
+    interpolation.push(0.0)
+    assert interpolation.interpolate(1.0).tolist() == [0.0]
+    source.initTimeStep(0.5)
+    source.validateTimeStep()
+    interpolation.push(0.0)  # replaces the values at 0.0
+    interpolation.push(1.0)
+    assert interpolation.last_time == 1.0
+    assert interpolation.interpolate(2.0).tolist() == [1.5]
+
+    field = FieldExchange(source, "f", source)
+    interpolation = TimeInterpolation(field, order=3)
+    for time in range(5):
+        source.initTimeStep(1.0)
+        source.validateTimeStep()
+        interpolation.push(float(time))
+    np.testing.assert_allclose(interpolation.interpolate(4.5), [3.0 * 6.0] * 3)
+    field.read = lambda: np.ones(2)
+    interpolation.push(5.0)  # new size: history reset
+    np.testing.assert_array_equal(interpolation.interpolate(0.0), [1.0, 1.0])
+    interpolation.clear()
+    assert interpolation.last_time == -np.inf
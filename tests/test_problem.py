@@ -4,10 +4,13 @@
 # You can import pytest and use its features.
 # import pytest
 
+import numpy as np
 import pytest
 
 import icoco
 
+from conftest import MinimalProblem, SaveRestoreProblem  # pylint: disable=wrong-import-order
+
 
 def test_version():
     """Tests version infos"""
@@ -28,6 +31,26 @@ def test_version():
     assert icoco.ValueType.String.name == "String"
 
 
+def test_version_cache():
+    """Tests that the version file is read once"""
+
+    assert icoco.__version__ == icoco.get_version()
+    # pylint: disable-next=too-many-function-args
+    assert icoco.version.get_version.cache_info().misses == 1
+    assert icoco.version.get_version_int() == tuple(int(n) for n in icoco.__version__.split("."))
+
+
+def test_lazy_submodules():
+    """Tests the submodules imported on first access"""
+
+    module_getattr = getattr(icoco, "__getattr__")
+    assert module_getattr("metadata").CachedProblem
+    assert icoco.coupling.CouplingDriver
+    assert "state_store" in dir(icoco)
+    with pytest.raises(AttributeError, match="no attribute 'unknown'"):
+        icoco.unknown  # pylint: disable=no-member, pointless-statement
+
+
 def test_static_methods():
     """Tests static methods of the package"""
 
@@ -138,3 +161,102 @@ def test_minimal_api(minimal_problem):
     _test_raises_not_implemented(minimal)
 
     minimal.terminate()
+
+
+class ValuesProblem(MinimalProblem):
+    """Problem storing its scalar values in a dictionary"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.values = {"p": 1.5, "q": -2.0, "n": 3}
+
+    def setInputDoubleValue(self, name: str, val: float) -> None:
+        assert isinstance(val, float)
+        self.values[name] = val
+
+    def getOutputDoubleValue(self, name: str) -> float:
+        return self.values[name]
+
+    def setInputIntValue(self, name: str, val: int) -> None:
+        assert isinstance(val, int)
+        self.values[name] = val
+
+    def getOutputIntValue(self, name: str) -> int:
+        return self.values[name]
+
+
+class VectorizedProblem(MinimalProblem):
+    """Problem storing its scalar values in an array, with vectorized batched methods"""
+
+    NAMES = ["a", "b", "c"]
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.values = np.zeros(len(self.NAMES))
+
+    def getValuesHandle(self, names):
+        return icoco.ValuesHandle(names, np.array([self.NAMES.index(name) for name in names]))
+
+    def getOutputDoubleValues(self, names):
+        return self.values[names.indices]
+
+    def setInputDoubleValues(self, names, vals):
+        self.values[names.indices] = vals
+
+
+def test_batched_values():
+    """Tests the default and vectorized batched scalar values I/O"""
+
+    problem = ValuesProblem()
+    values = problem.getOutputDoubleValues(["q", "p"])
+    assert values.dtype == np.float64
+    np.testing.assert_array_equal(values, [-2.0, 1.5])
+    handle = problem.getValuesHandle(("p", "q"))
+    assert len(handle) == 2 and handle.indices is None
+    problem.setInputDoubleValues(handle, np.array([4.0, 5.0]))
+    np.testing.assert_array_equal(problem.getOutputDoubleValues(handle), [4.0, 5.0])
+    problem.setInputIntValues(["n"], [7])
+    assert problem.getOutputIntValues(icoco.ValuesHandle(["n"])).tolist() == [7]
+    np.testing.assert_array_equal(problem.getOutputIntValues(["n", "n"]), [7, 7])
+    with pytest.raises(icoco.WrongArgument, match="3 values for 2 names"):
+        problem.setInputDoubleValues(["p", "q"], np.zeros(3))
+    with pytest.raises(icoco.NotImplementedMethod):
+        MinimalProblem().getOutputDoubleValues(["p"])
+
+    problem = VectorizedProblem()
+    handle = problem.getValuesHandle(["c", "a"])
+    problem.setInputDoubleValues(handle, [1.0, 2.0])
+    np.testing.assert_array_equal(problem.values, [2.0, 0.0, 1.0])
+    np.testing.assert_array_equal(problem.getOutputDoubleValues(handle), [1.0, 2.0])
+
+
+class SwigLikeProblem(MinimalProblem):
+    """Problem declaring its implemented methods, as a SWIG proxy would"""
+
+    def isStationary(self) -> bool:
+        raise icoco.NotImplementedMethod(prob="SwigLikeProblem", method="isStationary")
+
+    @classmethod
+    def detect_implemented_methods(cls):
+        return super().detect_implemented_methods() - {"isStationary"}
+
+
+def test_implemented_methods():
+    """Tests the capability queries"""
+
+    implemented = MinimalProblem.implemented_methods()
+    assert implemented == {"GetICoCoMajorVersion", "initialize", "terminate", "presentTime",
+                           "computeTimeStep", "initTimeStep", "solveTimeStep", "validateTimeStep",
+                           "setStationaryMode", "getStationaryMode"}
+    assert MinimalProblem.implemented_methods() is implemented
+    assert icoco.Problem.implemented_methods() == {"GetICoCoMajorVersion"}
+    assert SaveRestoreProblem.implemented_methods() == implemented | {"save", "restore", "forget"}
+    assert ValuesProblem.implemented_methods() >= {"getOutputDoubleValue", "setInputIntValue"}
+
+    problem = MinimalProblem()
+    assert problem.supports("solveTimeStep")
+    assert not problem.supports("save")
+    assert not SwigLikeProblem().supports("isStationary")
+    assert SwigLikeProblem().supports("presentTime")
+    with pytest.raises(icoco.WrongArgument, match="'solve' is not an ICoCo method"):
+        problem.supports("solve")
@@ -0,0 +1,213 @@
+"""test icoco.process module"""
+# pylint: disable=abstract-class-instantiated
+
+import multiprocessing
+import os
+import pickle
+import threading
+
+import numpy as np
+import pytest
+
+import icoco
+from icoco.field import Field, Mesh
+from icoco.process import ProcessProblem, _serve, _SharedArrays
+
+from conftest import MinimalProblem  # pylint: disable=wrong-import-order
+
+
+class ArrayProblem(MinimalProblem):
+    """Problem exchanging numpy arrays as fields"""
+
+    def __init__(self, factor: float = 1.0) -> None:
+        super().__init__()
+        self._factor = factor
+        self._fields = {}
+
+    def setInputMEDDoubleField(self, name, afield) -> None:
+        self._fields[name] = afield.copy() if isinstance(afield, Field) else np.array(afield)
+
+    def getInputMEDDoubleFieldTemplate(self, name):
+        return self._fields[name]
+
+    def getOutputMEDDoubleField(self, name):
+        return self._fields[name] * self._factor
+
+    def getOutputMEDStringField(self, name):
+        return lambda: name
+
+    def solveTimeStep(self) -> bool:
+        if self._dt < 0.0:
+            os._exit(1)  # pylint: disable=protected-access
+        return True
+
+
+class BrokenProblem(MinimalProblem):
+    """Problem failing at construction"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        raise ValueError("broken")
+
+
+def test_process_problem(minimal_problem):
+    """Tests the time loop through a worker process"""
+
+    with ProcessProblem(type(minimal_problem)) as problem:
+        assert problem.process.is_alive()
+        assert problem.process.pid != os.getpid()
+        assert problem.initialize()
+        assert problem.presentTime() == 0.0
+        dt, stop = problem.computeTimeStep()
+        assert not stop
+        assert problem.initTimeStep(dt=dt)
+        assert problem.solveTimeStep()
+        problem.validateTimeStep()
+        assert problem.presentTime() == pytest.approx(0.1)
+        with pytest.raises(icoco.NotImplementedMethod) as error:
+            problem.isStationary()
+        assert "MinimalProblem" in str(error.value)
+        assert problem.supports("solveTimeStep") and not problem.supports("isStationary")
+        assert problem.implemented_methods() == MinimalProblem.implemented_methods()
+        with pytest.raises(icoco.WrongArgument, match="'solve' is not an ICoCo method"):
+            problem.supports("solve")
+        problem.terminate()
+    assert not problem.process.is_alive()
+    assert ProcessProblem.solveTimeStep.__doc__ == icoco.Problem.solveTimeStep.__doc__
+
+
+def test_process_problem_arrays():
+    """Tests arrays exchanged through shared memory"""
+
+    with ProcessProblem(ArrayProblem, kwargs={"factor": 2.0}) as problem:
+        for size in (10, 1000, 10):
+            array = np.arange(size, dtype=np.float64)
+            problem.setInputMEDDoubleField("f", array)
+            result = problem.getOutputMEDDoubleField(name="f")
+            assert result.dtype == np.float64
+            np.testing.assert_array_equal(result, 2.0 * array)
+        problem.setInputMEDDoubleField("i", afield=np.arange(5, dtype=np.int32).reshape(5, 1))
+        result = problem.getOutputMEDDoubleField("i")
+        assert result.shape == (5, 1)
+        np.testing.assert_array_equal(result[:, 0], 2.0 * np.arange(5))
+        problem.setInputMEDDoubleField("o", np.array([1, 2.5], dtype=object))
+        assert list(problem.getOutputMEDDoubleField("o")) == [2.0, 5.0]
+        with pytest.raises(RuntimeError, match="can not be sent"):
+            problem.getOutputMEDStringField("s")
+        assert problem.presentTime() == 0.0
+
+
+def test_process_problem_fields():
+    """Tests fields whose array is exchanged through shared memory"""
+
+    with ProcessProblem(ArrayProblem) as problem:
+        problem.setInputMEDDoubleField("f", Field("f", np.arange(4.0), unit="K", time=1.5))
+        field = problem.getInputMEDDoubleFieldTemplate("f")
+        assert isinstance(field, Field)
+        assert (field.unit, field.time, field.array.shape) == ("K", 1.5, (4, 1))
+        np.testing.assert_array_equal(field, np.arange(4.0).reshape(4, 1))
+        problem.setInputMEDDoubleField("o", Field("o", np.array([1, "a"], dtype=object)))
+        assert list(problem.getInputMEDDoubleFieldTemplate("o").array[:, 0]) == [1, "a"]
+
+        mesh = Mesh("square", 2, [[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 1.0]],
+                    [3, 0, 1, 2, 3, 0, 2, 3], [0, 4, 8])
+        problem.setInputMEDDoubleField("m", Field("m", np.arange(2.0), mesh))
+        field = problem.getInputMEDDoubleFieldTemplate("m")
+        assert (field.mesh.name, field.mesh.dimension) == ("square", 2)
+        for name in ("coordinates", "connectivity", "connectivity_index"):
+            np.testing.assert_array_equal(getattr(field.mesh, name), getattr(mesh, name))
+        assert problem.getInputMEDDoubleFieldTemplate("m").mesh is field.mesh  # kept
+        mesh.coordinates[0, 0] = -1.0  # modified in place: sent again
+        problem.setInputMEDDoubleField("m", Field("m", np.arange(2.0), mesh))
+        assert problem.getInputMEDDoubleFieldTemplate("m").mesh.coordinates[0, 0] == -1.0
+
+
+def test_process_problem_errors():
+    """Tests errors of the worker process"""
+
+    with ProcessProblem(BrokenProblem) as problem:
+        with pytest.raises(ValueError, match="broken"):
+            problem.initialize()
+        with pytest.raises(ValueError, match="broken"):
+            problem.presentTime()
+
+    problem = ProcessProblem(ArrayProblem, args=(1.0, ))
+    problem.initialize()
+    problem.initTimeStep(-1.0)
+    with pytest.raises(RuntimeError, match="died"):
+        problem.solveTimeStep()
+    problem.close()
+
+    problem = ProcessProblem(ArrayProblem)
+    problem.close(timeout=0.0)
+    assert not problem.process.is_alive()
+
+
+def test_serve():
+    """Tests the worker loop in a thread"""
+
+    conn, child_conn = multiprocessing.Pipe()
+    worker = threading.Thread(target=_serve, args=(child_conn, ArrayProblem, (), {}))
+    worker.start()
+    transport = _SharedArrays()
+    conn.send(("setInputMEDDoubleField", ("f", transport.encode(0, np.ones(3))), {}))
+    assert conn.recv() == (True, None)
+    conn.send(("getOutputMEDDoubleField", ("f", ), {}))
+    success, result = conn.recv()
+    assert success
+    np.testing.assert_array_equal(transport.decode(result, copy=True), np.ones(3))
+    conn.send(("isStationary", (), {}))
+    success, result = conn.recv()
+    assert not success
+    assert isinstance(result, icoco.NotImplementedMethod)
+    conn.send(("getOutputMEDStringField", ("s", ), {}))
+    success, result = conn.recv()
+    assert not success
+    assert isinstance(result, RuntimeError)
+    conn.send(None)
+    worker.join()
+    transport.close()
+
+    conn, child_conn = multiprocessing.Pipe()
+    worker = threading.Thread(target=_serve, args=(child_conn, BrokenProblem, (), {}))
+    worker.start()
+    conn.send(("initialize", (), {}))
+    success, result = conn.recv()
+    assert not success
+    assert isinstance(result, ValueError)
+    conn.send(None)
+    worker.join()
+
+
+def test_shared_meshes():
+    """Tests that the arrays of meshes go through shared memory, and the meshes kept"""
+
+    writer = _SharedArrays()
+    reader = _SharedArrays()
+    mesh = Mesh("line", 1, np.arange(10001.0), np.tile([1, 0, 1], 10000),
+                np.arange(0, 30001, 3))
+    encoded = writer.encode("key", Field("f", np.zeros(10000), mesh))
+    assert len(pickle.dumps(encoded)) < 1000
+    first = reader.decode(encoded, copy=False).mesh
+    second = reader.decode(writer.encode("key", Field("f", np.ones(10000), mesh)), copy=True).mesh
+    assert second is first and first.coordinates.base is None  # copied out of shared memory
+    other = Mesh("line", 1, np.arange(3.0), [1, 0, 1, 1, 1, 2], [0, 3, 6])
+    assert reader.decode(writer.encode("key", Field("f", np.ones(2), other)), copy=False).mesh \
+        is not first
+    reader.close()
+    writer.close()
+
+
+def test_shared_arrays_stale():
+    """Tests that blocks still referenced by arrays are kept open"""
+
+    writer = _SharedArrays()
+    reader = _SharedArrays()
+    view = reader.decode(writer.encode("key", np.ones(4)), copy=False)
+    assert reader.decode(writer.encode("key", np.zeros(100000)), copy=False).sum() == 0.0
+    np.testing.assert_array_equal(view, np.ones(4))
+    assert len(reader._stale) == 1  # pylint: disable=protected-access
+    del view
+    reader.close()
+    writer.close()
+    assert not reader._stale  # pylint: disable=protected-access
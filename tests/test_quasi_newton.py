@@ -0,0 +1,128 @@
+"""test icoco.quasi_newton module"""
+
+import numpy as np
+import pytest
+
+from icoco.implicit import (AitkenRelaxation, FieldExchange, FixedPointCoupling,
+                            ValueExchange)
+from icoco.quasi_newton import AndersonRelaxation, IQNILSRelaxation
+
+from conftest import MinimalProblem  # pylint: disable=wrong-import-order
+
+
+class MatrixProblem(MinimalProblem):
+    """Problem computing the field y = K u + f + s from field u and value s"""
+
+    def __init__(self, matrix: np.ndarray, offset: np.ndarray) -> None:
+        super().__init__()
+        self._matrix = matrix
+        self._offset = offset
+        self._field = np.zeros(len(offset))
+        self._value = 0.0
+        self._output = np.zeros(len(offset))
+
+    def solveTimeStep(self) -> bool:
+        self._output = self._matrix @ self._field + self._offset + self._value
+        return True
+
+    def abortTimeStep(self) -> None:
+        pass
+
+    def setInputDoubleValue(self, name: str, val: float) -> None:
+        self._value = val
+
+    def setInputMEDDoubleField(self, name: str, afield) -> None:
+        self._field = np.array(afield)
+
+    def getOutputMEDDoubleField(self, name: str):
+        return self._output
+
+
+class MirrorProblem(MatrixProblem):
+    """Problem returning its input field and -0.5 * its mean as value"""
+
+    def __init__(self, size: int) -> None:
+        super().__init__(np.eye(size), np.zeros(size))
+
+    def getOutputDoubleValue(self, name: str) -> float:
+        return -0.5 * float(self._output.mean())
+
+
+def stiff_matrix(size: int, seed: int = 0) -> np.ndarray:
+    """Returns a symmetric matrix with eigenvalues in [-4, 0.5]"""
+    rng = np.random.default_rng(seed)
+    basis, _ = np.linalg.qr(rng.standard_normal((size, size)))
+    return basis @ np.diag(np.linspace(-4.0, 0.5, size)) @ basis.T
+
+
+def test_linear_convergence():
+    """Tests that IQN-ILS solves a linear fixed point in at most size + 1 iterations"""
+
+    size = 8
+    matrix = stiff_matrix(size)
+    offset = np.ones(size)
+    solution = np.linalg.solve(np.eye(size) - matrix, offset)
+    for relaxation in (IQNILSRelaxation(omega=0.1), AndersonRelaxation(omega=0.1, mixing=0.5)):
+        x = np.zeros(size)
+        relaxation.reset()
+        for _ in range(size + 2):
+            relaxation.update(x, matrix @ x + offset - x)
+        np.testing.assert_allclose(x, solution, rtol=1.e-8)
+        assert relaxation.columns <= size
+
+
+def test_history_qr():
+    """Tests the incremental QR factorization with a bounded history"""
+
+    rng = np.random.default_rng(1)
+    relaxation = IQNILSRelaxation(history=3)
+    x = np.zeros(6)
+    residuals = [rng.standard_normal(6) for _ in range(6)]
+    for residual in residuals:
+        relaxation.update(x, residual)
+    assert relaxation.columns == 3
+    # pylint: disable=protected-access
+    q, r = relaxation._q[:3], relaxation._r[:3, :3]
+    np.testing.assert_allclose(q @ q.T, np.eye(3), atol=1.e-12)
+    np.testing.assert_allclose(np.triu(r), r)
+    expected = np.array([residuals[i + 1] - residuals[i] for i in range(2, 5)])
+    np.testing.assert_allclose(r.T @ q, expected, atol=1.e-12)
+
+    relaxation.update(x, np.zeros(6))
+    relaxation.update(x, np.zeros(6))  # dependent (null) difference is dropped
+    assert relaxation.columns == 3
+    x = np.zeros(1)
+    for value in (1.0, 2.0, 4.0):
+        relaxation.update(x, np.array([value]))  # reallocation, then dependent differences
+    assert relaxation.columns == 1
+
+
+def test_history_reuse():
+    """Tests the reuse of the differences of previous time steps"""
+
+    relaxation = IQNILSRelaxation(reuse=1)
+    x = np.zeros(3)
+    for step in range(3):
+        relaxation.reset()
+        for residual in np.roll(np.eye(3), step, axis=0)[:2]:
+            relaxation.update(x, residual)
+        assert relaxation.columns == (1 if step == 0 else 2)
+
+
+@pytest.mark.parametrize("relaxation_type", [IQNILSRelaxation, AndersonRelaxation])
+def test_coupling_fields_and_values(relaxation_type):
+    """Tests the acceleration of a stiff coupling of fields and values"""
+
+    size = 10
+    iterations = {}
+    for relaxation in (AitkenRelaxation(omega=0.1), relaxation_type(omega=0.1, reuse=1)):
+        first = MatrixProblem(stiff_matrix(size), np.linspace(0.0, 1.0, size))
+        second = MirrorProblem(size)
+        exchanges = [FieldExchange(first, "y", second, "u"),
+                     FieldExchange(second, "v", first, "u"),
+                     ValueExchange(second, "s", first)]
+        driver = FixedPointCoupling([first, second], exchanges, relaxation, tolerance=1.e-8,
+                                    max_iterations=200, gauss_seidel=True)
+        assert driver.run(max_steps=3) == 3
+        iterations[type(relaxation)] = driver.iterations
+    assert sum(iterations[relaxation_type]) < sum(iterations[AitkenRelaxation]) / 3
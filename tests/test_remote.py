@@ -0,0 +1,253 @@
+"""test icoco.remote module"""
+# pylint: disable=abstract-class-instantiated
+
+import os
+import socket
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import icoco
+from icoco.field import Field, Mesh
+from icoco.remote import ProblemServer, RemoteProblem, _ANSWER, _REQUEST, _decode, _payload
+
+from conftest import MinimalProblem  # pylint: disable=wrong-import-order
+
+
+class RemoteArrayProblem(MinimalProblem):
+    """Problem storing its inputs"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.inputs = {}
+
+    def setInputDoubleValue(self, name: str, val: float) -> None:
+        if name == "wrong":
+            raise icoco.WrongArgument(prob="RemoteArrayProblem", method="setInputDoubleValue",
+                                      arg="name", condition="wrong name")
+        self.inputs[name] = val
+
+    def getOutputDoubleValue(self, name: str) -> float:
+        return self.inputs[name]
+
+    def setInputMEDDoubleField(self, name, afield) -> None:
+        self.inputs[name] = afield.copy()
+
+    def getOutputMEDDoubleField(self, name):
+        return self.inputs[name]
+
+    def getFieldType(self, name: str) -> icoco.ValueType:
+        return icoco.ValueType.Double
+
+    def getOutputMEDStringField(self, name):
+        return lambda: name
+
+    def getOutputIntValue(self, name: str) -> int:
+        time.sleep(0.5)
+        return 1
+
+    def getOutputStringValue(self, name: str) -> str:
+        raise type("LocalError", (Exception, ), {})(name)  # not picklable
+
+
+@pytest.fixture(name="server", params=["unix", "tcp"])
+def server_fixture(request, tmp_path):
+    """Server of a RemoteArrayProblem, serving in a thread"""
+    address = str(tmp_path / "problem.sock") if request.param == "unix" else ("127.0.0.1", 0)
+    with ProblemServer(RemoteArrayProblem(), address) as problem_server:
+        thread = threading.Thread(target=problem_server.serve)
+        thread.start()
+        yield problem_server
+    thread.join()
+
+
+def test_remote_problem(server):
+    """Tests the time loop and data exchanges through a socket"""
+
+    with RemoteProblem(server.address, timeout=10.0, authkey=server.authkey) as problem:
+        assert problem.initialize()
+        dt, stop = problem.computeTimeStep()
+        assert (dt, stop) == (0.1, False)
+        assert problem.initTimeStep(dt=dt)
+        assert problem.solveTimeStep()
+        problem.validateTimeStep()
+        assert problem.presentTime() == pytest.approx(0.1)
+        problem.setInputDoubleValue("x", 1.5)
+        problem.setInputDoubleValue(name="y", val=2.5)
+        assert problem.getOutputDoubleValue("y") == 2.5
+        np.testing.assert_array_equal(problem.getOutputDoubleValues(["x", "y"]), [1.5, 2.5])
+        array = np.arange(12.0).reshape(3, 4)
+        problem.setInputMEDDoubleField("f", array[:, ::2])
+        result = problem.getOutputMEDDoubleField("f")
+        np.testing.assert_array_equal(result, array[:, ::2])
+        result[0, 0] = -1.0
+        problem.setInputMEDDoubleField("big", np.arange(100000.0))
+        np.testing.assert_array_equal(problem.getOutputMEDDoubleField("big"), np.arange(100000.0))
+        assert problem.getFieldType("f") == icoco.ValueType.Double
+        with pytest.raises(icoco.NotImplementedMethod) as error:
+            problem.isStationary()
+        assert "RemoteArrayProblem" in str(error.value)
+        assert problem.supports("solveTimeStep") and not problem.supports("save")
+        assert problem.implemented_methods() == server.problem.implemented_methods()
+        with pytest.raises(icoco.WrongArgument, match="'solve' is not an ICoCo method"):
+            problem.supports("solve")
+        problem.terminate()
+    assert server.problem.inputs["x"] == 1.5
+    assert RemoteProblem.solveTimeStep.__doc__ == icoco.Problem.solveTimeStep.__doc__
+
+
+def test_remote_pipelined(server):
+    """Tests the errors of pipelined calls"""
+
+    with RemoteProblem(server.address, timeout=10.0, authkey=server.authkey) as problem:
+        problem.setInputDoubleValue("wrong", 1.0)  # raised by the next call waiting for an answer
+        problem.setInputDoubleValue("discarded", 1.0)
+        with pytest.raises(icoco.WrongArgument, match="wrong name"):
+            problem.getOutputDoubleValue("x")
+        problem.setInputDoubleValue("x", 1.0)
+        problem.flush()
+        problem.setInputDoubleValue("wrong", 1.0)
+        with pytest.raises(icoco.WrongArgument, match="wrong name"):
+            problem.flush()
+        with pytest.raises(RuntimeError, match="getOutputMEDStringField answer can not be sent"):
+            problem.getOutputMEDStringField("s")
+        with pytest.raises(RuntimeError, match="LocalError: s"):
+            problem.getOutputStringValue("s")
+    assert "discarded" not in server.problem.inputs
+    assert server.problem.inputs["x"] == 1.0
+
+
+def test_remote_fields(server):
+    """Tests icoco.field.Field through a socket"""
+
+    mesh = Mesh("m", 1, np.arange(3.0), [0, 1, 1, 2], [0, 2, 4])
+    with RemoteProblem(server.address, timeout=10.0, authkey=server.authkey) as problem:
+        problem.setInputMEDDoubleField("f", Field("f", np.arange(2.0), mesh, unit="K", time=1.5))
+        field = problem.getOutputMEDDoubleField("f")
+        assert isinstance(field, Field)
+        assert (field.unit, field.time, field.mesh.n_cells) == ("K", 1.5, 2)
+        np.testing.assert_array_equal(field, np.arange(2.0).reshape(2, 1))
+
+
+def test_remote_lost(tmp_path):
+    """Tests the errors of connection"""
+
+    address = str(tmp_path / "problem.sock")
+    problem_server = ProblemServer(RemoteArrayProblem(), address)
+    thread = threading.Thread(target=problem_server.serve, kwargs={"max_clients": 2})
+    thread.start()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(address)
+        assert client.recv(1) == b"\x00"  # no authentication
+        client.sendall(_REQUEST.pack(100, 0, 0))  # closed before the payload
+    problem = RemoteProblem(address)
+    assert problem.initialize()
+    problem.close()
+    thread.join()
+    problem_server.close()
+    problem_server.close()
+
+    for answer, match in ((b"\x00", "lost: connection closed"), (b"", "lost$"),
+                          (b"\x01", "lost$")):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as listener:
+            listener.bind(("127.0.0.1", 0))
+            listener.listen(1)
+            thread = threading.Thread(target=_answer_and_close, args=(listener, answer))
+            thread.start()
+            if answer == b"\x00":  # closed after the handshake
+                problem = RemoteProblem(listener.getsockname())
+                thread.join()
+                with pytest.raises(RuntimeError, match=match):
+                    problem.initialize()
+                problem.close()
+            else:
+                with pytest.raises(RuntimeError, match=match):
+                    RemoteProblem(listener.getsockname(), authkey=b"key")
+            thread.join()
+
+
+def test_remote_timeout(server):
+    """Tests that the connection is closed after a timeout, the stream being out of sync"""
+
+    problem = RemoteProblem(server.address, timeout=0.1, authkey=server.authkey)
+    with pytest.raises(RuntimeError, match="lost: timed out"):
+        problem.getOutputIntValue("late")
+    assert problem._sock.fileno() == -1  # pylint: disable=protected-access
+    time.sleep(0.5)  # the late answer is sent
+    with pytest.raises(RuntimeError, match="lost"):
+        problem.presentTime()
+    problem.close()
+
+
+def _answer_and_close(listener: socket.socket, answer: bytes) -> None:
+    """Accepts a connection, sends answer and closes it"""
+    conn, _ = listener.accept()
+    conn.sendall(answer)
+    conn.close()
+
+
+def test_remote_authentication(tmp_path):
+    """Tests the authentication of the clients and the servers"""
+
+    with ProblemServer(RemoteArrayProblem(), authkey=b"secret") as problem_server:
+        assert problem_server.address[0] == "127.0.0.1"
+        problem_server.handshake_timeout = 0.5
+        thread = threading.Thread(target=problem_server.serve, kwargs={"max_clients": 5})
+        thread.start()
+        with RemoteProblem(problem_server.address, timeout=10.0, authkey=b"secret") as problem:
+            assert problem.initialize()
+        with pytest.raises(RuntimeError, match="failed: wrong authkey"):
+            RemoteProblem(problem_server.address, timeout=10.0, authkey=b"wrong")
+        with pytest.raises(RuntimeError, match="server requires an authkey"):
+            RemoteProblem(problem_server.address, timeout=10.0)
+        with socket.create_connection(problem_server.address) as client:  # no answer: timeout
+            while client.recv(64):
+                pass
+        with RemoteProblem(problem_server.address, timeout=10.0, authkey=b"secret") as problem:
+            assert problem.presentTime() == 0.0
+        thread.join()
+
+    address = str(tmp_path / "problem.sock")
+    with ProblemServer(RemoteArrayProblem(), address) as problem_server:
+        assert os.stat(address).st_mode & 0o777 == 0o600
+        thread = threading.Thread(target=problem_server.serve, kwargs={"max_clients": 1})
+        thread.start()
+        with pytest.raises(RuntimeError, match="server does not use an authkey"):
+            RemoteProblem(address, timeout=10.0, authkey=b"secret")
+        thread.join()
+
+    with ProblemServer(RemoteArrayProblem(), address) as problem_server:
+        assert problem_server.authkey is None
+    with ProblemServer(RemoteArrayProblem(), ("localhost", 0)) as problem_server:
+        assert len(problem_server.authkey) == 32  # generated: TCP is always authenticated
+        thread = threading.Thread(target=problem_server.serve, kwargs={"max_clients": 2})
+        thread.start()
+        with pytest.raises(RuntimeError, match="server requires an authkey"):
+            RemoteProblem(problem_server.address, timeout=10.0)
+        with RemoteProblem(problem_server.address, timeout=10.0,
+                           authkey=problem_server.authkey) as problem:
+            assert problem.initialize()
+        thread.join()
+    with ProblemServer(RemoteArrayProblem(), ("", 0), authkey=b"secret") as problem_server:
+        assert problem_server.authkey == b"secret"
+
+
+def test_encoding():
+    """Tests the binary encoding of values"""
+
+    values = [None, True, False, 1.5, -3, np.int64(7), 2 ** 70, "été", [1, (2, "a")],
+              {"a": 1, "b": [2.0]}, {1: 2}, icoco.ValueType.Int, np.zeros(0), np.float32(1.0),
+              np.arange(6, dtype=np.int32).reshape(2, 3), np.array([1, "a"], dtype=object)]
+    assert _REQUEST.unpack(_REQUEST.pack(1 << 32, 0, 0))[0] == 1 << 32
+    assert _ANSWER.unpack(_ANSWER.pack(1 << 40, 1))[0] == 1 << 40
+    chunks = _payload(values)
+    decoded = _decode(memoryview(b"".join(chunks)), 0)[0]
+    for value, result in zip(values, decoded):
+        if isinstance(value, np.ndarray):
+            assert value.dtype == result.dtype
+            np.testing.assert_array_equal(value, result)
+        else:
+            assert type(value) is type(result) or isinstance(value, np.int64)
+            assert value == result
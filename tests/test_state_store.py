@@ -0,0 +1,164 @@
+"""test icoco.state_store module"""
+
+import pickle
+
+import numpy as np
+import pytest
+
+import icoco
+from icoco.state_store import DeltaStateStore, EvictionPolicy, StateStore
+
+
+def test_save_restore():
+    """Tests save, restore and forget"""
+
+    store = StateStore(name="Prob")
+    array = np.arange(1000, dtype=np.float64)
+    store.save(1, "memory", (1.5, array))
+    array[:] = 0.0
+    time, restored = store.restore(1, "memory")
+    assert time == 1.5
+    np.testing.assert_array_equal(restored, np.arange(1000))
+    assert not restored.flags.writeable
+    assert store.nbytes >= array.nbytes
+    assert (1, "memory") in store
+    assert len(store) == 1
+
+    _, copied = store.restore(1, "memory", copy=True)
+    copied[:] = 1.0
+    np.testing.assert_array_equal(store.restore(1, "memory")[1], np.arange(1000))
+    store.save(1, "memory", {"scalar": 2})
+    assert store.restore(1, "memory") == {"scalar": 2}
+    assert store.nbytes < array.nbytes
+    assert store.hits == 4
+
+    store.forget(1, "memory")
+    store.forget(1, "memory")
+    assert store.nbytes == 0
+    with pytest.raises(icoco.WrongArgument, match="Prob.*not a known save state"):
+        store.restore(1, "memory")
+    assert store.misses == 1
+
+
+@pytest.mark.parametrize("eviction, kept", [(EvictionPolicy.LRU, [(1, "m"), (2, "m")]),
+                                            (EvictionPolicy.OLDEST, [(3, "m"), (1, "m")]),
+                                            (lambda keys: list(keys)[-1], [(3, "m"), (1, "m")])])
+def test_eviction(eviction, kept):
+    """Tests the eviction policies and the byte budget"""
+
+    array = np.zeros(1000)
+    store = StateStore(max_bytes=int(3.5 * array.nbytes), eviction=eviction)
+    assert store.max_bytes == int(3.5 * array.nbytes)
+    store.save(2, "m", array)
+    store.save(3, "m", array)
+    store.save(1, "m", array)
+    assert store.evictions == 0
+    store.pin(1, "m")
+    store.restore(2, "m")
+    store.save(4, "m", array)
+    assert store.evictions == 1
+    store.forget(4, "m")
+    assert store.keys() == kept
+    assert store.nbytes <= store.max_bytes
+
+
+def test_pinning():
+    """Tests pinned states and states over budget"""
+
+    array = np.zeros(1000)
+    store = StateStore(max_bytes=int(1.5 * array.nbytes))
+    store.save(0, "m", array, pin=True)
+    with pytest.raises(icoco.WrongArgument, match="do not fit"):
+        store.save(1, "m", array)
+    store.pin(0, "m", pinned=False)
+    store.save(1, "m", array)
+    assert store.keys() == [(1, "m")]
+    with pytest.raises(icoco.WrongArgument, match="pin"):
+        store.pin(0, "m")
+    store.clear()
+    assert len(store) == 0 and store.nbytes == 0
+
+
+def test_failed_save():
+    """Tests that a failing save keeps the previous state of the same key"""
+
+    array = np.zeros(1000)
+    store = StateStore(max_bytes=int(1.5 * array.nbytes))
+    store.save(1, "m", array[:10])
+    nbytes = store.nbytes
+    with pytest.raises(icoco.WrongArgument, match="do not fit"):
+        store.save(1, "m", np.zeros(2000))
+    np.testing.assert_array_equal(store.restore(1, "m"), np.zeros(10))
+    assert store.nbytes == nbytes and store.evictions == 0
+    store.save(1, "m", array, pin=True)
+    store.save(1, "m", array)  # the replaced pinned state does not count
+    assert store.keys() == [(1, "m")]
+
+    delta = DeltaStateStore()
+    delta.save(1, "m", array)
+    nbytes = delta.nbytes
+    for target in (store, delta):
+        with pytest.raises((AttributeError, pickle.PicklingError)):
+            target.save(1, "m", lambda: None)  # not picklable
+        np.testing.assert_array_equal(target.restore(1, "m"), array)
+    assert delta.nbytes == nbytes
+
+
+def test_unknown_policy():
+    """Tests an unknown eviction policy"""
+
+    with pytest.raises(icoco.WrongArgument, match="eviction"):
+        StateStore(eviction="fifo")
+
+
+def slowly_varying(step: int, size: int = 100000) -> np.ndarray:
+    """Returns a field of which only a small window changes from one step to the next one"""
+    field = np.zeros(size)
+    field[:step * 100] = 1.0
+    return field
+
+
+def test_delta_memory():
+    """Tests the memory of 100 slowly varying states"""
+
+    store = StateStore()
+    delta = DeltaStateStore(full_every=20)
+    for step in range(100):
+        state = {"time": 0.1 * step, "field": slowly_varying(step), "small": np.arange(3.0)}
+        store.save(step, "memory", state)
+        delta.save(step, "memory", state)
+    assert delta.nbytes < store.nbytes / 10
+    assert len(delta) == 100 and (5, "memory") in delta
+    assert delta.keys() == store.keys()
+    for step in (0, 1, 19, 20, 57, 99):
+        restored = delta.restore(step, "memory")
+        assert restored["time"] == pytest.approx(0.1 * step)
+        np.testing.assert_array_equal(restored["field"], slowly_varying(step))
+        restored["field"][:] = -1.0
+    np.testing.assert_array_equal(delta.restore(98, "memory")["field"], slowly_varying(98))
+
+
+def test_delta_chain():
+    """Tests forgetting states of a delta chain"""
+
+    delta = DeltaStateStore(block_size=8, full_every=100, name="Prob")
+    for step in range(10):
+        delta.save(step, "m", np.arange(13, dtype=np.uint8) * step)
+    nbytes = delta.nbytes
+    np.testing.assert_array_equal(delta.restore(5, "m"), np.arange(13) * 5)
+    for step in range(9):
+        delta.forget(step, "m")
+    assert delta.nbytes == nbytes  # kept for state 9
+    np.testing.assert_array_equal(delta.restore(9, "m"), np.arange(13) * 9)
+    delta.save(9, "m", np.zeros(5))
+    assert delta.nbytes < 200
+    delta.save(10, "m", np.zeros(5))
+    delta.forget(9, "m")
+    np.testing.assert_array_equal(delta.restore(10, "m"), np.zeros(5))
+    with pytest.raises(icoco.WrongArgument, match="Prob.*not a known save state"):
+        delta.restore(9, "m")
+    delta.clear()
+    assert len(delta) == 0 and delta.nbytes == 0
+
+    with pytest.raises(icoco.WrongArgument, match="block_size"):
+        DeltaStateStore(block_size=12)